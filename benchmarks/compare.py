@@ -0,0 +1,39 @@
+"""Compares two benchmark JSON files written by `benchmarks/run.py`.
+
+    python benchmarks/compare.py base.json new.json --threshold 1.2
+
+Exits with status 1 if any benchmark's median got slower than the threshold ratio.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Ratio new/base above which a benchmark is a regression")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)["benchmarks"]
+    with open(args.new) as f:
+        new = json.load(f)["benchmarks"]
+
+    regressed = False
+    print(f"{'benchmark':<45} {'base':>10} {'new':>10} {'ratio':>7}")
+    for name in sorted(set(base) & set(new)):
+        old_t, new_t = base[name]["median"], new[name]["median"]
+        ratio = new_t / old_t if old_t else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag, regressed = " !", True
+        print(f"{name:<45} {old_t:>10.3g} {new_t:>10.3g} {ratio:>7.2f}{flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
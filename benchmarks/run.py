@@ -0,0 +1,201 @@
+"""Benchmarks of parsing, transformation, validation and rendering.
+
+Run from the repository root, results are written as JSON so they can
+be compared between commits with `benchmarks/compare.py`::
+
+    python benchmarks/run.py -o bench.json
+    python benchmarks/run.py --sizes 10 100 --filter transform
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from particlezoo.synthetic import generate_model, write_config  # noqa: E402
+
+SIZES = [10, 100, 1000, 10000]
+GROUPS = [["SU", 2], ["SU", 3], ["SU", 5], ["SO", 10], ["Sp", 4], ["E", 6], ["U", 1], ["Z", 3]]
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None,
+            budget: float = 10.0) -> Dict[str, float]:
+    """Times `fn` up to `repeat` times, stopping early once `budget` seconds are spent"""
+    times: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if sum(times) > budget:
+            break
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "runs": len(times),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+IMPORTS = ["particlezoo", "particlezoo.parsers", "particlezoo.validations"]
+
+
+def _keep_all(name: str) -> bool:
+    return True
+
+
+def bench_imports(repeat: int, keep: Callable[[str], bool] = _keep_all) -> Dict[str, dict]:
+    """Cold import time of each module, measured in a fresh interpreter"""
+    results = {}
+    for module in IMPORTS:
+        name = f"import[{module}]"
+        if not keep(name):
+            continue
+        code = (f"import time; t = time.perf_counter(); import {module}; "
+                f"print(time.perf_counter() - t)")
+        times = [float(subprocess.check_output([sys.executable, "-c", code], cwd=ROOT))
+                 for _ in range(repeat)]
+        results[name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+            "runs": len(times),
+        }
+    return results
+
+
+def bench_group_lookup(repeat: int, keep: Callable[[str], bool] = _keep_all) -> Dict[str, dict]:
+    from particlezoo.parsers import group_lookup
+    from particlezoo.registry import registry
+
+    results = {}
+    for grp in GROUPS:
+        name = f"group_lookup[{grp[0]}{grp[1]}]"
+        if keep(name + "-cold"):
+            results[name + "-cold"] = measure(lambda: group_lookup(grp), repeat, setup=registry.clear)
+        if keep(name + "-warm"):
+            results[name + "-warm"] = measure(lambda: group_lookup(grp), repeat)
+    return results
+
+
+MODEL_BENCHMARKS = ["parse", "consume_config", "validate_config", "transform_model[{}]-cold",
+                    "transform_model[{}]-warm", "is_gauge_invariant", "is_gauge_invariant_batch",
+                    "kinetic_term"]
+
+
+def _model_names(size: int) -> List[str]:
+    return [x.format(size) if "{}" in x else f"{x}[{size}]" for x in MODEL_BENCHMARKS]
+
+
+def bench_model(size: int, n_symmetries: int, repeat: int, tmpdir: str,
+                keep: Callable[[str], bool] = _keep_all) -> Dict[str, dict]:
+    """Parsing to rendering of one generated model. Only the benchmarks that
+    `keep` accepts are run, and the model is not even built if none are."""
+    from particlezoo.parsers import consume_config, parse, validate_config
+    from particlezoo.parsers.transform import transform_model
+    from particlezoo.registry import registry
+    from particlezoo.validations import is_gauge_invariant, GaugeInvarianceEngine
+
+    names = [x for x in _model_names(size) if keep(x)]
+    if not names:
+        return {}
+    results = {}
+
+    def run(name: str, fn: Callable[[], object], **kwargs):
+        if name in names:
+            results[name] = measure(fn, repeat, **kwargs)
+
+    raw = generate_model(size, n_symmetries, seed=size).raw
+    if f"parse[{size}]" in names:
+        fname = os.path.join(tmpdir, f"model{size}.yaml")
+        write_config(raw, fname)
+        run(f"parse[{size}]", lambda: parse(fname))
+    run(f"consume_config[{size}]", lambda: consume_config(raw))
+    run(f"validate_config[{size}]", lambda: validate_config(raw))
+    if not any(x.startswith(("transform", "is_gauge", "kinetic")) for x in names):
+        return results
+
+    cfg = consume_config(raw)
+    run(f"transform_model[{size}]-cold", lambda: transform_model(cfg), setup=registry.clear)
+    run(f"transform_model[{size}]-warm", lambda: transform_model(cfg))
+
+    lagrangian = transform_model(cfg)
+    fields = lagrangian.particle_contents
+    rng = random.Random(size)
+    interactions = [rng.sample(fields, k) if len(fields) >= k else fields
+                    for k in (2, 3, 4) for _ in range(100)]
+
+    def serial():
+        for term in interactions:
+            is_gauge_invariant(term)
+
+    def batch():
+        list(GaugeInvarianceEngine().check_many(interactions))
+
+    run(f"is_gauge_invariant[{size}]", serial)
+    run(f"is_gauge_invariant_batch[{size}]", batch)
+    run(f"kinetic_term[{size}]", lagrangian.kinetic_term)
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="JSON file to write, defaults to stdout")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Numbers of fields")
+    parser.add_argument("--symmetries", type=int, default=3,
+                        help="Number of symmetries, SM groups first")
+    parser.add_argument("--repeat", type=int, default=5, help="Max runs per benchmark")
+    parser.add_argument("--filter", default="", help="Only run benchmarks containing this string")
+    args = parser.parse_args(argv)
+
+    from importlib.metadata import version
+    import particlezoo
+
+    def keep(name: str) -> bool:
+        return args.filter in name
+
+    results: Dict[str, dict] = {}
+    results.update(bench_imports(args.repeat, keep))
+    results.update(bench_group_lookup(args.repeat, keep))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            results.update(bench_model(size, args.symmetries, args.repeat, tmpdir, keep))
+            print(f"size {size} done", file=sys.stderr)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "particlezoo": particlezoo.__version__,
+        "liesym": version("liesym"),
+        "benchmarks": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
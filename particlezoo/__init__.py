@@ -1,2 +1,37 @@
-from .validations import is_gauge_invariant_repr
-from .builders import Field, Representation, Symmetry, Lagrangian
+__version__ = "0.0.2"
+
+import importlib
+from typing import TYPE_CHECKING
+
+# sympy and liesym take most of a second to import, the names below are
+# only resolved on first access so the parsers and raw models stay light.
+_LAZY = {
+    "is_gauge_invariant_repr": "validations",
+    "Field": "builders",
+    "Representation": "builders",
+    "Symmetry": "builders",
+    "Lagrangian": "builders",
+}
+
+_SUBMODULES = ("builders", "parsers", "validations", "registry", "synthetic",
+               "instrumentation", "exceptions", "cli", "diagrams")
+
+__all__ = list(_LAZY)
+
+if TYPE_CHECKING:
+    from .validations import is_gauge_invariant_repr
+    from .builders import Field, Representation, Symmetry, Lagrangian
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES))
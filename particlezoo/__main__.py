@@ -1,4 +1,6 @@
-from . import *
+import sys
+
+from .cli import main
 
 if __name__ == "__main__":
-    pass
+    sys.exit(main())
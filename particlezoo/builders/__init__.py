@@ -1,3 +1,43 @@
-from .models import *
+import importlib
+from typing import TYPE_CHECKING
+
 from .raw import *
-from .lagrangian import *
+
+# The raw config models are plain python, everything else needs sympy or
+# liesym and is imported on first access.
+_LAZY = {
+    "BaseModel": "models",
+    "Representation": "models",
+    "Symmetry": "models",
+    "Field": "models",
+    "KineticTerm": "models",
+    "Lagrangian": "lagrangian",
+    "ABELIAN_GROUPS": "core",
+    "CoreSymmetry": "core",
+    "CoreField": "core",
+    "CoreModel": "core",
+    "CovariantExpansion": "covariant",
+    "GaugeInteractions": "covariant",
+    "generator_matrices": "covariant",
+    "RGE": "rge",
+    "BetaCoefficients": "rge",
+}
+
+if TYPE_CHECKING:
+    from .models import BaseModel, Representation, Symmetry, Field, KineticTerm
+    from .lagrangian import Lagrangian
+    from .core import ABELIAN_GROUPS, CoreSymmetry, CoreField, CoreModel
+    from .covariant import CovariantExpansion, GaugeInteractions, generator_matrices
+    from .rge import RGE, BetaCoefficients
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,348 @@
+"""Compact, picklable core representation of a model's content.
+
+The sympy facing `Field`/`Symmetry` classes are convenient for building
+equations but heavy to construct, hash and pickle. The classes here hold
+the same information with `__slots__` and plain python values:
+
+* fields and groups are referred to by interned integer ids
+* lie group irreps are tuples of Dynkin labels
+* U(1) charges are `Fraction` (sympy expr only if symbolic)
+* Z(n) charges are the integer index k of `Z_k`
+
+They are what the batch validators, the operator search and the process
+pool workers run on.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..exceptions import ConfigError, ModelError
+from ..registry import group_key, registry
+from .raw import Configuration, GenericField, SymmetryGroup
+
+GroupKey = Tuple[str, int]
+RepKey = Union[Tuple[int, ...], Fraction, int, object]
+
+ABELIAN_GROUPS = ("u", "z")
+
+
+def _to_fraction(value) -> Union[Fraction, object]:
+    try:
+        return Fraction(str(value))
+    except ValueError:  # symbolic charge
+        from sympy import sympify
+        return sympify(value)
+
+
+def _spin_data(spin) -> Tuple[Fraction, Fraction, bool]:
+    """(spin, mass dim, is fermion), mirrors `Field._parse_spin`"""
+    try:
+        spin_ = Fraction(str(spin))
+    except ValueError:
+        raise ModelError("Unrecognized Spin")
+    if spin_.denominator == 1 and spin_ >= 0:
+        return spin_, Fraction(1), False
+    if spin_.denominator == 2:
+        return spin_, Fraction(3, 2), True
+    raise ModelError("Unrecognized Spin")
+
+
+class CoreSymmetry:
+    """Slotted counterpart of `Symmetry`"""
+    __slots__ = ("id", "name", "group", "gauged", "coupling", "tag", "description")
+
+    def __init__(self,
+                 id: int,
+                 name: str,
+                 group: int,
+                 gauged: Optional[bool],
+                 coupling: Optional[str] = None,
+                 tag: Optional[str] = None,
+                 description: str = ""):
+        self.id = id
+        self.name = name
+        self.group = group
+        self.gauged = gauged
+        self.coupling = coupling
+        self.tag = tag
+        self.description = description
+
+    def __repr__(self):
+        return f"CoreSymmetry({self.id}, {self.name!r})"
+
+
+class CoreField:
+    """Slotted counterpart of `Field`.
+
+    Members:
+        id (int): Index of the field (or of the field it conjugates) in `CoreModel.fields`
+        name (str): Name of the field
+        spin (Fraction): Spin
+        mass_dim (Fraction): Mass dimension, 1 for bosons and 3/2 for fermions
+        is_fermion (bool): Whether the field is a fermion
+        reps (Tuple[Tuple[int, RepKey], ...]): (symmetry id, rep key) pairs sorted by symmetry id
+        conjugated (bool): Whether this is the conjugate of field `id`
+    """
+    __slots__ = ("id", "name", "spin", "mass_dim", "is_fermion", "reps",
+                 "description", "conjugated")
+
+    def __init__(self,
+                 id: int,
+                 name: str,
+                 spin: Fraction,
+                 reps: Sequence[Tuple[int, RepKey]],
+                 description: str = "",
+                 conjugated: bool = False):
+        self.id = id
+        self.name = name
+        self.spin, self.mass_dim, self.is_fermion = _spin_data(spin)
+        self.reps = tuple(sorted(reps, key=lambda x: x[0]))
+        self.description = description
+        self.conjugated = conjugated
+
+    def __repr__(self):
+        return f"CoreField({self.id}, {self.name!r})"
+
+
+class CoreModel:
+    """Compact model content with converters to and from the sympy classes.
+
+    Examples
+    ========
+    >>> import pickle
+    >>> from particlezoo.builders import Configuration, SymmetryGroup, GenericField, CoreModel
+    >>> cfg = Configuration("SM", None, None,
+    ...     [SymmetryGroup(None, "SU2_L", ["SU", "2"], "g", None, None),
+    ...      SymmetryGroup(None, "U1_Y", ["U", "1"], "g'", None, None)],
+    ...     [GenericField("H", "0", None, {"SU2_L": "2", "U1_Y": "1/2"})])
+    >>> core = CoreModel.from_configuration(cfg)
+    >>> core.groups, core.fields[0].reps
+    ((('su', 2), ('u', 1)), ((0, (1,)), (1, Fraction(1, 2))))
+    >>> pickle.loads(pickle.dumps(core)).fields[0].reps == core.fields[0].reps
+    True
+    """
+    __slots__ = ("name", "version", "description", "groups", "symmetries",
+                 "fields", "symmetry_ids", "field_ids")
+
+    def __init__(self,
+                 name: str,
+                 groups: Sequence[GroupKey],
+                 symmetries: Sequence[CoreSymmetry],
+                 fields: Sequence[CoreField],
+                 version: Optional[str] = None,
+                 description: Optional[str] = None):
+        self.name = name
+        self.version = version
+        self.description = description
+        self.groups: Tuple[GroupKey, ...] = tuple(groups)
+        self.symmetries: Tuple[CoreSymmetry, ...] = tuple(symmetries)
+        self.fields: Tuple[CoreField, ...] = tuple(fields)
+        self.symmetry_ids: Dict[str, int] = {x.name: x.id for x in self.symmetries}
+        self.field_ids: Dict[str, int] = {x.name: x.id for x in self.fields}
+
+    def __getstate__(self):
+        return (self.name, self.groups, self.symmetries, self.fields,
+                self.version, self.description)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def group_of(self, symmetry_id: int) -> GroupKey:
+        """The (group type, dim) key of a symmetry"""
+        return self.groups[self.symmetries[symmetry_id].group]
+
+    def is_abelian(self, symmetry_id: int) -> bool:
+        return self.group_of(symmetry_id)[0] in ABELIAN_GROUPS
+
+    def conjugate(self, field: CoreField) -> CoreField:
+        """The conjugate of a field, every rep key conjugated"""
+        reps = []
+        for sym_id, key in field.reps:
+            grp, dim = self.group_of(sym_id)
+            if grp == "u":
+                key = -key
+            elif grp == "z":
+                key = (dim - key) % dim
+            else:
+                key = registry.conjugate(registry.group(grp, dim), key)
+            reps.append((sym_id, key))
+
+        name = f"\\overline{{{field.name}}}" if field.is_fermion else f"{field.name}^{{\\dagger}}"
+        return CoreField(field.id, name, field.spin, reps,
+                         field.description, not field.conjugated)
+
+    def atoms(self, conjugates: bool = True) -> List[CoreField]:
+        """Operator building blocks, each field followed by its conjugate.
+        Same order as `particlezoo.validations.operators.operator_atoms`."""
+        atoms: List[CoreField] = []
+        for field in self.fields:
+            atoms.append(field)
+            if conjugates:
+                atoms.append(self.conjugate(field))
+        return atoms
+
+    @classmethod
+    def _build(cls,
+               name: str,
+               symmetries: Iterable[Tuple[str, GroupKey, Optional[bool], Optional[str], Optional[str], str]],
+               fields: Iterable[Tuple[str, object, Dict[str, RepKey], str]],
+               version: Optional[str] = None,
+               description: Optional[str] = None) -> "CoreModel":
+        groups: Dict[GroupKey, int] = {}
+        core_syms: List[CoreSymmetry] = []
+        for sym_name, key, gauged, coupling, tag, desc in symmetries:
+            group_id = groups.setdefault(key, len(groups))
+            core_syms.append(CoreSymmetry(
+                len(core_syms), sym_name, group_id, gauged, coupling, tag, desc))
+        sym_ids = {x.name: x.id for x in core_syms}
+
+        core_fields: List[CoreField] = []
+        for field_name, spin, reps, desc in fields:
+            try:
+                reps_ = [(sym_ids[k], v) for k, v in reps.items()]
+            except KeyError as e:
+                raise ConfigError(f"The symmetry {e.args[0]} is undefined.")
+            core_fields.append(CoreField(len(core_fields), field_name, spin, reps_, desc))
+
+        return cls(name, list(groups), core_syms, core_fields, version, description)
+
+    @classmethod
+    def from_lagrangian(cls, lagrangian) -> "CoreModel":
+        """Builds the core model of a `Lagrangian`"""
+        from ..validations.batch import rep_key
+
+        symmetries = [
+            (str(x.name), group_key(x.group), x.is_gauged, x.coupling, x.tag, x.description)
+            for x in lagrangian.symmetries
+        ]
+        fields = [
+            (x._raw_name, x.spin,
+             {k: rep_key(v) for k, v in x.representations.items()},
+             x.description)
+            for x in lagrangian.particle_contents
+        ]
+        return cls._build(lagrangian.name, symmetries, fields,
+                          lagrangian.version, lagrangian.description)
+
+    @classmethod
+    def from_fields(cls, fields: Sequence, name: str = "fields") -> "CoreModel":
+        """Builds a core model from loose `Field`s, with one symmetry per gauge name used"""
+        from ..validations.batch import rep_key
+
+        symmetries: Dict[str, GroupKey] = {}
+        raw_fields = []
+        for x in fields:
+            reps = {}
+            for k, v in x.representations.items():
+                key = group_key(v.group)
+                if symmetries.setdefault(k, key) != key:
+                    raise ConfigError(
+                        "FieldModel.representations matching keys should have matching group")
+                reps[k] = rep_key(v)
+            raw_fields.append((x._raw_name, x.spin, reps, x.description))
+
+        return cls._build(
+            name, [(k, v, None, None, None, "") for k, v in symmetries.items()], raw_fields)
+
+    @classmethod
+    def from_configuration(cls, cfg: Configuration) -> "CoreModel":
+        """Builds the core model straight from the raw configuration,
+        without constructing any sympy `Field` or `Symmetry`."""
+        symmetries = []
+        group_keys: Dict[str, GroupKey] = {}
+        for x in cfg.symmetries:
+            grp, dim = x.group
+            key = group_key(registry.group(grp, dim))
+            group_keys[x.name] = key
+            symmetries.append((x.name, key, x.gauged, x.coupling, x.tag, x.description or ""))
+
+        fields = []
+        for x in cfg.fields:
+            reps: Dict[str, RepKey] = {}
+            for k, v in x.representations.items():
+                key = group_keys.get(k)
+                if key is None or key[0] not in ABELIAN_GROUPS:
+                    if isinstance(v, list):
+                        reps[k] = tuple(int(i) for i in v)
+                    elif key is not None:
+                        reps[k] = tuple(
+                            int(i) for i in registry.irrep(registry.group(*key), str(v)))
+                    else:
+                        reps[k] = v  # let _build raise the undefined symmetry
+                elif key[0] == "z":
+                    reps[k] = int(str(v).replace("Z_", "")) % key[1]
+                else:
+                    reps[k] = _to_fraction(v)
+            fields.append((x.name, x.spin, reps, x.description or ""))
+
+        return cls._build(cfg.name, symmetries, fields, cfg.version, cfg.description)
+
+    def to_configuration(self) -> Configuration:
+        """Raw configuration, irreps as Dynkin label lists"""
+        def raw_rep(sym_id, key):
+            grp = self.group_of(sym_id)[0]
+            if grp == "z":
+                return f"Z_{key}"
+            if grp == "u":
+                return str(key)
+            return list(key)
+
+        return Configuration(
+            name=self.name,
+            version=self.version,
+            description=self.description,
+            symmetries=[
+                SymmetryGroup(
+                    description=x.description, name=x.name,
+                    group=[self.groups[x.group][0], str(self.groups[x.group][1])],
+                    coupling=x.coupling, gauged=x.gauged, tag=x.tag)
+                for x in self.symmetries],
+            fields=[
+                GenericField(
+                    name=x.name, spin=str(x.spin), description=x.description,
+                    representations={self.symmetries[i].name: raw_rep(i, k) for i, k in x.reps})
+                for x in self.fields]
+        )
+
+    def to_lagrangian(self):
+        """Builds the sympy facing `Lagrangian`. Irreps are built
+        from the stored Dynkin labels, no `irrep_lookup` is done."""
+        from liesym import U1, E, LieGroup
+        from sympy import Matrix, Rational, Symbol, sympify
+
+        from .lagrangian import Lagrangian
+        from .models import Field, Representation, Symmetry
+
+        groups = [registry.group(*key) for key in self.groups]
+        symmetries = [
+            Symmetry(
+                name=x.name,
+                group=groups[x.group],
+                gauged=isinstance(groups[x.group], (LieGroup, U1, E)) if x.gauged is None else x.gauged,
+                coupling=x.coupling,
+                description=x.description,
+                tag=x.tag)
+            for x in self.symmetries]
+
+        def rep(sym_id, key):
+            grp = self.group_of(sym_id)[0]
+            group = groups[self.symmetries[sym_id].group]
+            if grp == "z":
+                return Representation(Symbol(f"Z_{key}"), group)
+            if grp == "u":
+                value = Rational(key.numerator, key.denominator) if isinstance(key, Fraction) else sympify(key)
+                return Representation(value, group)
+            return Representation(Matrix([list(key)]), group)
+
+        fields = [
+            Field(
+                name=x.name,
+                spin=str(x.spin),
+                representations={self.symmetries[i].name: rep(i, k) for i, k in x.reps},
+                description=x.description,
+                no_mass=False)
+            for x in self.fields]
+
+        return Lagrangian(fields, symmetries, self.name, self.version, self.description)
@@ -0,0 +1,453 @@
+"""Expansion of the covariant derivatives of the kinetic terms.
+
+With D_mu = partial_mu - i sum_s g_s A^a_{s,mu} T^a_s the kinetic terms of
+the matter fields expand into
+
+    fermion  i psibar gamma^mu D_mu psi  ->  g_s psibar_i gamma^mu A^a_mu T^a_ij psi_j
+    scalar   (D_mu phi)^dagger D^mu phi  ->  i g_s A^a_mu (phi^dagger_i T^a_ij d^mu phi_j - d^mu phi^dagger_i T^a_ij phi_j)
+                                            + g_s g_t A^a_mu A^{b,mu} phi^dagger_i (T^a_s T^b_t)_ij phi_j
+
+The generator matrices T^a of every (group, irrep) are built once, as
+numpy arrays in a process wide cache, and shared by every field and model
+in that irrep. Fundamental generators come from liesym and are normalized
+to Tr(T^a T^b) = T(F) delta^ab, with the Dynkin index T(F) that the anomaly
+and beta function code use, so the same coupling g means the same thing
+everywhere (T(F) = 1/2 for SU(N) and Sp(2N), 1 for the vector of SO(N)).
+Every other irrep is the highest weight
+component of a product of the fundamental weight irreps (antisymmetric
+powers of the fundamental), picked out as the top eigenspace of the
+quadratic Casimir. Spinors of SO(N) and the exceptional groups are not
+reachable this way and raise `ModelError`.
+
+The vertices are returned as sparse coefficient tables, one row per non
+zero generator entry, and never as sympy expressions. Indices `i`, `j`
+run over the components of a field in a single symmetry's irrep, the
+field is a spectator (identity) in every other symmetry.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+from liesym import Group, LieAlgebra, U1, Z
+
+from ..exceptions import ModelError
+from ..instrumentation import timed
+from ..registry import GroupKey, LRUCache, _algebra, group_key, registry
+from .models import Field, Symmetry
+
+Labels = Tuple[int, ...]
+
+_TOL = 1e-10
+_MAX_PRODUCT = 4096
+
+_generators = LRUCache(1024)
+_sparse = LRUCache(1024)
+
+
+def _fundamental(gkey: GroupKey) -> np.ndarray:
+    """Hermitian fundamental generators with Tr(T^a T^b) = T(F) delta^ab,
+    T(F) the Dynkin index of `irrep_indices` (1/2 for SU and Sp, 1 for the
+    vector of SO).
+
+    liesym hands out a hermitian basis for SU and SO and a complex basis
+    for Sp, both are reduced to an orthonormal hermitian basis here.
+    """
+    from ..validations.anomalies import irrep_indices
+
+    group = registry.group(*gkey)
+    if not hasattr(group, "generators"):
+        raise ModelError("liesym has no generators for this group")
+    raw = [np.array(t.evalf(), dtype=complex) for t in group.generators()]
+
+    basis: List[np.ndarray] = []
+    for t in raw:
+        for h in ((t + t.conj().T) / 2, (t - t.conj().T) / 2j):
+            for b in basis:
+                h = h - np.trace(b @ h).real / np.trace(b @ b).real * b
+            if np.abs(h).max() > _TOL:
+                basis.append(h)
+    rank = int(_algebra(group).rank)
+    index = float(irrep_indices(gkey, [1] + [0] * (rank - 1)).dynkin)
+    gens = np.array([b * np.sqrt(index / np.trace(b @ b).real) for b in basis])
+    gens[np.abs(gens) < _TOL] = 0
+    return gens
+
+
+def _cartan(gkey: GroupKey) -> List[int]:
+    """Generators diagonal in the fundamental, they stay mutually commuting in every irrep"""
+    fund = _fund(gkey)
+    return [a for a, t in enumerate(fund) if not np.abs(t - np.diag(np.diag(t))).max() > _TOL]
+
+
+def _wedge(gens: np.ndarray, k: int) -> np.ndarray:
+    """Generators acting on the k-th antisymmetric power"""
+    n, d, _ = gens.shape
+    subsets = list(combinations(range(d), k))
+    index = {s: x for x, s in enumerate(subsets)}
+    out = np.zeros((n, len(subsets), len(subsets)), dtype=complex)
+    for col, s in enumerate(subsets):
+        for m, i in enumerate(s):
+            for j in np.flatnonzero(np.abs(gens[:, :, i]).max(axis=0)):
+                if j != i and j in s:
+                    continue
+                new = s[:m] + (j,) + s[m + 1:]
+                lo, hi = min(i, j), max(i, j)
+                sign = -1 if sum(lo < x < hi for x in s) % 2 else 1
+                out[:, index[tuple(sorted(new))], col] += sign * gens[:, j, i]
+    return out
+
+
+def _top(gens: np.ndarray, dim: int) -> np.ndarray:
+    """Restricts gens to the eigenspace of the largest Casimir eigenvalue,
+    which must have dimension `dim`"""
+    casimir = (gens @ gens).sum(axis=0)
+    values, vectors = np.linalg.eigh(casimir)
+    top = vectors[:, values > values[-1] - 1e-8 * max(1.0, abs(values[-1]))]
+    if top.shape[1] != dim:
+        raise ModelError("not the highest weight component of a product of fundamental weight irreps")
+    return top.conj().T @ gens @ top
+
+
+def _product(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    da, db = a.shape[1], b.shape[1]
+    return (np.einsum("aij,kl->aikjl", a, np.eye(db)).reshape(len(a), da * db, da * db)
+            + np.einsum("ij,akl->aikjl", np.eye(da), b).reshape(len(a), da * db, da * db))
+
+
+def _weight_basis(gens: np.ndarray, cartan: Sequence[int]) -> np.ndarray:
+    """Rotates an irrep into a basis diagonalizing the Cartan generators,
+    which keeps the tables sparse"""
+    if not cartan:
+        return gens
+    weights = np.sqrt(np.arange(2, len(cartan) + 2))  # generic, splits every distinct weight
+    h = np.einsum("c,cij->ij", weights, gens[list(cartan)])
+    _, vectors = np.linalg.eigh(h)
+    return vectors.conj().T @ gens @ vectors
+
+
+def _fund(gkey: GroupKey) -> np.ndarray:
+    return _generators.get((gkey, None), lambda: _fundamental(gkey))
+
+
+def _omega(gkey: GroupKey, k: int) -> np.ndarray:
+    """Irrep of the k-th fundamental weight, top component of the (k+1)-th antisymmetric power"""
+    fund = _fund(gkey)
+    if k == 0:
+        return fund
+    labels = tuple(int(i == k) for i in range(int(_algebra(registry.group(*gkey)).rank)))
+    dim = registry.dim(registry.group(*gkey), labels)
+    return _weight_basis(_top(_wedge(fund, k + 1), dim), _cartan(gkey))
+
+
+@timed("generator_matrices")
+def _build(gkey: GroupKey, labels: Labels) -> np.ndarray:
+    group = registry.group(*gkey)
+    fund = _fund(gkey)
+    if not any(labels):
+        return np.zeros((len(fund), 1, 1), dtype=complex)
+
+    fund_labels = tuple(int(i == 0) for i in range(len(labels)))
+    if registry.dim(group, fund_labels) != fund.shape[1]:
+        raise ModelError("the fundamental is not the first fundamental weight")
+    if labels == fund_labels:
+        return fund
+    if gkey[0] == "su" and labels == registry.conjugate(group, fund_labels):
+        return -fund.conj()
+
+    gens = None
+    current = [0] * len(labels)
+    for k, n in enumerate(labels):
+        for _ in range(n):
+            omega = _generators.get((gkey, ("omega", k)), lambda: _omega(gkey, k))
+            current[k] += 1
+            if gens is None:
+                gens = omega
+                continue
+            if gens.shape[1] * omega.shape[1] > _MAX_PRODUCT:
+                raise ModelError("too large to build")
+            gens = _top(_product(gens, omega), registry.dim(group, current))
+    return _weight_basis(gens, _cartan(gkey))
+
+
+def generator_matrices(group: Union[Group, LieAlgebra], irrep) -> np.ndarray:
+    """Hermitian generators of a Lie group irrep as an array of shape
+    (number of generators, dim, dim), normalized so that
+    Tr(T^a T^b) = T(R) delta^ab and T^a T^a = C2(R) with the indices of
+    `particlezoo.validations.irrep_indices`, eg T = 1/2 for the fundamental
+    of SU(N) and T = 1 for the vector of SO(N). Built once per
+    (group, irrep) and shared, treat the result as read only.
+
+    Args:
+        group (Union[Group, LieAlgebra]): The gauge group
+        irrep (Union[Matrix, Sequence[int], str]): Dynkin labels or irrep name
+
+    Raises:
+        ModelError: If the irrep is not reachable, eg SO(N) spinors or the exceptional groups
+
+    Examples
+    ========
+    >>> import numpy as np
+    >>> from liesym import SU
+    >>> from particlezoo.builders.covariant import generator_matrices
+    >>> T = generator_matrices(SU(2), [2])
+    >>> T.shape
+    (3, 3, 3)
+    >>> np.allclose(np.einsum("aij,aji->a", T, T), 2)
+    True
+    """
+    if isinstance(irrep, str):
+        irrep = registry.irrep(group, irrep)
+    gkey = group_key(group)
+    labels = tuple(int(x) for x in irrep)
+    try:
+        return _generators.get((gkey, labels), lambda: _build(gkey, labels))
+    except (ModelError, np.linalg.LinAlgError) as e:
+        raise ModelError(f"No generator matrices for irrep {list(labels)} of {group}: {e}") from e
+
+
+class SparseGenerators(NamedTuple):
+    """Non zero entries T^a_ij of the generators of one irrep.
+
+    Members:
+        generator (np.ndarray): Generator index a
+        row (np.ndarray): Row i
+        col (np.ndarray): Column j
+        value (np.ndarray): Complex entry
+    """
+    generator: np.ndarray
+    row: np.ndarray
+    col: np.ndarray
+    value: np.ndarray
+
+
+def _to_sparse(gens: np.ndarray) -> SparseGenerators:
+    a, i, j = np.nonzero(np.abs(gens) > _TOL)
+    return SparseGenerators(a, i, j, gens[a, i, j])
+
+
+def _anticommutators(gens: np.ndarray) -> Tuple[np.ndarray, np.ndarray, SparseGenerators]:
+    """Entries of T^a T^a and {T^a, T^b} for a < b, the symmetric part
+    of sum_ab A^a A^b T^a T^b. Returns (a, b, entries) with entries.generator
+    indexing the (a, b) pairs."""
+    n = len(gens)
+    a, b = np.triu_indices(n)
+    prods = gens[a] @ gens[b]
+    sym = np.where((a == b)[:, None, None], prods, prods + gens[b] @ gens[a])
+    return a, b, _to_sparse(sym)
+
+
+class GaugeVertices(NamedTuple):
+    """Sparse table of two matter, one gauge boson vertices, one row per
+    non zero generator entry. The vertex is g * value times the Lorentz
+    structure of the table, g the coupling of the symmetry.
+
+    Members:
+        field (np.ndarray): Index of the field
+        symmetry (np.ndarray): Index of the symmetry (gauge boson)
+        generator (np.ndarray): Generator index a of the gauge boson
+        row (np.ndarray): Component i of the barred or daggered field
+        col (np.ndarray): Component j of the field
+        value (np.ndarray): T^a_ij
+    """
+    field: np.ndarray
+    symmetry: np.ndarray
+    generator: np.ndarray
+    row: np.ndarray
+    col: np.ndarray
+    value: np.ndarray
+
+
+class QuarticVertices(NamedTuple):
+    """Sparse table of the two scalar, two gauge boson vertices. The vertex
+    is g_s g_t * value * A^a_mu A^{b,mu} phi^dagger phi.
+
+    For two bosons of the same symmetry (`symmetry == symmetry2`) the
+    value is ({T^a, T^b})_ij for a < b or (T^a T^a)_ij and `row2`, `col2`
+    are -1. For two different symmetries the value is 2 T^a_ij T^b_kl, i j
+    in the first symmetry's irrep and k l (`row2`, `col2`) in the second's.
+
+    Members:
+        field, symmetry, generator, row, col (np.ndarray): As `GaugeVertices`
+        symmetry2, generator2, row2, col2 (np.ndarray): The second gauge boson
+        value (np.ndarray): Coefficient
+    """
+    field: np.ndarray
+    symmetry: np.ndarray
+    generator: np.ndarray
+    row: np.ndarray
+    col: np.ndarray
+    symmetry2: np.ndarray
+    generator2: np.ndarray
+    row2: np.ndarray
+    col2: np.ndarray
+    value: np.ndarray
+
+
+class GaugeInteractions(NamedTuple):
+    """Every gauge interaction from the kinetic terms of a model.
+
+    Members:
+        fields (List[Field]): Fields indexed by the tables
+        symmetries (List[Symmetry]): Symmetries indexed by the tables
+        couplings (List[str]): Coupling of each symmetry, `g_{tag or name}` if not given
+        fermion (GaugeVertices): psibar gamma^mu A_mu psi vertices
+        scalar (GaugeVertices): i A_mu (phi^dagger d^mu phi - d^mu phi^dagger phi) vertices
+        quartic (QuarticVertices): A_mu A^mu phi^dagger phi vertices
+    """
+    fields: List[Field]
+    symmetries: List[Symmetry]
+    couplings: List[str]
+    fermion: GaugeVertices
+    scalar: GaugeVertices
+    quartic: QuarticVertices
+
+
+def _int(parts: List[np.ndarray]) -> np.ndarray:
+    return np.concatenate(parts).astype(np.intp) if parts else np.zeros(0, np.intp)
+
+
+def _complex(parts: List[np.ndarray]) -> np.ndarray:
+    return np.concatenate(parts).astype(complex) if parts else np.zeros(0, complex)
+
+
+class CovariantExpansion:
+    """Expands the covariant derivatives of matter kinetic terms into
+    sparse gauge vertex tables.
+
+    Only gauged Lie group and U(1) symmetries couple, Z(n) and global
+    symmetries are skipped. The sparse generator entries of each
+    (group, irrep) are shared process wide, fields are reduced to them
+    once per engine.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry
+    >>> from particlezoo.builders.covariant import CovariantExpansion
+    >>> syms = [Symmetry("SU2", SU(2), True, "g"), Symmetry("Y", U1(), True, "g'")]
+    >>> H = Field("H", "0", {"SU2": Representation(Matrix([[1]]), SU(2)),
+    ...                      "Y": Representation("1/2", U1())})
+    >>> out = CovariantExpansion(syms).expand([H])
+    >>> out.couplings
+    ['g', "g'"]
+    >>> len(out.fermion.value), len(out.scalar.value)
+    (0, 7)
+    >>> sorted(set(zip(out.quartic.symmetry, out.quartic.symmetry2)))
+    [(0, 0), (0, 1), (1, 1)]
+    """
+
+    def __init__(self, symmetries: Sequence[Symmetry]):
+        """Creates the engine for the symmetries of a model.
+
+        Args:
+            symmetries (Sequence[Symmetry]): Symmetries of the model, tables index into them
+        """
+        self.symmetries = list(symmetries)
+        self._index = {str(x.name): i for i, x in enumerate(self.symmetries)}
+        self._fields: Dict[Field, List[Tuple[int, str, tuple]]] = {}
+
+    def couplings(self) -> List[str]:
+        """Coupling name of each symmetry"""
+        return [x.coupling or f"g_{{{x.tag or x.name}}}" for x in self.symmetries]
+
+    def _couples(self, symmetry: Symmetry) -> bool:
+        return symmetry.is_gauged and not isinstance(symmetry.group, Z)
+
+    def _field_keys(self, field: Field) -> List[Tuple[int, str, tuple]]:
+        """(symmetry index, kind, cache key) of every non trivial gauged representation"""
+        keys = self._fields.get(field)
+        if keys is not None:
+            return keys
+        from ..validations.batch import rep_key
+
+        keys = []
+        for name, rep in field.representations.items():
+            i = self._index.get(name)
+            if i is None:
+                raise ModelError(f"The symmetry {name} is undefined.")
+            symmetry = self.symmetries[i]
+            if not self._couples(symmetry):
+                continue
+            key = rep_key(rep)
+            if isinstance(symmetry.group, U1):
+                if not isinstance(key, Fraction):
+                    raise ModelError(f"{field.name}: symbolic charge {key} has no numeric vertex")
+                if key:
+                    keys.append((i, "u1", (float(key),)))
+            elif any(key):
+                keys.append((i, "lie", (group_key(symmetry.group), key)))
+        self._fields[field] = keys
+        return keys
+
+    @staticmethod
+    def _dense(kind: str, key: tuple) -> np.ndarray:
+        if kind == "u1":
+            return np.full((1, 1, 1), key[0], dtype=complex)
+        gkey, labels = key
+        return generator_matrices(registry.group(*gkey), labels)
+
+    @classmethod
+    def _sparse(cls, kind: str, key: tuple) -> SparseGenerators:
+        return _sparse.get(("cubic", kind, key), lambda: _to_sparse(cls._dense(kind, key)))
+
+    @classmethod
+    def _sparse_quartic(cls, kind: str, key: tuple):
+        return _sparse.get(("quartic", kind, key), lambda: _anticommutators(cls._dense(kind, key)))
+
+    @timed("covariant_expansion")
+    def expand(self, fields: Sequence[Field]) -> GaugeInteractions:
+        """Builds the vertex tables of `fields`
+
+        Raises:
+            ModelError: If a field is in an irrep without generator matrices or has a symbolic charge
+        """
+        fields = list(fields)
+        cubic: Dict[bool, List[List[np.ndarray]]] = {
+            True: [[] for _ in GaugeVertices._fields], False: [[] for _ in GaugeVertices._fields]}
+        quartic: List[List[np.ndarray]] = [[] for _ in QuarticVertices._fields]
+
+        def extend(columns, *values):
+            n = len(values[-1])
+            for col, v in zip(columns, values):
+                col.append(np.broadcast_to(v, (n,)))
+
+        for f, field in enumerate(fields):
+            keys = self._field_keys(field)
+            sparse = [self._sparse(kind, key) for _, kind, key in keys]
+            for (s, _, _), t in zip(keys, sparse):
+                extend(cubic[field.is_fermion], f, s, t.generator, t.row, t.col, t.value)
+            if field.is_fermion:
+                continue
+
+            for x, (s, kind, key) in enumerate(keys):
+                a, b, t = self._sparse_quartic(kind, key)
+                extend(quartic, f, s, a[t.generator], t.row, t.col,
+                       s, b[t.generator], -1, -1, t.value)
+                for y in range(x + 1, len(keys)):
+                    u, v = sparse[x], sparse[y]
+                    p, q = (g.ravel() for g in np.meshgrid(
+                        np.arange(len(u.value)), np.arange(len(v.value)), indexing="ij"))
+                    extend(quartic, f, s, u.generator[p], u.row[p], u.col[p],
+                           keys[y][0], v.generator[q], v.row[q], v.col[q], 2 * u.value[p] * v.value[q])
+
+        def cubic_table(cols) -> GaugeVertices:
+            return GaugeVertices(*[_int(c) for c in cols[:-1]], _complex(cols[-1]))
+
+        return GaugeInteractions(
+            fields,
+            self.symmetries,
+            self.couplings(),
+            cubic_table(cubic[True]),
+            cubic_table(cubic[False]),
+            QuarticVertices(*[_int(c) for c in quartic[:-1]], _complex(quartic[-1])),
+        )
+
+
+def expand_covariant(fields: Sequence[Field], symmetries: Sequence[Symmetry]) -> GaugeInteractions:
+    """The gauge vertex tables of `fields` under `symmetries`, see `CovariantExpansion`"""
+    return CovariantExpansion(symmetries).expand(fields)
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from .models import Field, Symmetry, BaseModel
+from fractions import Fraction
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+from sympy import Add, Basic
+
+from .models import Field, Symmetry, BaseModel, KineticTerm
+from ..exceptions import ConfigError
+from ..instrumentation import timed
+
+if TYPE_CHECKING:
+    from .covariant import GaugeInteractions
+    from ..diagrams.vertices import VertexTable
+
+OperatorKey = Tuple[int, bool, int]
 
 
 class Lagrangian:
@@ -13,38 +26,274 @@ class Lagrangian:
                  version: str = None,
                  description: str = None
                  ):
-        self._particle_contents = particle_contents
-        self._symmetries = symmetries
+        self._particle_contents = list(particle_contents)
+        self._symmetries = list(symmetries)
         self._name = name
         self._version = version
         self._description = description
 
-    def _ke_terms(self, contents: list[BaseModel], **kwargs) -> list[str]:
+        # Derived data, kept up to date by the add/remove methods instead
+        # of being rebuilt on every change.
+        self._abelian: List[Symmetry] = []
+        self._nonabelian: List[Symmetry] = []
+        self._operators: Dict[OperatorKey, List[Tuple[Field, ...]]] = {}
+        self._revision = 0
+        self._gauge: Optional[Tuple[int, GaugeInteractions]] = None
+        self._vertices: Dict[Tuple[bool, int], Tuple[int, VertexTable]] = {}
+
+        # Lookup indexes: symmetries by name and tag, fields by name and
+        # the fields carrying a non trivial representation of each symmetry.
+        self._sym_names: Dict[str, Symmetry] = {}
+        self._sym_tags: Dict[str, Symmetry] = {}
+        self._field_names: Dict[str, Field] = {}
+        self._charged: Dict[str, List[Field]] = {}
+        for x in self._symmetries:
+            self._index_symmetry(x)
+        for x in self._particle_contents:
+            self._index_field(x)
+
+    def _ke_terms(self, contents: list[BaseModel]) -> list[KineticTerm]:
         ke = []
         for x in contents:
-            k = x.kinetic_term(**kwargs)
+            k = x.kinetic()
             if k:
                 ke.append(k)
         return ke
 
-    def kinetic_term(self, as_latex=True, **kwargs):
+    def kinetic_terms(self) -> List[KineticTerm]:
+        """The structured kinetic terms, fields first then gauge symmetries.
+        Each term is memoized on its field or symmetry."""
+        return self._ke_terms(self._particle_contents) + self._ke_terms(self._symmetries)
+
+    @timed("kinetic_term")
+    def kinetic_term(self, as_latex=True, **kwargs) -> Union[str, Basic]:
         """Returns the latex string for the complete
-        kinetic energy term."""
-        ke = self._ke_terms(self._particle_contents, as_latex=as_latex)
-        fields = " + ".join(ke) if len(ke) > 1 else ke[0]
-        
-        ke = self._ke_terms(self._symmetries, as_latex=as_latex)
-        gauge = " ".join(ke)
+        kinetic energy term, or the sympy expression if not `as_latex`."""
+        fields = self._ke_terms(self._particle_contents)
+        gauge = self._ke_terms(self._symmetries)
+        if not as_latex:
+            return Add(*[x.expr for x in fields + gauge])
+
+        return " + ".join(x.latex for x in fields) + " " + " ".join(x.latex for x in gauge)
+
+    def gauge_interactions(self) -> GaugeInteractions:
+        """The gauge vertices from expanding the covariant derivative of
+        every matter kinetic term, as sparse tables indexing
+        `particle_contents` and `symmetries`. Kept until the model changes.
+        See `particlezoo.builders.covariant`.
+        """
+        if self._gauge is None or self._gauge[0] != self._revision:
+            from .covariant import expand_covariant
+            self._gauge = (self._revision, expand_covariant(self._particle_contents, self._symmetries))
+        return self._gauge[1]
 
-        return fields + " " + gauge
+    def vertices(self, operators: bool = True, max_dim: int = 4) -> VertexTable:
+        """The Feynman rules of the model as a columnar vertex table, with
+        the gauge vertices and (optionally) one vertex per invariant operator
+        of three or more fields. Kept until the model changes.
+        See `particlezoo.diagrams.vertices`.
+        """
+        key = (operators, max_dim)
+        cached = self._vertices.get(key)
+        if cached is None or cached[0] != self._revision:
+            from ..diagrams.vertices import extract_vertices
+            cached = self._vertices[key] = (self._revision, extract_vertices(self, operators, max_dim))
+        return cached[1]
+
+    @property
+    def name(self) -> str:
+        """Name of the model"""
+        return self._name
+
+    @property
+    def version(self) -> str:
+        """Version of the model"""
+        return self._version
+
+    @property
+    def description(self) -> str:
+        """Description of the model"""
+        return self._description
+
+    @property
+    def particle_contents(self) -> list[Field]:
+        """The fields of the model"""
+        return self._particle_contents
+
+    @property
+    def symmetries(self) -> list[Symmetry]:
+        """The symmetries of the model"""
+        return self._symmetries
 
     @property
     def abelian_symmetries(self):
-        return [x for x in self._symmetries if x.is_abelian]
+        return self._abelian
 
     @property
     def nonabelian_symmetries(self):
-        return [x for x in self._symmetries if not x.is_abelian]
+        return self._nonabelian
+
+    def _index_symmetry(self, symmetry: Symmetry):
+        self._sym_names[str(symmetry.name)] = symmetry
+        if symmetry.tag:
+            self._sym_tags.setdefault(str(symmetry.tag), symmetry)
+        (self._abelian if symmetry.is_abelian else self._nonabelian).append(symmetry)
+        self._charged.setdefault(str(symmetry.name), [])
+
+    def _index_field(self, field: Field):
+        from ..validations.batch import rep_key
+
+        self._field_names[field._raw_name] = field
+        self._field_names.setdefault(str(field.name), field)
+        for k, v in field.representations.items():
+            key = rep_key(v)
+            # singlets have all zero Dynkin labels, zero charge or Z_0
+            if any(key) if isinstance(key, tuple) else key != 0:
+                self._charged.setdefault(k, []).append(field)
+
+    def _unindex_field(self, field: Field):
+        for k in (field._raw_name, str(field.name)):
+            if self._field_names.get(k) is field:
+                del self._field_names[k]
+        for k in field.representations:
+            charged = self._charged.get(k, [])
+            if field in charged:
+                charged.remove(field)
+
+    def symmetry(self, name: str) -> Symmetry:
+        """Looks up a symmetry by its name or tag
+
+        Raises:
+            ValueError: If no symmetry has that name or tag
+        """
+        sym = self._sym_names.get(name) or self._sym_tags.get(name)
+        if sym is None:
+            raise ValueError("Cannot find symmetry.")
+        return sym
+
+    def field(self, name: str) -> Field:
+        """Looks up a field by its name
+
+        Raises:
+            ValueError: If no field has that name
+        """
+        field = self._field_names.get(name)
+        if field is None:
+            raise ValueError("Cannot find field.")
+        return field
+
+    def charged_fields(self, symmetry: Union[Symmetry, str]) -> List[Field]:
+        """The fields in a non trivial representation of the symmetry
+        (given by instance, name or tag), in the order they were added.
+        """
+        sym = self.symmetry(symmetry if isinstance(symmetry, str) else str(symmetry.name))
+        return list(self._charged[str(sym.name)])
+
+    def add_field(self, field: Field):
+        """Adds a field, updating the derived data in place.
+
+        Operator sets already enumerated are extended with only the new
+        operators that contain the field (or its conjugate).
+
+        Raises:
+            ValueError: If a field with the same name exists
+            ConfigError: If the field is charged under an undefined symmetry
+        """
+        if field._raw_name in self._field_names or str(field.name) in self._field_names:
+            raise ValueError(f"Field {field.name} already exists.")
+        for k in field.representations:
+            if k not in self._sym_names:
+                raise ConfigError(f"The symmetry {k} is undefined.")
+
+        self._particle_contents.append(field)
+        self._index_field(field)
+        self._revision += 1
+        if self._operators:
+            from ..validations.operators import operators_containing
+            for key, ops in self._operators.items():
+                max_dim, conjugates, min_fields = key
+                ops.extend(operators_containing(
+                    self, field, max_dim, None, conjugates=conjugates, min_fields=min_fields))
+
+    def remove_field(self, field: Union[Field, str]):
+        """Removes a field (or the field with that name) and every
+        enumerated operator containing it.
+
+        Raises:
+            ValueError: If no such field exists
+        """
+        field = self._get_field(field)
+        self._particle_contents.remove(field)
+        self._unindex_field(field)
+        self._revision += 1
+
+        gone = {field, field.conjugate()}
+        for key, ops in self._operators.items():
+            self._operators[key] = [op for op in ops if gone.isdisjoint(op)]
+
+    def add_symmetry(self, symmetry: Symmetry):
+        """Adds a symmetry. Existing fields are singlets of it, so the
+        enumerated operators stay valid and only the symmetry's own
+        kinetic term and the abelian split change.
+
+        Raises:
+            ValueError: If a symmetry with the same name exists
+        """
+        if str(symmetry.name) in self._sym_names:
+            raise ValueError(f"Symmetry {symmetry.name} already exists.")
+        self._symmetries.append(symmetry)
+        self._index_symmetry(symmetry)
+        self._revision += 1
+
+    def operators(self, max_dim: int = 4, renormalizability=None, **kwargs) -> Iterator[Tuple[Field, ...]]:
+        """Lazily yields every gauge invariant field multiset up to
+        mass dimension `max_dim`. See
+        `particlezoo.validations.enumerate_operators` for the options.
+
+        A fully consumed enumeration is kept, later calls with the same
+        `max_dim`, `conjugates` and `min_fields` are served from it and
+        `add_field`/`remove_field` update it incrementally.
+        """
+        key = (max_dim, kwargs.get("conjugates", True), kwargs.get("min_fields", 2))
+        cached = self._operators.get(key)
+        if cached is not None:
+            return self._with_class(iter(list(cached)), renormalizability)
+        return self._with_class(self._enumerate(key, **kwargs), renormalizability)
+
+    def _enumerate(self, key: OperatorKey, **kwargs) -> Iterator[Tuple[Field, ...]]:
+        from ..validations.operators import enumerate_operators
+
+        revision = self._revision
+        found = []
+        for op in enumerate_operators(self, key[0], None, **kwargs):
+            found.append(op)
+            yield op
+        if revision == self._revision:  # not changed while iterating
+            self._operators[key] = found
+
+    def anomalies(self) -> Dict[str, Fraction]:
+        """Every gauge anomaly coefficient of the fermions, by condition
+        name (eg `Y^3`, `Y grav^2`, `Y L^2`, `c^3`). See
+        `particlezoo.validations.AnomalyChecker`.
+        """
+        from ..validations.anomalies import anomalies
+        return anomalies(self)
+
+    def is_anomaly_free(self) -> bool:
+        """Whether every gauge anomaly cancels"""
+        return not any(self.anomalies().values())
+
+    @staticmethod
+    def _with_class(ops: Iterator[Tuple[Field, ...]], renormalizability) -> Iterator[Tuple[Field, ...]]:
+        from ..validations.global_invariance import validate_mass_dim
+
+        for op in ops:
+            if renormalizability is None or validate_mass_dim(op) == renormalizability:
+                yield op
+
+    def _get_field(self, field: Union[Field, str]) -> Field:
+        """Utility lookup for getting a field by instance or name"""
+        return self.field(field if isinstance(field, str) else field._raw_name)
 
     def _build_graphs(self, field: Field):
         ke_graphs = self._build_ke_graphs(field)
@@ -62,7 +311,7 @@ class Lagrangian:
 
     def _get_sym(self, name: str):
         """Utility lookup for getting symmetry"""
-        for i in self._symmetries:
-            if i == name:
-                return i
-        raise ValueError("Cannot find symmetry.")
\ No newline at end of file
+        sym = self._sym_names.get(name)
+        if sym is None:
+            raise ValueError("Cannot find symmetry.")
+        return sym
\ No newline at end of file
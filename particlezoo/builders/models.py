@@ -1,13 +1,52 @@
-from sympy import Symbol, Basic, sympify, Matrix, latex, I, conjugate, symbols
+from sympy import Symbol, Basic, sympify, Matrix, latex, I, conjugate, adjoint, symbols, Mul
 from sympy.physics.quantum import Dagger
 from sympy.tensor.tensor import TensorIndexType, TensorIndex, TensorHead
-from typing import Dict, Union, Optional
-from liesym import Group, LieGroup, E
+from typing import Dict, NamedTuple, Union, Optional, Tuple
+from liesym import Group, LieGroup, LieAlgebra, U1, Z, E
 
 
 from ..exceptions import ModelError
 
 
+# Shared by every kinetic term, building a TensorIndexType is expensive
+LORENTZ = TensorIndexType("Lorentz", dummy_name="L", dim=4)
+MU = TensorIndex("mu", LORENTZ)
+NU = TensorIndex("nu", LORENTZ)
+
+_D_CO, _D_CONTRA = symbols("D_mu"), symbols("D^mu")
+_PARTIAL_CO, _PARTIAL_CONTRA = symbols("\\partial_mu"), symbols("\\partial^mu")
+_GAMMA = symbols("\\gamma^mu")
+_QUARTER = sympify("-1/4")
+_LATEX = {x: latex(x) for x in (_D_CO, _D_CONTRA, _PARTIAL_CO, _PARTIAL_CONTRA, _GAMMA, I, _QUARTER)}
+_ADJOINT = {x: Dagger(x) for x in (_D_CO, _PARTIAL_CO)}
+_PLAIN = Symbol("x").assumptions0
+
+
+def _is_plain(name: Basic) -> bool:
+    """Whether name is a Symbol without assumptions. Its adjoint and
+    conjugate can not simplify, so they are built without sympy asking
+    the (slow on a new symbol) assumption system."""
+    return type(name) is Symbol and name.assumptions0 == _PLAIN
+
+
+class KineticTerm(NamedTuple):
+    """Structured kinetic term of a single field or gauge symmetry.
+
+    Members:
+        source (BaseModel): The field or symmetry the term belongs to
+        pieces (Tuple[Basic, ...]): Factors of the term, in writing order
+        latex (str): Latex of the term, the pieces rendered and joined
+    """
+    source: "BaseModel"
+    pieces: Tuple[Basic, ...]
+    latex: str
+
+    @property
+    def expr(self) -> Basic:
+        """The pieces multiplied into a single expression"""
+        return Mul(*self.pieces)
+
+
 class BaseModel(Basic):
 
     def __new__(cls, name, description=None):
@@ -107,8 +146,8 @@ class Symmetry(BaseModel):
 
     @property
     def is_abelian(self) -> bool:
-        # For now this filter works
-        return not (isinstance(self.group, LieGroup) and self.group.dimension > 1)
+        """Whether the group is U(1) or Z(n), the E series is only an algebra"""
+        return isinstance(self.group, (U1, Z))
 
     @property
     def tag(self) -> Optional[str]:
@@ -132,15 +171,22 @@ class Symmetry(BaseModel):
 
     def _kinetic_term(self):
         """Returns tuple of factor, contra and covariant terms"""
-
-        Lorentz = TensorIndexType("Lorentz", dummy_name="L", dim=4)
-        mu = TensorIndex("mu", Lorentz)
-        nu = TensorIndex("nu", Lorentz)
-        A = TensorHead(self.gauge_name, [Lorentz, Lorentz])
-        contravariant = A(mu, nu)
-        covariant = A(-mu, -nu)
-        factor = sympify("-1/4")
-        return factor, contravariant, covariant
+        A = TensorHead(self.gauge_name, [LORENTZ, LORENTZ])
+        contravariant = A(MU, NU)
+        covariant = A(-MU, -NU)
+        return _QUARTER, contravariant, covariant
+
+    def kinetic(self) -> Optional[KineticTerm]:
+        """The structured kinetic term, None for a global symmetry.
+        Built once and memoized on the symmetry."""
+        if not self.is_gauged:
+            return None
+        term = getattr(self, "_kinetic", None)
+        if term is None:
+            fac, contra, co = self._kinetic_term()
+            term = KineticTerm(self, (fac, contra, co), _LATEX[fac] + latex(contra) + latex(co))
+            self._kinetic = term
+        return term
 
     def kinetic_term(self, as_latex=True, **kwargs) -> Union[str, Basic]:
         """Returns the kinetic term for the gauge symmetry.
@@ -151,17 +197,12 @@ class Symmetry(BaseModel):
         Returns:
             Union[str, Basic]: Latex string or tensor expr
         """
-        if not self.is_gauged:
+        term = self.kinetic()
+        if term is None:
             return None
-        fac, contra, co = self._kinetic_term()
-
         if as_latex:
-            fac_tex = latex(fac)
-            contra_tex = latex(contra)
-            co_tex = latex(co)
-
-            return fac_tex + contra_tex + co_tex
-        return fac * contra * co
+            return term.latex
+        return term.expr
 
     def __hash__(self):
         return self.name.__hash__()
@@ -284,20 +325,48 @@ class Field(BaseModel):
         Returns:
             Union[str, Basic]: Returns a str or tensor expr
         """
-        deriv_co = symbols("\partial_mu")
-        deriv_contra = symbols("\partial^mu")
-        if compact:
-            deriv_co = symbols("D_mu")
-            deriv_contra = symbols("D^mu")
+        term = self.kinetic(compact)
+        if as_latex:
+            return term.latex
+        return term.expr
 
+    def kinetic(self, compact: bool = True) -> KineticTerm:
+        """The structured kinetic term, built once per `compact` flag
+        and memoized on the field.
+
+        Examples
+        ========
+        >>> from particlezoo import Field
+        >>> psi = Field("psi", "1/2", {})
+        >>> psi.kinetic().latex
+        'i\\\\overline{\\\\psi}D_{\\\\mu}\\\\gamma^{\\\\mu}\\\\psi'
+        >>> psi.kinetic() is psi.kinetic()
+        True
+        """
+        cache = getattr(self, "_kinetic", None)
+        if cache is None:
+            cache = self._kinetic = {}
+        term = cache.get(compact)
+        if term is not None:
+            return term
+
+        deriv_co, deriv_contra = (_D_CO, _D_CONTRA) if compact else (_PARTIAL_CO, _PARTIAL_CONTRA)
+        name_tex = latex(self.name)
+        plain = _is_plain(self.name)
         if self.is_boson:
-            terms = Dagger(deriv_co*self.name), deriv_contra, self.name
-            return "".join([latex(x) for x in terms])
+            if plain:  # same expression Dagger gives, adjoint of each factor
+                dagger = Mul(_ADJOINT[deriv_co], adjoint(self.name, evaluate=False))
+            else:
+                dagger = Dagger(deriv_co * self.name)
+            pieces: Tuple[Basic, ...] = (dagger, deriv_contra, self.name)
+            tex = latex(dagger) + _LATEX[deriv_contra] + name_tex
         else:
-            terms = I, conjugate(self.name),  deriv_co, symbols(  # type:ignore
-                "\gamma^mu"), self.name
-            return "".join([latex(x) for x in terms])
-        # return ""
+            bar = conjugate(self.name, evaluate=not plain)
+            bar_tex = "\\overline{" + name_tex + "}" if plain else latex(bar)
+            pieces = (I, bar, deriv_co, _GAMMA, self.name)  # type:ignore
+            tex = _LATEX[I] + bar_tex + _LATEX[deriv_co] + _LATEX[_GAMMA] + name_tex
+        term = cache[compact] = KineticTerm(self, pieces, tex)
+        return term
 
     def _kinetic_term(self, mode='symbol', **kwargs) -> Union[str, Basic]:
         if mode not in ['symbol', 'latex', 'diagram', 'diagram-compile']:
@@ -332,6 +401,39 @@ class Field(BaseModel):
         else:
             return conjugate(self.name)
 
+    def conjugate(self) -> "Field":
+        """Returns the conjugate field, named after `conjugate_name`,
+        with every representation conjugated. Conjugating twice
+        returns the original instance.
+
+        Examples
+        ========
+        >>> from liesym import U1
+        >>> from particlezoo import Field, Representation
+        >>> H = Field("H", "0", {"Y": Representation("1/2", U1())})
+        >>> Hc = H.conjugate()
+        >>> Hc.name, Hc.representations["Y"].rep
+        (H^{\\dagger}, -1/2)
+        >>> Hc.conjugate() is H
+        True
+        """
+        conj = getattr(self, "_conjugate", None)
+        if conj is not None:
+            return conj
+
+        reps = {k: Representation(_conjugate_rep(v.rep, v.group), v.group)
+                for k, v in self.representations.items()}
+        conj = Field(
+            latex(self.conjugate_name),
+            self.spin,
+            reps,
+            description=self.description,
+            no_mass=self.no_mass
+        )
+        conj._conjugate = self
+        self._conjugate = conj
+        return conj
+
     def __hash__(self):
         return self.name.__hash__()
 
@@ -339,3 +441,19 @@ class Field(BaseModel):
         if isinstance(other, Field):
             return self.__hash__() == other.__hash__()
         return False
+
+
+def _conjugate_rep(rep, group):
+    """Conjugate of a single representation under group"""
+    if isinstance(group, (LieGroup, LieAlgebra)):
+        if isinstance(rep, (str, Symbol)):
+            rep = group.irrep_lookup(str(rep))
+        algebra = group.algebra if isinstance(group, LieGroup) else group
+        return algebra.conjugate(rep)
+    if isinstance(group, U1):
+        return -sympify(rep)
+    if isinstance(group, Z):
+        n = int(group.dimension)
+        k = int(str(rep).replace("Z_", ""))
+        return Symbol(f"Z_{(n - k) % n}")
+    raise ModelError(f"Cannot conjugate representation of {group}")
@@ -1,10 +1,339 @@
+"""Renormalization group equations of the gauge couplings.
+
+With t = ln(mu) the gauge couplings run as
+
+    dg_i/dt = g_i^3 / (16 pi^2) [b_i + sum_j b_ij g_j^2 / (16 pi^2)]
+
+    b_i  = -11/3 C2(G_i) + 2/3 sum_F kappa_F S_i(F) + 1/3 sum_S eta_S S_i(S)
+    b_ij = delta_ij [-34/3 C2(G_i)^2 + 10/3 C2(G_i) sum_F kappa_F S_i(F) + 2/3 C2(G_i) sum_S eta_S S_i(S)]
+           + 2 sum_F kappa_F S_i(F) C2_j(F) + 4 sum_S eta_S S_i(S) C2_j(S)
+
+S_i(X) is the Dynkin index of X under G_i times its number of components
+under the other groups, C2 a quadratic Casimir. A U(1) has C2(G) = 0 and
+S = C2 = (normalized charge)^2. kappa is 1 for a Weyl and 2 for a Dirac
+fermion, eta is 1 for a complex and 1/2 for a real scalar. Yukawa and
+scalar quartic contributions at two loops are not included.
+
+`RGE.run` integrates the system for a whole batch of initial conditions
+with a fixed step Runge-Kutta in t, one array operation per stage. A
+field with a mass only contributes above it, its rows of the coefficients
+are switched on and off by a mask, the couplings themselves are continuous
+at one loop. Masses shared by every point are steps of the grid and are
+exact, masses that differ per point are resolved to the step size.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from math import ceil
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from liesym import LieAlgebra, LieGroup, U1
+
 from .lagrangian import Lagrangian
+from .models import Field, Symmetry
+from ..exceptions import ModelError
+
+
+class BetaCoefficients(NamedTuple):
+    """Numeric gauge beta function coefficients.
+
+    Members:
+        names (List[str]): Gauged symmetry of each coupling
+        b1 (np.ndarray): One loop coefficients b_i, shape (n,)
+        b2 (np.ndarray): Two loop coefficients b_ij, shape (n, n)
+    """
+    names: List[str]
+    b1: np.ndarray
+    b2: np.ndarray
+
+
+class RunningCouplings(NamedTuple):
+    """Gauge couplings evaluated at the requested scales.
+
+    Members:
+        names (List[str]): Gauged symmetry of each coupling
+        scales (np.ndarray): Renormalization scales mu, shape (n_scales,)
+        couplings (np.ndarray): Couplings, shape (n_scales, n_points, n), or (n_scales, n) for a single point
+    """
+    names: List[str]
+    scales: np.ndarray
+    couplings: np.ndarray
 
 
 class RGE:
+    """Gauge coupling RGEs of a Lagrangian.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+    >>> from particlezoo.builders import RGE
+    >>> su3 = SU(3)
+    >>> q = Field("q", "1/2", {"c": Representation(Matrix([[1, 0]]), su3)})
+    >>> rge = RGE(Lagrangian([q], [Symmetry("c", su3, True, "g_s")], "QCD"), dirac=["q"])
+    >>> rge.coefficients().b1
+    array([-10.33333333])
+    >>> rge._gauge_beta_func("c")
+    (Fraction(-31, 3), {'c': Fraction(-268, 3)})
+    """
 
-    def __init__(self, lagrangian: Lagrangian):
+    def __init__(self,
+                 lagrangian: Lagrangian,
+                 dirac: Iterable[str] = (),
+                 real: Iterable[str] = (),
+                 normalization: Optional[Mapping[str, Union[int, str, Fraction]]] = None):
+        """Collects the group theory data of every gauged symmetry.
+
+        Args:
+            lagrangian (Lagrangian): The model
+            dirac (Iterable[str], optional): Names of spin 1/2 fields that are Dirac, the rest are Weyl.
+            real (Iterable[str], optional): Names of spin 0 fields that are real, the rest are complex.
+            normalization (Mapping[str, Fraction], optional): Factor multiplying the squared charges
+                of a U(1), eg 3/5 for GUT normalized hypercharge. Defaults to 1.
+        """
         self.lagrangian = lagrangian
+        self.dirac = {str(x) for x in dirac}
+        self.real = {str(x) for x in real}
+        self.normalization = {k: Fraction(v) for k, v in (normalization or {}).items()}
+        self.symmetries: List[Symmetry] = [
+            x for x in lagrangian.symmetries
+            if x.is_gauged and isinstance(x.group, (U1, LieGroup, LieAlgebra))]
+        self._names = [str(x.name) for x in self.symmetries]
+        self._exact: Dict[str, Tuple[Fraction, Dict[str, Fraction]]] = {}
+        self._coefficients: Optional[BetaCoefficients] = None
+        self._table: Optional[Tuple[BetaCoefficients, np.ndarray, np.ndarray]] = None
+
+    def _field_data(self, field: Field) -> Tuple[int, Dict[str, Tuple[Fraction, Fraction]]]:
+        """Number of components of field and (S, C2) under each gauged symmetry,
+        S not yet multiplied by the components under the other groups"""
+        from ..validations.anomalies import irrep_indices
+        from ..validations.batch import rep_key
+
+        dim = 1
+        data: Dict[str, Tuple[Fraction, Fraction]] = {}
+        for name, obj in field.representations.items():
+            key = rep_key(obj)
+            if isinstance(obj.group, U1):
+                if not isinstance(key, Fraction):
+                    raise ModelError(f"{field.name}: symbolic charge {key} has no beta function")
+                q2 = key * key * self.normalization.get(name, Fraction(1))
+                data[name] = (q2, q2)
+            elif isinstance(obj.group, (LieGroup, LieAlgebra)) and any(key):
+                indices = irrep_indices(obj.group, key)
+                dim *= indices.dim
+                data[name] = (indices.dynkin / indices.dim, indices.casimir)
+        return dim, data
+
+    def _weight(self, field: Field) -> Fraction:
+        """kappa for fermions and eta for scalars, on top of the 2/3 and 1/3 of the one loop term"""
+        if field.is_fermion:
+            return Fraction(2 if str(field._raw_name) in self.dirac else 1)
+        return Fraction(1, 2) if str(field._raw_name) in self.real else Fraction(1)
+
+    def _adjoint_casimir(self, symmetry: Symmetry) -> Fraction:
+        """C2(G), the Casimir of the adjoint whose highest weight is the highest root"""
+        from ..registry import group_key
+        from ..validations.anomalies import irrep_indices
+        from ..validations.decomposition import decompositions
+
+        if isinstance(symmetry.group, U1):
+            return Fraction(0)
+        gkey = group_key(symmetry.group)
+        data = decompositions._data(gkey)
+        theta = max((r for r in data.positive if min(r) >= 0), key=lambda r: data.dot(r, r))
+        return irrep_indices(gkey, theta).casimir
+
+    def _field_terms(self, key: str, cg: Fraction, field: Field) -> Tuple[Fraction, Dict[str, Fraction]]:
+        """Contribution of one field to b_i and to the row b_ij of the symmetry named key"""
+        dim, data = self._field_data(field)
+        row: Dict[str, Fraction] = {}
+        if key not in data:
+            return Fraction(0), row
+        s = data[key][0] * dim * self._weight(field)
+        if field.is_fermion:
+            b1, row[key], mixed = Fraction(2, 3) * s, Fraction(10, 3) * cg * s, 2 * s
+        else:
+            b1, row[key], mixed = Fraction(1, 3) * s, Fraction(2, 3) * cg * s, 4 * s
+        for name, (_, casimir) in data.items():
+            if name in self._names:
+                row[name] = row.get(name, Fraction(0)) + mixed * casimir
+        return b1, row
+
+    def _gauge_beta_func(self, key: str) -> Tuple[Fraction, Dict[str, Fraction]]:
+        """Exact one loop coefficient b_i and two loop row b_ij of the gauged
+        symmetry named key, see the module docs.
+
+        Raises:
+            ValueError: If key is not a gauged symmetry of the model
+            ModelError: If a charge under a gauged U(1) is symbolic
+        """
+        if key in self._exact:
+            return self._exact[key]
+        if key not in self._names:
+            raise ValueError(f"{key} is not a gauged symmetry.")
+
+        cg = self._adjoint_casimir(self.symmetries[self._names.index(key)])
+        b1 = Fraction(-11, 3) * cg
+        row = {name: Fraction(0) for name in self._names}
+        row[key] = Fraction(-34, 3) * cg * cg
+        for field in self.lagrangian.particle_contents:
+            b, terms = self._field_terms(key, cg, field)
+            b1 += b
+            for name, value in terms.items():
+                row[name] += value
+
+        self._exact[key] = (b1, row)
+        return b1, row
+
+    def _split(self) -> Tuple[BetaCoefficients, np.ndarray, np.ndarray]:
+        """Gauge boson part of the coefficients, plus the contribution of each
+        field, shapes (n_fields, n) and (n_fields, n, n), so that thresholds only
+        switch rows on and off"""
+        if self._table is None:
+            fields = self.lagrangian.particle_contents
+            n, f = len(self._names), len(fields)
+            b1, b2 = np.zeros(n), np.zeros((n, n))
+            fb1, fb2 = np.zeros((f, n)), np.zeros((f, n, n))
+            for i, key in enumerate(self._names):
+                cg = self._adjoint_casimir(self.symmetries[i])
+                b1[i], b2[i, i] = float(Fraction(-11, 3) * cg), float(Fraction(-34, 3) * cg * cg)
+                for k, field in enumerate(fields):
+                    b, terms = self._field_terms(key, cg, field)
+                    fb1[k, i] = float(b)
+                    for name, value in terms.items():
+                        fb2[k, i, self._names.index(name)] = float(value)
+            self._table = (BetaCoefficients(list(self._names), b1, b2), fb1, fb2)
+        return self._table
+
+    def coefficients(self) -> BetaCoefficients:
+        """Numeric b_i and b_ij of every gauged symmetry, computed once"""
+        if self._coefficients is None:
+            rows = [self._gauge_beta_func(name) for name in self._names]
+            b1 = np.array([float(b) for b, _ in rows], dtype=float)
+            b2 = np.array([[float(row[j]) for j in self._names] for _, row in rows], dtype=float)
+            self._coefficients = BetaCoefficients(list(self._names), b1, b2.reshape(len(rows), len(rows)))
+        return self._coefficients
+
+    def beta(self, g: np.ndarray, loops: int = 2) -> np.ndarray:
+        """dg/dt for an array of couplings of shape (..., n), in the order of `coefficients().names`"""
+        c = self.coefficients()
+        g = np.asarray(g, dtype=float)
+        loop = 1 / (16 * np.pi ** 2)
+        inner = c.b1 if loops < 2 else c.b1 + loop * (g * g) @ c.b2.T
+        return loop * g ** 3 * inner
+
+    def _log_masses(self, masses: Optional[Mapping[str, Union[float, np.ndarray]]],
+                    points: int) -> Tuple[np.ndarray, List[int], np.ndarray]:
+        """ln of the masses shared by every point, one per field and -inf if
+        massless, then the fields whose mass varies and those per point masses,
+        shape (n_varying, n_points)"""
+        fields = self.lagrangian.particle_contents
+        shared = np.full(len(fields), -np.inf)
+        index, varying = [], []
+        for name, mass in (masses or {}).items():
+            k = fields.index(self.lagrangian.field(name))
+            mass = np.asarray(mass, dtype=float)
+            if mass.ndim == 0:
+                shared[k] = np.log(mass)
+            elif mass.shape == (points,):
+                index.append(k)
+                varying.append(np.log(mass))
+            else:
+                raise ValueError(f"Mass of {name} has shape {mass.shape}, expected ({points},)")
+        return shared, index, np.array(varying).reshape(len(index), points)
+
+    def run(self,
+            g0: np.ndarray,
+            scales: Iterable[float],
+            mu0: float = 91.1876,
+            masses: Optional[Mapping[str, Union[float, np.ndarray]]] = None,
+            loops: int = 2,
+            step: float = 0.1) -> RunningCouplings:
+        """Runs the gauge couplings of a batch of points from mu0 to each scale.
+
+        Args:
+            g0 (np.ndarray): Couplings at mu0, shape (n_points, n) or (n,), in the order of `coefficients().names`
+            scales (Iterable[float]): Scales to return the couplings at, above or below mu0. Nothing else is stored.
+            mu0 (float, optional): Scale of g0. Defaults to the Z mass in GeV.
+            masses (Mapping[str, Union[float, np.ndarray]], optional): Threshold of a field by name, one mass
+                or one per point. Fields without one are active at every scale.
+            loops (int, optional): 1 or 2. Defaults to 2.
+            step (float, optional): Largest step in ln(mu). Defaults to 0.1.
+
+        Raises:
+            ValueError: If a field is unknown or a shape does not match
+
+        Examples
+        ========
+        >>> import numpy as np
+        >>> from liesym import U1
+        >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+        >>> from particlezoo.builders import RGE
+        >>> u1 = U1()
+        >>> e = Field("e", "1/2", {"Q": Representation("-1", u1)})
+        >>> rge = RGE(Lagrangian([e], [Symmetry("Q", u1, True, "e")], "QED"), dirac=["e"])
+        >>> out = rge.run([[0.30], [0.31]], [1e3], mu0=1.0, masses={"e": 1e2}, loops=1)
+        >>> out.couplings.shape
+        (1, 2, 1)
+        >>> b = rge.coefficients().b1[0]
+        >>> exact = (0.30 ** -2 - b * np.log(1e3 / 1e2) / (8 * np.pi ** 2)) ** -0.5
+        >>> bool(np.isclose(out.couplings[0, 0, 0], exact))
+        True
+        """
+        base, fb1, fb2 = self._split()
+        g0 = np.asarray(g0, dtype=float)
+        single = g0.ndim == 1
+        g0 = np.atleast_2d(g0)
+        if g0.shape[1] != len(base.names):
+            raise ValueError(f"Expected {len(base.names)} couplings per point, got {g0.shape[1]}")
+        scales = np.asarray(list(scales), dtype=float)
+        shared, index, varying = self._log_masses(masses, len(g0))
+        static = np.ones(len(shared), dtype=bool)
+        static[index] = False
+        vb1, vb2 = fb1[index], fb2[index]
+        loop = 1 / (16 * np.pi ** 2)
+
+        # couplings are kept as (n, n_points) so each one is contiguous
+        def rhs(g: np.ndarray, t: float, b1: np.ndarray, b2: np.ndarray) -> np.ndarray:
+            g2 = g * g
+            inner = b1[:, None] + loop * (b2 @ g2) if loops > 1 else b1[:, None]
+            for v in range(len(index)):
+                active = t > varying[v]
+                term = vb1[v][:, None] + loop * (vb2[v] @ g2) if loops > 1 else vb1[v][:, None]
+                inner = inner + active * term
+            return loop * g ** 3 * inner
 
-    def _gauge_beta_func(self, key: str):
-        pass
\ No newline at end of file
+        t0 = float(np.log(mu0))
+        targets = np.log(scales)
+        out = np.empty((len(scales), g0.shape[1], len(g0)))
+        for sign in (1, -1):
+            order = [i for i in np.argsort(sign * targets, kind="stable")
+                     if sign * (targets[i] - t0) > 0 or (sign > 0 and targets[i] == t0)]
+            if not order:
+                continue
+            end = targets[order[-1]]
+            thresholds = {x for x in shared[np.isfinite(shared)] if sign * (x - t0) > 0 > sign * (x - end)}
+            stops = sorted({targets[i] for i in order} | thresholds, key=lambda x: sign * x)
+            g, t, k = g0.T.copy(), t0, 0
+            for stop in stops:
+                n = ceil(abs(stop - t) / step)
+                h = (stop - t) / n if n else 0.0
+                # the fields with a common mass do not change within the segment
+                active = static & (t + h / 2 > shared)
+                b1, b2 = base.b1 + active @ fb1, base.b2 + np.tensordot(active, fb2, 1)
+                for _ in range(n):
+                    k1 = rhs(g, t, b1, b2)
+                    k2 = rhs(g + h / 2 * k1, t + h / 2, b1, b2)
+                    k3 = rhs(g + h / 2 * k2, t + h / 2, b1, b2)
+                    k4 = rhs(g + h * k3, t + h, b1, b2)
+                    g = g + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+                    t += h
+                t = stop
+                while k < len(order) and targets[order[k]] == stop:
+                    out[order[k]] = g
+                    k += 1
+        out = out.transpose(0, 2, 1)
+        return RunningCouplings(list(base.names), scales, out[:, 0] if single else out)
@@ -0,0 +1,228 @@
+"""Command line interface, `python -m particlezoo` or `particlezoo`.
+
+Every subcommand takes any number of model files, directories or glob
+patterns. Files are processed independently, on a process pool with
+`--jobs`, and one record is written per file, either as readable text or
+as JSON lines with `--jsonl`. The exit status is 1 if any file failed.
+
+    particlezoo validate models/ --jobs 8 --jsonl
+    particlezoo render sm.yaml
+    particlezoo enumerate "scan/*.json" --max-dim 5 --cache-dir ~/.cache/zoo
+    particlezoo bench models/ --repeat 3 --jsonl -o bench.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .exceptions import ConfigError, ModelError
+
+Record = Dict[str, object]
+
+_CLASSES = {"super": "SuperRenorm", "renorm": "Renorm", "nonrenorm": "NonRenorm"}
+
+
+def _configuration(path: str, cache_dir: Optional[str]) -> Tuple[object, Callable[[], object]]:
+    """Schema checked configuration of a single file, and a function building its
+    Lagrangian. On a cache miss the entry is only stored once that is called."""
+    from .parsers import check_config, consume_config, open_file, transform_model
+
+    if cache_dir is None:
+        cfg = consume_config(check_config(open_file(path)))
+        return cfg, lambda: transform_model(cfg)
+
+    from .parsers import ModelCache
+    cache = ModelCache(cache_dir)
+    key = cache.key(path)
+    entry = cache.get(path, key)
+    if entry is not None:
+        return entry.configuration, entry.to_lagrangian
+
+    cfg = consume_config(check_config(open_file(path)))
+    return cfg, lambda: cache.put(path, cfg, key=key).to_lagrangian()
+
+
+def _load(path: str, cache_dir: Optional[str]):
+    """Schema checked, transformed Lagrangian of a single file"""
+    _, build = _configuration(path, cache_dir)
+    return build()
+
+
+def _names(fields) -> List[str]:
+    return [str(f.name) for f in fields]
+
+
+def _representation_errors(cfg) -> List[str]:
+    """Every representation that does not resolve against its symmetry's group,
+    named irreps through `irrep_lookup`, Z(n) as `Z_k` and U(1) charges through sympify"""
+    from .builders import Representation
+    from .parsers import group_lookup
+    from .validations import rep_key
+
+    groups = {s.name: group_lookup(s.group) for s in cfg.symmetries}
+    errors = []
+    for field in cfg.fields:
+        for name, rep in field.representations.items():
+            try:
+                rep_key(Representation(rep, groups[name]))
+            except (ConfigError, ModelError, ValueError) as e:
+                errors.append(f"{field.name}: {name} {rep!r} does not resolve, {e}")
+    return errors
+
+
+def _validate(path: str, cache_dir: Optional[str]) -> Record:
+    cfg, build = _configuration(path, cache_dir)
+    # the schema only checks the shape, transforming stops at the first bad irrep
+    errors = _representation_errors(cfg)
+    if not errors:
+        build()
+    return {"fields": len(cfg.fields),
+            "symmetries": len(cfg.symmetries),
+            "errors": errors}
+
+
+def _render(path: str, cache_dir: Optional[str]) -> Record:
+    return {"latex": _load(path, cache_dir).kinetic_term()}
+
+
+def _enumerate(path: str, cache_dir: Optional[str], max_dim: int,
+               renormalizability: Optional[str], conjugates: bool, jobs: Optional[int]) -> Record:
+    from .validations import Renormalizability
+
+    lagrangian = _load(path, cache_dir)
+    renorm = None if renormalizability is None else Renormalizability[_CLASSES[renormalizability]]
+    operators = [_names(op) for op in lagrangian.operators(
+        max_dim, renorm, conjugates=conjugates, jobs=jobs)]
+    return {"count": len(operators), "operators": operators}
+
+
+def _bench(path: str, cache_dir: Optional[str], repeat: int) -> Record:
+    from .instrumentation import Profiler, profile
+    from .registry import registry
+
+    profiler = Profiler()
+    wall = []
+    for _ in range(repeat):
+        registry.clear()
+        start = time.perf_counter()
+        with profile(profiler):
+            lagrangian = _load(path, cache_dir)
+            lagrangian.kinetic_term()
+        wall.append(time.perf_counter() - start)
+    return {"repeat": repeat, "min": min(wall), "mean": sum(wall) / len(wall),
+            "stages": profiler.report()}
+
+
+def _run_one(task: Tuple[Callable[..., Record], str, tuple]) -> Record:
+    fn, path, args = task
+    try:
+        record = fn(path, *args)
+    except (ConfigError, ModelError, OSError, ValueError) as e:
+        return {"path": path, "ok": False, "errors": [str(e)]}
+    record = {"path": path, "ok": not record.get("errors"), **record}
+    record.setdefault("errors", [])
+    return record
+
+
+def run(fn: Callable[..., Record], paths: Sequence[str], args: tuple = (),
+        jobs: Optional[int] = None) -> Iterator[Record]:
+    """Applies a subcommand to each path, yielding records in input order"""
+    tasks = [(fn, path, args) for path in paths]
+    if jobs is None or jobs <= 1 or len(tasks) <= 1:
+        yield from map(_run_one, tasks)
+        return
+
+    # spawn, liesym's native backend does not survive a fork
+    with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield from pool.map(_run_one, tasks)
+
+
+def _write_text(command: str, record: Record, out: TextIO):
+    path = record["path"]
+    if not record["ok"]:
+        print(f"FAIL {path}", file=out)
+        for error in record["errors"]:  # type: ignore
+            for line in str(error).splitlines():
+                print(f"  {line}", file=out)
+        return
+    if command == "validate":
+        print(f"OK   {path} ({record['fields']} fields, {record['symmetries']} symmetries)", file=out)
+    elif command == "render":
+        print(f"% {path}\n{record['latex']}", file=out)
+    elif command == "enumerate":
+        print(f"# {path}: {record['count']} operators", file=out)
+        for op in record["operators"]:  # type: ignore
+            print(" ".join(op), file=out)
+    elif command == "bench":
+        print(f"{path}: min {record['min']:.4g}s mean {record['mean']:.4g}s", file=out)
+        for stage, stats in record["stages"].items():  # type: ignore
+            print(f"  {stage:<28} {stats['calls']:>8} calls {stats['total']:>10.4g}s", file=out)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="particlezoo", description="Batch tools for particlezoo models.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("paths", nargs="+", help="Model files, directories or glob patterns")
+    common.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+    common.add_argument("--cache-dir", default=None, help="Directory of the parsed model cache")
+    common.add_argument("--jsonl", action="store_true", help="Write one JSON record per file")
+    common.add_argument("-o", "--output", default=None, help="Write to this file instead of stdout")
+
+    sub.add_parser("validate", parents=[common],
+                   help="Check the schema of each model and resolve every representation in its group")
+    sub.add_parser("render", parents=[common],
+                   help="Kinetic Lagrangian of each model as latex")
+    enum = sub.add_parser("enumerate", parents=[common],
+                          help="Gauge invariant operators up to a mass dimension")
+    enum.add_argument("--max-dim", type=int, default=4, help="Highest mass dimension, defaults to 4")
+    enum.add_argument("--class", dest="renormalizability", choices=sorted(_CLASSES),
+                      default=None, help="Only operators of this class")
+    enum.add_argument("--no-conjugates", dest="conjugates", action="store_false",
+                      help="Do not include conjugate fields")
+    bench = sub.add_parser("bench", parents=[common],
+                           help="Time loading and rendering each model, per stage")
+    bench.add_argument("--repeat", type=int, default=3, help="Runs per file, defaults to 3")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point, returns the exit status"""
+    from .parsers import expand_paths
+
+    args = _parser().parse_args(argv)
+    paths = [p for pattern in args.paths for p in expand_paths(pattern)]
+
+    if args.command == "validate":
+        fn, extra = _validate, (args.cache_dir,)
+    elif args.command == "render":
+        fn, extra = _render, (args.cache_dir,)
+    elif args.command == "enumerate":
+        # a single model parallelizes its own search instead
+        inner = args.jobs if len(paths) == 1 else None
+        fn, extra = _enumerate, (args.cache_dir, args.max_dim, args.renormalizability,
+                                 args.conjugates, inner)
+    else:
+        fn, extra = _bench, (args.cache_dir, args.repeat)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    failed = False
+    try:
+        for record in run(fn, paths, extra, args.jobs):
+            failed |= not record["ok"]
+            if args.jsonl:
+                out.write(json.dumps(record) + "\n")
+            else:
+                _write_text(args.command, record, out)
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
@@ -0,0 +1,10 @@
+# feynman.py needs tikzfeynwrap, only the vertex tables are exported here.
+from .vertices import GroupFactors, VertexTable, VertexExtractor, extract_vertices, structure_constants
+
+__all__ = [
+    "GroupFactors",
+    "VertexTable",
+    "VertexExtractor",
+    "extract_vertices",
+    "structure_constants",
+]
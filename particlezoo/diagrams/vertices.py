@@ -0,0 +1,300 @@
+"""Feynman rules of a Lagrangian as a columnar vertex table.
+
+Every particle gets an integer ID: the fields of the model are
+0 .. F-1, their conjugates F .. 2F-1 and the gauge boson of symmetry s
+is 2F + s. A vertex is the sorted multiset of its particle IDs, a Lorentz
+structure, a coupling and a block of group theory factors:
+
+    FFV   psibar gamma^mu T^a psi A^a_mu                 from the fermion kinetic terms
+    SSV   i (phi^dagger T^a d^mu phi - d^mu phi^dagger T^a phi) A^a_mu
+    SSVV  phi^dagger {T^a, T^b} phi A^a_mu A^{b,mu}      from the scalar kinetic terms
+    VVV   f^abc (d_mu A^a_nu) A^{b,mu} A^{c,nu}         from the gauge kinetic terms
+    VVVV  f^abe f^cde A^a_mu A^b_nu A^{c,mu} A^{d,nu}
+    F..S.. a gauge invariant operator, F per fermion and S per scalar leg, eg FFS or SSSS
+
+The gauge factors are the sparse tables of `GaugeInteractions`, merged into
+one component table that every vertex addresses with a `start:stop` slice.
+Index i (`row`) is the component of the conjugated leg, j (`col`) of the
+other one. VVV rows hold f^abc for a < b < c in (`generator`, `row`,
+`col`), VVVV reuses that block. The invariant tensor of an operator vertex
+is not expanded, its block is empty.
+
+The table keeps a dict from each multiset to its rows, diagram generation
+looks up the vertices joining a set of particles in O(1).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from liesym import LieAlgebra, LieGroup
+
+from ..builders import Field, Lagrangian, Symmetry
+from ..builders.covariant import _TOL, generator_matrices
+from ..instrumentation import timed
+from ..registry import LRUCache, _algebra, group_key
+from ..validations.anomalies import irrep_indices
+
+Particle = Union[int, Field, Symmetry]
+
+_structure_constants = LRUCache(256)
+
+
+class GroupFactors(NamedTuple):
+    """Sparse group theory factors, one row per non zero component.
+    See `particlezoo.builders.covariant.QuarticVertices` for the columns,
+    unused ones are -1.
+    """
+    generator: np.ndarray
+    row: np.ndarray
+    col: np.ndarray
+    generator2: np.ndarray
+    row2: np.ndarray
+    col2: np.ndarray
+    value: np.ndarray
+
+
+class VertexTable(NamedTuple):
+    """Columnar table of the vertices of a model.
+
+    Members:
+        particles (List[str]): Name of each particle ID
+        lorentz (List[str]): Name of each Lorentz structure ID
+        couplings (List[str]): Name of each coupling ID
+        legs (np.ndarray): Sorted particle IDs of each vertex, padded with -1, shape (n, max_legs)
+        structure (np.ndarray): Lorentz structure ID of each vertex
+        coupling (np.ndarray): Coupling ID of each vertex
+        start (np.ndarray): First row of the vertex's block in `factors`
+        stop (np.ndarray): End of the vertex's block in `factors`
+        factors (GroupFactors): Group theory factors of every vertex
+        index (Dict[Tuple[int, ...], Tuple[int, ...]]): Vertex rows of each sorted multiset of particle IDs
+    """
+    particles: List[str]
+    lorentz: List[str]
+    couplings: List[str]
+    legs: np.ndarray
+    structure: np.ndarray
+    coupling: np.ndarray
+    start: np.ndarray
+    stop: np.ndarray
+    factors: GroupFactors
+    index: Dict[Tuple[int, ...], Tuple[int, ...]]
+
+    def __len__(self) -> int:
+        return len(self.structure)
+
+    def lookup(self, particles: Sequence[int]) -> Tuple[int, ...]:
+        """Rows of the vertices joining exactly these particle IDs, in any order"""
+        return self.index.get(tuple(sorted(int(x) for x in particles)), ())
+
+    def factor(self, vertex: int) -> GroupFactors:
+        """Group theory factor block of one vertex"""
+        block = slice(self.start[vertex], self.stop[vertex])
+        return GroupFactors(*[col[block] for col in self.factors])
+
+
+def structure_constants(group) -> GroupFactors:
+    """f^abc of a Lie group for a < b < c, [T^a, T^b] = i f^abc T^c, in the
+    normalization of `generator_matrices`, so f^acd f^bcd = C2(G) delta^ab.
+    Cached per group.
+
+    Examples
+    ========
+    >>> from liesym import SU
+    >>> from particlezoo.diagrams.vertices import structure_constants
+    >>> f = structure_constants(SU(2))
+    >>> len(f.value), abs(f.value[0])
+    (1, 1.0)
+    """
+    gkey = group_key(group)
+
+    def compute():
+        rank = _algebra(group).rank
+        t = generator_matrices(group, [1] + [0] * (rank - 1))
+        comm = np.einsum("aij,bjk->abik", t, t) - np.einsum("bij,ajk->abik", t, t)
+        index = float(irrep_indices(gkey, [1] + [0] * (rank - 1)).dynkin)
+        f = (-1j / index * np.einsum("abij,cji->abc", comm, t)).real
+        i = np.arange(len(t))
+        ordered = (i[:, None, None] < i[None, :, None]) & (i[None, :, None] < i[None, None, :])
+        a, b, c = np.nonzero(ordered & (np.abs(f) > _TOL))
+        none = np.full(len(a), -1, np.intp)
+        return GroupFactors(a.astype(np.intp), b.astype(np.intp), c.astype(np.intp),
+                            none, none, none, f[a, b, c].astype(complex))
+    return _structure_constants.get(gkey, compute)
+
+
+class VertexExtractor:
+    """Builds the `VertexTable` of a Lagrangian from its gauge
+    interactions and its gauge invariant operators.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+    >>> from particlezoo.diagrams.vertices import VertexExtractor
+    >>> su2, u1 = SU(2), U1()
+    >>> H = Field("H", "0", {"L": Representation(Matrix([[1]]), su2), "Y": Representation("1/2", u1)})
+    >>> lag = Lagrangian([H], [Symmetry("L", su2, True, "g"), Symmetry("Y", u1, True, "g'")], "Higgs")
+    >>> table = VertexExtractor(lag).extract()
+    >>> [table.lorentz[s] for s in table.structure]
+    ['SSV', 'SSV', 'SSVV', 'SSVV', 'SSVV', 'VVV', 'VVVV', 'SSSS']
+    >>> [table.couplings[table.coupling[v]] for v in table.lookup([0, 1, 2])]
+    ['g']
+    >>> len(table.factor(table.lookup([0, 1, 2])[0]).value)
+    6
+    """
+
+    def __init__(self, lagrangian: Lagrangian, operators: bool = True, max_dim: int = 4):
+        """Creates the extractor.
+
+        Args:
+            lagrangian (Lagrangian): The model
+            operators (bool, optional): Also add a vertex per gauge invariant operator with
+                three or more fields. Defaults to True.
+            max_dim (int, optional): Highest mass dimension of those operators. Defaults to 4.
+        """
+        self.lagrangian = lagrangian
+        self.operators = operators
+        self.max_dim = max_dim
+        fields = lagrangian.particle_contents
+        self._ids: Dict[Field, int] = {}
+        for i, field in enumerate(fields):
+            self._ids[field] = i
+            self._ids.setdefault(field.conjugate(), len(fields) + i)
+
+    def particle_id(self, particle: Particle) -> int:
+        """ID of a field, conjugate field, symmetry (its gauge boson) or an ID
+
+        Raises:
+            ValueError: If the particle is not in the model
+        """
+        if isinstance(particle, (int, np.integer)):
+            return int(particle)
+        if isinstance(particle, Symmetry):
+            names = [str(x.name) for x in self.lagrangian.symmetries]
+            if str(particle.name) not in names:
+                raise ValueError(f"{particle.name} is not a symmetry of the model.")
+            return 2 * len(self.lagrangian.particle_contents) + names.index(str(particle.name))
+        if particle not in self._ids:
+            raise ValueError(f"{particle.name} is not a field of the model.")
+        return self._ids[particle]
+
+    def particles(self) -> List[str]:
+        """Name of every particle ID"""
+        fields = self.lagrangian.particle_contents
+        return ([str(x.name) for x in fields] + [str(x.conjugate().name) for x in fields]
+                + [x.gauge_name for x in self.lagrangian.symmetries])
+
+    @timed("vertex_table")
+    def extract(self) -> VertexTable:
+        """Builds the vertex table
+
+        Raises:
+            ModelError: If a gauge vertex can not be expanded, see `CovariantExpansion.expand`
+        """
+        gauge = self.lagrangian.gauge_interactions()
+        n_fields = len(gauge.fields)
+        boson = 2 * n_fields
+        lorentz: List[str] = []
+        couplings: List[str] = []
+        rows: List[Tuple[Tuple[int, ...], int, int, int, int]] = []
+        blocks: List[GroupFactors] = []
+        offset = 0
+
+        def intern(names: List[str], name: str) -> int:
+            if name not in names:
+                names.append(name)
+            return names.index(name)
+
+        def add(legs, structure: str, coupling: str, block: Optional[GroupFactors] = None):
+            nonlocal offset
+            start = offset
+            if block is not None:
+                blocks.append(block)
+                offset += len(block.value)
+            rows.append((tuple(sorted(int(x) for x in legs)), intern(lorentz, structure), intern(couplings, coupling),
+                         start, offset))
+
+        for structure, table in (("FFV", gauge.fermion), ("SSV", gauge.scalar)):
+            none = np.full(len(table.value), -1, np.intp)
+            for start, stop in _blocks(table.field, table.symmetry):
+                f, s = table.field[start], table.symmetry[start]
+                block = slice(start, stop)
+                add((f, n_fields + f, boson + s), structure, gauge.couplings[s],
+                    GroupFactors(table.generator[block], table.row[block], table.col[block],
+                                 none[block], none[block], none[block], table.value[block]))
+
+        quartic = gauge.quartic
+        for start, stop in _blocks(quartic.field, quartic.symmetry, quartic.symmetry2):
+            f, s, t = quartic.field[start], quartic.symmetry[start], quartic.symmetry2[start]
+            coupling = (f"{gauge.couplings[s]}^2" if s == t
+                        else f"{gauge.couplings[s]} {gauge.couplings[t]}")
+            add((f, n_fields + f, boson + s, boson + t), "SSVV", coupling,
+                GroupFactors(*[getattr(quartic, name)[start:stop] for name in GroupFactors._fields]))
+
+        for s, symmetry in enumerate(gauge.symmetries):
+            if not symmetry.is_gauged or not isinstance(symmetry.group, (LieGroup, LieAlgebra)):
+                continue
+            f = structure_constants(symmetry.group)
+            if not len(f.value):
+                continue
+            add((boson + s,) * 3, "VVV", gauge.couplings[s], f)
+            rows.append(((boson + s,) * 4, intern(lorentz, "VVVV"),
+                         intern(couplings, f"{gauge.couplings[s]}^2"), rows[-1][3], rows[-1][4]))
+
+        if self.operators:
+            self._add_operators(add)
+
+        return _table(self.particles(), lorentz, couplings, rows, blocks)
+
+    def _add_operators(self, add):
+        n = len(self.lagrangian.particle_contents)
+        named: Dict[Tuple[int, ...], str] = {}
+        for op in self.lagrangian.operators(self.max_dim):
+            if len(op) < 3:
+                continue
+            legs = tuple(sorted(self.particle_id(x) for x in op))
+            hc = tuple(sorted(x + n if x < n else x - n for x in legs))
+            if hc in named and hc != legs:
+                coupling = f"{named[hc]}^*"
+            else:
+                coupling = named[legs] = f"c_{{{len(named)}}}"
+            structure = "F" * sum(x.is_fermion for x in op) + "S" * sum(not x.is_fermion for x in op)
+            add(legs, structure, coupling)
+
+
+def _blocks(*keys: np.ndarray) -> List[Tuple[int, int]]:
+    """Runs of rows with equal keys, the gauge tables are grouped by field and symmetry"""
+    n = len(keys[0])
+    if not n:
+        return []
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for k in keys:
+        change[1:] |= k[1:] != k[:-1]
+    starts = np.flatnonzero(change)
+    return list(zip(starts.tolist(), np.append(starts[1:], n).tolist()))
+
+
+def _table(particles: List[str], lorentz: List[str], couplings: List[str],
+           rows: List[Tuple[Tuple[int, ...], int, int, int, int]],
+           blocks: List[GroupFactors]) -> VertexTable:
+    width = max((len(r[0]) for r in rows), default=0)
+    legs = np.full((len(rows), width), -1, np.intp)
+    index: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+    for i, (key, *_) in enumerate(rows):
+        legs[i, :len(key)] = key
+        index[key] = index.get(key, ()) + (i,)
+    columns = [np.array([r[k] for r in rows], dtype=np.intp) for k in range(1, 5)]
+    if blocks:
+        factors = GroupFactors(*[np.concatenate(cols) for cols in zip(*blocks)])
+    else:
+        factors = GroupFactors(*[np.zeros(0, np.intp)] * 6, np.zeros(0, complex))
+    return VertexTable(particles, lorentz, couplings, legs, *columns, factors, index)
+
+
+def extract_vertices(lagrangian: Lagrangian, operators: bool = True, max_dim: int = 4) -> VertexTable:
+    """The vertex table of a Lagrangian, see `VertexExtractor`"""
+    return VertexExtractor(lagrangian, operators, max_dim).extract()
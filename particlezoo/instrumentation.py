@@ -0,0 +1,145 @@
+"""Opt-in timing of the pipeline stages.
+
+Functions on the hot path are wrapped with `timed(stage)`. While no
+profiler is active the wrapper is a single global lookup before calling
+through. Inside `profile()`, or for the whole process when the
+`PARTICLEZOO_PROFILE` environment variable is set, each call adds to the
+call count and cumulative wall time of its stage. Times are inclusive,
+so a stage that calls another is also charged for it.
+
+Setting `PARTICLEZOO_PROFILE=1` prints the report to stderr at exit, any
+other value is taken as a path to write the JSON report to.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+ENV_VAR = "PARTICLEZOO_PROFILE"
+
+
+class Profiler:
+    """Call counts and cumulative wall time per stage"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[str, int] = {}
+        self._totals: Dict[str, float] = {}
+
+    def record(self, stage: str, elapsed: float):
+        """Adds a single call of `elapsed` seconds to `stage`"""
+        with self._lock:
+            self._calls[stage] = self._calls.get(stage, 0) + 1
+            self._totals[stage] = self._totals.get(stage, 0.0) + elapsed
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Returns {stage: {calls, total, mean}}, slowest stage first"""
+        with self._lock:
+            stages = sorted(self._totals, key=self._totals.__getitem__, reverse=True)
+            return {
+                stage: {
+                    "calls": self._calls[stage],
+                    "total": self._totals[stage],
+                    "mean": self._totals[stage] / self._calls[stage],
+                }
+                for stage in stages
+            }
+
+    def to_json(self, **kwargs) -> str:
+        """The report as a JSON string"""
+        return json.dumps(self.report(), **kwargs)
+
+    def reset(self):
+        """Drops every recorded call"""
+        with self._lock:
+            self._calls.clear()
+            self._totals.clear()
+
+
+_active: Optional[Profiler] = None
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator recording calls of the function under `stage` while a profiler is active.
+
+    Examples
+    ========
+    >>> from particlezoo.instrumentation import timed, profile
+    >>> @timed("square")
+    ... def square(x):
+    ...     return x * x
+    >>> with profile() as prof:
+    ...     _ = [square(x) for x in range(3)]
+    >>> prof.report()["square"]["calls"]
+    3
+    """
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(stage, perf_counter() - start)
+        return wrapper  # type: ignore
+    return decorator
+
+
+def enable(profiler: Optional[Profiler] = None) -> Profiler:
+    """Starts recording into `profiler` (a new one by default) and returns it"""
+    global _active
+    _active = profiler or Profiler()
+    return _active
+
+
+def disable():
+    """Stops recording"""
+    global _active
+    _active = None
+
+
+def active() -> Optional[Profiler]:
+    """The profiler currently recording, if any"""
+    return _active
+
+
+@contextmanager
+def profile(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """Records every timed stage inside the block, restoring the previous profiler after"""
+    previous = _active
+    try:
+        yield enable(profiler)
+    finally:
+        if previous is None:
+            disable()
+        else:
+            enable(previous)
+
+
+def _dump_at_exit(target: str):
+    profiler = _active
+    if profiler is None:
+        return
+    if target.strip().lower() in ("1", "true", "yes", "stderr"):
+        print(profiler.to_json(indent=2), file=sys.stderr)
+    else:
+        with open(target, "w") as f:
+            f.write(profiler.to_json(indent=2))
+
+
+if os.environ.get(ENV_VAR):
+    enable()
+    atexit.register(_dump_at_exit, os.environ[ENV_VAR])
@@ -1,8 +1,52 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Optional
+
 from ..builders import Configuration
-from .transform import group_lookup
-from .consume import open_file, consume_config
+from .consume import open_file, consume_config, iter_configs, iter_yaml, iter_jsonl
+from .schema import validate_config, check_config
+from .bulk import parse_many, expand_paths
+
+# Transforming and caching need sympy and liesym, loaded on first access.
+_LAZY = {
+    "group_lookup": "transform",
+    "transform_model": "transform",
+    "ModelCache": "cache",
+    "CachedModel": "cache",
+    "ModelCacheInfo": "cache",
+}
+
+if TYPE_CHECKING:
+    from ..builders import Lagrangian
+    from .transform import group_lookup, transform_model
+    from .cache import ModelCache, CachedModel, ModelCacheInfo
+
 
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def parse(fname: str, **kwargs) -> Configuration:
+
+def parse(fname: str, cache_dir: Optional[str] = None, **kwargs) -> Configuration:
+    if cache_dir is not None:
+        from .cache import ModelCache
+        return ModelCache(cache_dir).load(fname, **kwargs).configuration
     config = open_file(fname, **kwargs)
     return consume_config(config)
+
+
+def load_model(fname: str, cache_dir: Optional[str] = None, **kwargs) -> Lagrangian:
+    """Parses and transforms a model file into a Lagrangian.
+
+    With a cache directory, warm loads are built from the cached resolved
+    representation data and skip both parsing and irrep lookups.
+    """
+    if cache_dir is not None:
+        from .cache import ModelCache
+        return ModelCache(cache_dir).load(fname, **kwargs).to_lagrangian()
+    from .transform import transform_model
+    return transform_model(parse(fname, **kwargs))
@@ -0,0 +1,151 @@
+"""Bulk loading of many model files.
+
+Paths are expanded up front, the opener is picked once per extension and
+each file is then opened and consumed on a thread or process pool. Files
+that fail to load do not stop the run, their error is yielded in place of
+the configuration.
+"""
+
+from __future__ import annotations
+
+import glob
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..builders import Configuration
+from ..exceptions import ConfigError, ModelError
+from .consume import consume_config, decide_opener
+from .schema import check_config
+
+EXTENSIONS = (".yaml", ".yml", ".json", ".toml")
+
+Result = Tuple[str, Union[Configuration, ConfigError]]
+
+
+def expand_paths(paths: Union[str, Iterable[str]]) -> List[str]:
+    """Expands a directory, a glob pattern or a list of paths into files.
+
+    Directories are searched recursively for supported model files.
+    Directory and glob results are sorted, explicit lists keep their order.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        path = os.fspath(paths)
+        if os.path.isdir(path):
+            found = glob.glob(os.path.join(path, "**", "*"), recursive=True)
+            return sorted(x for x in found
+                          if os.path.splitext(x)[1].lower() in EXTENSIONS)
+        if glob.has_magic(path):
+            return sorted(glob.glob(path, recursive=True))
+        return [path]
+    return [os.fspath(x) for x in paths]
+
+
+def _validated(opener: Callable, path: str) -> dict:
+    return check_config(opener(path))
+
+
+def _load(path: str, opener: Optional[Callable], cache_dir: Optional[str] = None,
+          validate: bool = True) -> Result:
+    try:
+        if opener is None:  # unsupported extension, resolved in the parent
+            decide_opener(path)
+        if validate:
+            opener = partial(_validated, opener)
+        if cache_dir is not None:
+            from .cache import ModelCache
+            return path, ModelCache(cache_dir).load(path, opener=opener).configuration
+        return path, consume_config(opener(path))  # type: ignore
+    except ConfigError as e:
+        return path, e
+    except (ModelError, OSError, ValueError) as e:  # json/toml decode errors are ValueErrors
+        return path, ConfigError(f"{path}: {e}")
+    except Exception as e:
+        import yaml
+        if isinstance(e, yaml.YAMLError):
+            return path, ConfigError(f"{path}: {e}")
+        raise
+
+
+def _load_chunk(chunk: List[Tuple[str, Optional[Callable]]], cache_dir: Optional[str],
+                validate: bool) -> List[Result]:
+    return [_load(path, opener, cache_dir, validate) for path, opener in chunk]
+
+
+def parse_many(
+        paths: Union[str, Iterable[str]],
+        jobs: Optional[int] = None,
+        executor: str = "thread",
+        chunksize: int = 16,
+        cache_dir: Optional[str] = None,
+        validate: bool = True) -> Iterator[Result]:
+    """Parses many model files, yielding results in input order.
+
+    Args:
+        paths (Union[str, Iterable[str]]): Directory, glob pattern or list of files
+        jobs (int, optional): Number of workers. Defaults to serial.
+        executor (str, optional): "thread" or "process". Defaults to "thread".
+        chunksize (int, optional): Files per task. Defaults to 16.
+        cache_dir (str, optional): Directory of a `ModelCache` to load through. Defaults to no cache.
+        validate (bool, optional): Run `check_config` on each raw file first, so the
+            error lists every problem in it. Defaults to True.
+
+    Raises:
+        ValueError: If executor is not "thread" or "process"
+
+    Yields:
+        Tuple[str, Union[Configuration, ConfigError]]: The path and its
+        configuration, or the error raised while loading it.
+
+    Examples
+    ========
+    >>> import tempfile, os
+    >>> from particlezoo.parsers import parse_many
+    >>> d = tempfile.mkdtemp()
+    >>> with open(os.path.join(d, "a.json"), "w") as f:
+    ...     _ = f.write('{"name": "A"}')
+    >>> with open(os.path.join(d, "b.json"), "w") as f:
+    ...     _ = f.write('{"version": "1"}')
+    >>> [(os.path.basename(p), getattr(r, "name", r)) for p, r in parse_many(d)]
+    [('a.json', 'A'), ('b.json', ConfigError('Invalid configuration:\\n  name: required'))]
+
+    A cached load resolves the irreps as well, a bad one is reported the same way
+
+    >>> with open(os.path.join(d, "b.json"), "w") as f:
+    ...     _ = f.write('{"name": "B", "symmetries": [{"name": "c", "group": ["SU", "3"]}],'
+    ...                 ' "fields": [{"name": "q", "spin": "1/2", "representations": {"c": "5"}}]}')
+    >>> [(os.path.basename(p), getattr(r, "name", r))
+    ...  for p, r in parse_many(d, cache_dir=os.path.join(d, "cache"))]  # doctest: +ELLIPSIS
+    [('a.json', 'A'), ('b.json', ConfigError('...b.json: No representation, 5, in SU(3)'))]
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError("executor must be 'thread' or 'process'")
+
+    openers: Dict[str, Optional[Callable]] = {}
+    tasks: List[Tuple[str, Optional[Callable]]] = []
+    for path in expand_paths(paths):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in openers:
+            try:
+                openers[ext] = decide_opener(path)
+            except ConfigError:
+                openers[ext] = None
+        tasks.append((path, openers[ext]))
+
+    if jobs is None or jobs <= 1:
+        for path, opener in tasks:
+            yield _load(path, opener, cache_dir, validate)
+        return
+
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+    pool: Executor
+    if executor == "process":
+        pool = ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(jobs)
+
+    with pool:
+        for results in pool.map(partial(_load_chunk, cache_dir=cache_dir, validate=validate), chunks):
+            yield from results
@@ -0,0 +1,223 @@
+"""Persistent on-disk cache of parsed and transformed models.
+
+Entries are keyed by the sha256 of the model file's bytes together with
+the particlezoo and liesym versions, so editing a file or upgrading either
+package invalidates it implicitly. Each entry is a pickle of the resolved
+`Configuration` and its `CoreModel` (Dynkin labels, dimensions and charges
+already looked up). A warm load therefore skips YAML/TOML/JSON parsing and
+every `irrep_lookup`.
+
+The total size of the directory is capped, least recently used entries
+(by file mtime, which is bumped on every hit) are evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import NamedTuple, Optional
+
+from ..builders import Configuration, CoreModel, Lagrangian
+from .consume import consume_config, open_file
+
+_SUFFIX = ".pzc"
+
+
+def _versions() -> bytes:
+    from .. import __version__
+    try:
+        from importlib.metadata import version
+        liesym_version = version("liesym")
+    except Exception:  # not installed as a distribution
+        import liesym
+        liesym_version = getattr(liesym, "__version__", "unknown")
+    return f"particlezoo={__version__};liesym={liesym_version}".encode()
+
+
+class CachedModel(NamedTuple):
+    """A cache entry.
+
+    Members:
+        configuration (Configuration): The consumed configuration
+        core (CoreModel): The resolved representation data
+    """
+    configuration: Configuration
+    core: CoreModel
+
+    def to_lagrangian(self) -> Lagrangian:
+        """Builds the Lagrangian from the resolved data, no irrep lookups"""
+        return self.core.to_lagrangian()
+
+
+class ModelCacheInfo(NamedTuple):
+    """Statistics of a `ModelCache`.
+
+    Members:
+        hits (int): Number of loads served from the cache
+        misses (int): Number of loads that had to parse the file
+        max_bytes (Optional[int]): Size cap of the directory, None if unbounded
+        bytes (int): Total bytes used by the entries
+        entries (int): Number of entries currently held
+    """
+    hits: int
+    misses: int
+    max_bytes: Optional[int]
+    bytes: int
+    entries: int
+
+
+class ModelCache:
+    """Directory backed cache of parsed models.
+
+    Examples
+    ========
+    >>> import tempfile, os
+    >>> from particlezoo.parsers import ModelCache
+    >>> d = tempfile.mkdtemp()
+    >>> fname = os.path.join(d, "model.json")
+    >>> with open(fname, "w") as f:
+    ...     _ = f.write('{"name": "Toy", "symmetries": [{"name": "Y", "group": ["U", "1"]}],'
+    ...                 ' "fields": [{"name": "H", "spin": "0", "representations": {"Y": "1/2"}}]}')
+    >>> cache = ModelCache(os.path.join(d, "cache"))
+    >>> cache.load(fname).configuration.name
+    'Toy'
+    >>> cache.load(fname).core.fields[0].reps
+    ((0, Fraction(1, 2)),)
+    >>> info = cache.info()
+    >>> info.hits, info.misses, info.entries, info.bytes > 0
+    (1, 1, 1, True)
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = 256 * 1024 ** 2):
+        """Creates (or reuses) a cache directory.
+
+        Args:
+            directory (str): Directory to keep the entries in, created if missing.
+            max_bytes (Optional[int], optional): Size cap of the directory, None is unbounded. Defaults to 256MB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._salt = _versions()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, fname: str) -> str:
+        """Cache key of the current contents of fname"""
+        h = hashlib.sha256(self._salt)
+        with open(fname, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, fname: str, key: Optional[str] = None) -> Optional[CachedModel]:
+        """Returns the cached entry for fname or None on a miss.
+        `key` skips hashing the file again if it is already known."""
+        path = self._path(key or self.key(fname))
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        except Exception:  # truncated or from an incompatible pickle
+            self._remove(path)
+            self._misses += 1
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:  # evicted by another process since the read
+            pass
+        self._hits += 1
+        return CachedModel(*entry)
+
+    def put(self, fname: str, configuration: Configuration, core: Optional[CoreModel] = None,
+            key: Optional[str] = None) -> CachedModel:
+        """Stores an entry for fname, resolving the core model if not given"""
+        core = core or CoreModel.from_configuration(configuration)
+        path = self._path(key or self.key(fname))
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((configuration, core), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+        self._evict()
+        return CachedModel(configuration, core)
+
+    def load(self, fname: str, **kwargs) -> CachedModel:
+        """Returns the entry for fname, parsing and storing it on a miss.
+
+        Args:
+            fname (str): Model file
+            kwargs: Passed to `open_file`, eg `opener`
+        """
+        key = self.key(fname)
+        entry = self.get(fname, key)
+        if entry is not None:
+            return entry
+        configuration = consume_config(open_file(fname, **kwargs))
+        return self.put(fname, configuration, key=key)
+
+    def invalidate(self, fname: str) -> bool:
+        """Drops the entry for the current contents of fname, returns whether one existed"""
+        return self._remove(self._path(self.key(fname)))
+
+    def clear(self):
+        """Drops every entry and resets the statistics"""
+        for path, _, _ in self._entries():
+            self._remove(path)
+        self._hits = 0
+        self._misses = 0
+
+    def size(self) -> int:
+        """Total bytes used by the entries"""
+        return sum(size for _, size, _ in self._entries())
+
+    def info(self) -> ModelCacheInfo:
+        """Hit/miss statistics and the size of the directory"""
+        entries = self._entries()
+        return ModelCacheInfo(self._hits, self._misses, self.max_bytes,
+                              sum(size for _, size, _ in entries), len(entries))
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries(), key=lambda x: x[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -1,23 +1,30 @@
 import json
-import yaml
-import toml
-from typing import cast, Union
+from typing import cast, Iterator, Union
 from os.path import splitext
 
 from ..exceptions import ConfigError
+from ..instrumentation import timed
 from ..builders import Configuration, SymmetryGroup, GenericField
 
 
+def _yaml_loader():
+    """yaml and toml are imported on use, CSafeLoader is preferred when libyaml is available"""
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def open_toml(fname: str) -> dict:
     """Toml opening function"""
+    import toml
     with open(fname) as f:
         return cast(dict, toml.load(f))
 
 
 def open_yaml(fname: str) -> dict:
     """Yaml opening function"""
+    import yaml
     with open(fname) as f:
-        return cast(dict, yaml.load(f))
+        return cast(dict, yaml.load(f, Loader=_yaml_loader()))
 
 
 def open_json(fname: str) -> dict:
@@ -26,9 +33,39 @@ def open_json(fname: str) -> dict:
         return cast(dict, json.load(f))
 
 
+def iter_yaml(fname: str) -> Iterator[dict]:
+    """Yields each document of a multi-document yaml stream.
+
+    Documents are parsed one at a time, so memory does not grow with
+    the size of the file. Empty documents are skipped.
+    """
+    import yaml
+    with open(fname) as f:
+        for doc in yaml.load_all(f, Loader=_yaml_loader()):
+            if doc is not None:
+                yield cast(dict, doc)
+
+
+def iter_jsonl(fname: str) -> Iterator[dict]:
+    """Yields each line of a JSON Lines file. Blank lines are skipped.
+
+    Raises:
+        ConfigError: If a line is not valid json
+    """
+    with open(fname) as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield cast(dict, json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ConfigError(f"{fname}:{lineno}: {e}") from e
+
+
 def decide_opener(fname: str):
     """Chooses which function to open"""
     _, ext = splitext(fname)
+    ext = ext.lstrip(".").lower()
 
     if ext == "yaml" or ext == "yml":
         return open_yaml
@@ -37,9 +74,10 @@ def decide_opener(fname: str):
     if ext == "toml":
         return open_toml
 
-    return ConfigError("Unsupported config file")
+    raise ConfigError("Unsupported config file")
 
 
+@timed("open_file")
 def open_file(fname: str, opener=None, **kwargs) -> dict:
     """Opens file into a raw dictionary."""
     if opener is None:
@@ -47,6 +85,45 @@ def open_file(fname: str, opener=None, **kwargs) -> dict:
     return opener(fname)
 
 
+def decide_iterator(fname: str):
+    """Chooses which streaming reader to use"""
+    _, ext = splitext(fname)
+    ext = ext.lstrip(".").lower()
+
+    if ext == "yaml" or ext == "yml":
+        return iter_yaml
+    if ext == "jsonl" or ext == "ndjson":
+        return iter_jsonl
+
+    raise ConfigError("Unsupported stream file")
+
+
+def iter_configs(fname: str, reader=None) -> Iterator[Configuration]:
+    """Streams the models of a multi-document yaml or JSON Lines file.
+
+    Args:
+        fname (str): File to read
+        reader (optional): Function yielding raw dictionaries. Defaults to choosing by extension.
+
+    Yields:
+        Configuration: One configuration per document or line
+
+    Examples
+    ========
+    >>> import tempfile, os
+    >>> from particlezoo.parsers import iter_configs
+    >>> fname = os.path.join(tempfile.mkdtemp(), "models.jsonl")
+    >>> with open(fname, "w") as f:
+    ...     _ = f.write('{"name": "A"}\\n\\n{"name": "B"}\\n')
+    >>> [cfg.name for cfg in iter_configs(fname)]
+    ['A', 'B']
+    """
+    if reader is None:
+        reader = decide_iterator(fname)
+    for config in reader(fname):
+        yield consume_config(config)
+
+
 def consume_representation(config: Union[str, list]) -> Union[str, list]:
     """Consumes the representation on the GenericField"""
 
@@ -110,6 +187,7 @@ def consume_fields(config: dict) -> GenericField:
     )
 
 
+@timed("consume_config")
 def consume_config(config: dict) -> Configuration:
     """Consumes at the top level the file as dictionary.
 
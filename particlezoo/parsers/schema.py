@@ -0,0 +1,190 @@
+"""Structural validation of raw configuration dictionaries.
+
+`validate_config` walks the dictionary returned by an opener once and
+collects every problem it finds: wrong types, groups `group_lookup` can
+not build, Dynkin labels of the wrong length, representations referring
+to undefined symmetries and malformed spins. It only uses plain Python,
+so a bad file is rejected before any group is built or any string is
+sympified.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Any, Dict, List, Optional
+
+from ..exceptions import ConfigError
+
+
+def _rank(grp: str, dim: int) -> Optional[int]:
+    """Rank of a supported group, 0 for abelian groups and None if unsupported.
+    Mirrors the groups `particlezoo.registry` can build.
+    """
+    if grp == "su" and dim >= 2:
+        return dim - 1
+    if grp == "so" and dim >= 3:
+        return dim // 2
+    if grp == "sp" and dim >= 2 and dim % 2 == 0:
+        return dim // 2
+    if grp == "e" and dim in (6, 7, 8):
+        return dim
+    if grp == "z" and dim >= 1:
+        return 0
+    if grp == "u" and dim == 1:
+        return 0
+    return None
+
+
+def _check_str(errors: List[str], where: str, value: Any, required: bool = False):
+    if value is None:
+        if required:
+            errors.append(f"{where}: required")
+    elif not isinstance(value, str):
+        errors.append(f"{where}: must be a string, got {type(value).__name__}")
+    elif required and value.strip() == "":
+        errors.append(f"{where}: required")
+
+
+def _check_spin(errors: List[str], where: str, spin: Any):
+    if spin is None or (isinstance(spin, str) and spin.strip() == ""):
+        errors.append(f"{where}: required")
+        return
+    if not isinstance(spin, str):
+        errors.append(f"{where}: must be a string, got {type(spin).__name__}")
+        return
+    try:
+        value = Fraction(spin.strip())
+    except (ValueError, ZeroDivisionError):
+        errors.append(f"{where}: {spin!r} is not a number")
+        return
+    if value < 0 or (2 * value).denominator != 1:
+        errors.append(f"{where}: {spin!r} must be a non-negative integer or half integer")
+
+
+def _check_group(errors: List[str], where: str, group: Any) -> Optional[tuple]:
+    if not isinstance(group, list) or len(group) != 2:
+        errors.append(f"{where}: must be a [type, dim] pair")
+        return None
+    grp, dim = group
+    if not isinstance(grp, str):
+        errors.append(f"{where}: group type must be a string")
+        return None
+    try:
+        dim = int(dim)
+    except (TypeError, ValueError):
+        errors.append(f"{where}: group dimension {dim!r} is not an integer")
+        return None
+    rank = _rank(grp.lower(), dim)
+    if rank is None:
+        errors.append(f"{where}: unsupported group {grp}({dim})")
+        return None
+    return grp.lower(), rank
+
+
+def _check_representation(errors: List[str], where: str, rep: Any, group: Optional[tuple]):
+    if isinstance(rep, bool) or not isinstance(rep, (str, int, list)):
+        errors.append(f"{where}: must be a string or list")
+        return
+    if group is None:  # error already reported on the symmetry
+        return
+    grp, rank = group
+    if isinstance(rep, list):
+        if rank == 0:
+            errors.append(f"{where}: Dynkin labels given for abelian group")
+        elif len(rep) != rank or not all(isinstance(x, int) and not isinstance(x, bool) and x >= 0 for x in rep):
+            errors.append(f"{where}: must be {rank} non-negative integer Dynkin labels")
+    elif isinstance(rep, str) and rep.strip() == "":
+        errors.append(f"{where}: must not be empty")
+
+
+def validate_config(config: Any) -> List[str]:
+    """Validates the raw dictionary of a model file in one pass.
+
+    Args:
+        config (Any): Raw dictionary from an opener
+
+    Returns:
+        List[str]: Every error found, empty if the configuration is valid
+
+    Examples
+    ========
+    >>> from particlezoo.parsers import validate_config
+    >>> validate_config({
+    ...     "name": "Bad",
+    ...     "symmetries": [{"name": "c", "group": ["SU", "3"]}, {"name": "X", "group": ["U", "5"]}],
+    ...     "fields": [{"name": "q", "spin": "1/3", "representations": {"c": [1], "Y": "1/6"}}]})
+    ['symmetries[1].group: unsupported group U(5)', "fields[0].spin: '1/3' must be a non-negative integer or half integer", 'fields[0].representations.c: must be 2 non-negative integer Dynkin labels', 'fields[0].representations.Y: undefined symmetry']
+    """
+    errors: List[str] = []
+    if not isinstance(config, dict):
+        return [f"configuration must be a dictionary, got {type(config).__name__}"]
+
+    _check_str(errors, "name", config.get("name"), required=True)
+    _check_str(errors, "version", config.get("version"))
+    _check_str(errors, "description", config.get("description"))
+
+    groups: Dict[str, Optional[tuple]] = {}
+    symmetries = config.get("symmetries", [])
+    if not isinstance(symmetries, list):
+        errors.append("symmetries: must be a list")
+        symmetries = []
+    for i, sym in enumerate(symmetries):
+        where = f"symmetries[{i}]"
+        if not isinstance(sym, dict):
+            errors.append(f"{where}: must be a dictionary")
+            continue
+        name = sym.get("name")
+        _check_str(errors, f"{where}.name", name, required=True)
+        for key in ("description", "coupling", "tag"):
+            _check_str(errors, f"{where}.{key}", sym.get(key))
+        if sym.get("gauged") is not None and not isinstance(sym["gauged"], bool):
+            errors.append(f"{where}.gauged: must be a boolean")
+        group = _check_group(errors, f"{where}.group", sym.get("group"))
+        if isinstance(name, str):
+            if name in groups:
+                errors.append(f"{where}.name: duplicate symmetry {name}")
+            groups[name] = group
+
+    seen = set()
+    fields = config.get("fields", [])
+    if not isinstance(fields, list):
+        errors.append("fields: must be a list")
+        fields = []
+    for i, field in enumerate(fields):
+        where = f"fields[{i}]"
+        if not isinstance(field, dict):
+            errors.append(f"{where}: must be a dictionary")
+            continue
+        name = field.get("name")
+        _check_str(errors, f"{where}.name", name, required=True)
+        if isinstance(name, str) and name.strip():
+            if name in seen:
+                errors.append(f"{where}.name: duplicate field {name}")
+            seen.add(name)
+        _check_str(errors, f"{where}.description", field.get("description"))
+        _check_spin(errors, f"{where}.spin", field.get("spin"))
+
+        reps = field.get("representations", {})
+        if not isinstance(reps, dict):
+            errors.append(f"{where}.representations: must be a dictionary")
+            continue
+        for key, rep in reps.items():
+            rwhere = f"{where}.representations.{key}"
+            if key not in groups:
+                errors.append(f"{rwhere}: undefined symmetry")
+                continue
+            _check_representation(errors, rwhere, rep, groups[key])
+
+    return errors
+
+
+def check_config(config: Any) -> dict:
+    """Validates the raw dictionary and returns it unchanged.
+
+    Raises:
+        ConfigError: Listing every error found
+    """
+    errors = validate_config(config)
+    if errors:
+        raise ConfigError("Invalid configuration:\n  " + "\n  ".join(errors))
+    return config
@@ -2,19 +2,24 @@ from __future__ import annotations
 from particlezoo.builders.lagrangian import Lagrangian
 
 from sympy import sympify, Matrix
-from liesym import SU, SO, U1, Sp, Z, E, Group, LieGroup
+from liesym import U1, E, Group, LieGroup
 from typing import Dict, Union
 
 from ..builders import (SymmetryGroup, Symmetry,
                         Representation, GenericField,
-                        Field, Configuration)
-from ..exceptions import ConfigError, ModelError
+                        Field, Configuration, CoreModel)
+from ..exceptions import ConfigError
+from ..instrumentation import timed
+from ..registry import registry
 
 
 def group_lookup(name: list[str]) -> Group:
     """Parses string and returns instance of
     group with proper dimension.
 
+    Instances are shared through `particlezoo.registry.registry`,
+    so repeated lookups of the same group are free.
+
     Args:
         name (list[str]): List of [group type, dim]
 
@@ -25,26 +30,10 @@ def group_lookup(name: list[str]) -> Group:
         Group: Instance of group
     """
     [grp, dim] = name
-
-    dim_ = int(dim)
-    grp = grp.lower()
-    if grp == "su":
-        return SU(dim_)
-    if grp == "so":
-        return SO(dim_)
-    if grp == "sp":
-        return Sp(dim_)
-    if grp == "e":
-        return E(dim_)
-    if grp == "z":
-        return Z(dim_)
-    if grp == "u" and dim_ == 1:
-        return U1()
-
-    raise ConfigError(
-        "Unsupported group. Please log an issue to request support.")
+    return registry.group(grp, dim)
 
 
+@timed("transform_symmetry")
 def transform_symmetry(model: SymmetryGroup) -> Symmetry:
     """Parses and transforms from raw input model to class model.
     If `gauged` flag isn't passed in the config, will auto set based
@@ -65,35 +54,35 @@ def transform_symmetry(model: SymmetryGroup) -> Symmetry:
     )
 
 
+_sympify = timed("sympify")(sympify)
+
+
 def _lg_lookup(group: LieGroup, v: Union[str, list]) -> Matrix:
 
     if isinstance(v, str):
-        try:
-            return group.algebra.irrep_lookup(v)
-        except KeyError:
-            raise ModelError(f"No representation, {v}, in {group.group}")
-    elif isinstance(group, list):
-        representation = Matrix([v])
-        if representation.shape != 1:
-            representation = representation.transpose()
-        return representation
+        return registry.irrep(group, v)
+    elif isinstance(v, list):
+        # Dynkin labels, row matrix to match `irrep_lookup`
+        return Matrix([v])
     else:  # should not be hit unless called directly
         raise ConfigError("Representation must be a string or list")
 
 
+@timed("transform_field")
 def transform_field(model: GenericField, lookups: Dict[str, Symmetry]) -> Field:
 
     field_reps = {}
     for k, v in model.representations.items():
-        group = lookups.get(k)
-        if group is None:
+        symmetry = lookups.get(k)
+        if symmetry is None:
             raise ConfigError(f"The symmetry {k} is undefined.")
+        group = symmetry.group
 
         # reps can either be matrix or str
         if isinstance(group, LieGroup):
             representation = Representation(_lg_lookup(group, v), group)
         else:
-            representation = Representation(sympify(v), group)
+            representation = Representation(_sympify(v), group)
 
         field_reps[k] = representation
 
@@ -106,13 +95,14 @@ def transform_field(model: GenericField, lookups: Dict[str, Symmetry]) -> Field:
     )
 
 
+@timed("transform_model")
 def transform_model(cfg: Configuration) -> Lagrangian:
     version = cfg.version
     name = cfg.name
     description = cfg.description
 
     symmetries = [transform_symmetry(x) for x in cfg.symmetries]
-    lookups = {x.name: x for x in symmetries}
+    lookups = {str(x.name): x for x in symmetries}
 
     fields = [transform_field(x, lookups) for x in cfg.fields]
 
@@ -121,3 +111,21 @@ def transform_model(cfg: Configuration) -> Lagrangian:
         symmetries,
         name, version, description
     )
+
+
+def dump_model(lagrangian: Lagrangian) -> Configuration:
+    """Inverse of `transform_model`. The result only holds strings and
+    lists, irreps are written as Dynkin labels so loading it back skips
+    `irrep_lookup`.
+
+    Examples
+    ========
+    >>> from particlezoo.builders import Configuration, SymmetryGroup, GenericField
+    >>> from particlezoo.parsers.transform import transform_model, dump_model
+    >>> cfg = Configuration("QCD", None, None,
+    ...     [SymmetryGroup(None, "SU3_c", ["SU", "3"], "g_s", None, "c")],
+    ...     [GenericField("q", "1/2", None, {"SU3_c": "3"})])
+    >>> dump_model(transform_model(cfg)).fields
+    [GenericField(name='q', spin='1/2', description='', representations={'SU3_c': [1, 0]})]
+    """
+    return CoreModel.from_lagrangian(lagrangian).to_configuration()
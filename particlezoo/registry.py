@@ -0,0 +1,245 @@
+"""Process wide registry of group instances and irrep data.
+
+Building a liesym group is cheap, but every `irrep_lookup` redoes the
+root system and weight work. Models in a scan almost always share the same
+handful of groups, so both the group instances and the irrep data are
+memoized here and shared across every parse.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple, Union
+
+from liesym import SU, SO, U1, Sp, Z, E, Group, LieGroup, LieAlgebra
+from sympy import Matrix
+
+from .exceptions import ConfigError, ModelError
+from .instrumentation import timed
+
+GroupKey = Tuple[str, int]
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for a single cache.
+
+    Members:
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups that had to be computed
+        maxsize (Optional[int]): Size bound of the cache, None if unbounded
+        currsize (int): Number of entries currently held
+    """
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class LRUCache:
+    """A small thread safe, size bounded, least recently used cache."""
+
+    def __init__(self, maxsize: Optional[int] = 128):
+        """Creates the cache.
+
+        Args:
+            maxsize (Optional[int], optional): Max number of entries. None is unbounded. Defaults to 128.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be a positive integer or None")
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Returns the cached value for key, calling factory on a miss.
+
+        Examples
+        ========
+        >>> from particlezoo.registry import LRUCache
+        >>> cache = LRUCache(maxsize=2)
+        >>> cache.get("a", lambda: 1)
+        1
+        >>> cache.get("a", lambda: 2)
+        1
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+        """
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._misses += 1
+
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Inserts a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._data) > self._maxsize:
+                    self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of the entries, least recently used first"""
+        with self._lock:
+            return list(self._data.items())
+
+    def info(self) -> CacheInfo:
+        """Returns the hit/miss statistics of the cache"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
+
+    def clear(self):
+        """Drops every entry and resets the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def group_key(group: Union[Group, LieAlgebra]) -> GroupKey:
+    """Returns the hashable (group type, dim) key for a group instance.
+
+    Examples
+    ========
+    >>> from liesym import SU
+    >>> from particlezoo.registry import group_key
+    >>> group_key(SU(3))
+    ('su', 3)
+    """
+    if isinstance(group, LieAlgebra):  # E series is only an algebra
+        return (str(group.series).lower(), int(group.dimension))
+    return (str(group.group).lower(), int(group.dimension))
+
+
+@timed("build_group")
+def _build_group(grp: str, dim: int) -> Union[Group, LieAlgebra]:
+    if grp == "su":
+        return SU(dim)
+    if grp == "so":
+        return SO(dim)
+    if grp == "sp":
+        return Sp(dim)
+    if grp == "e":
+        return E(dim)
+    if grp == "z":
+        return Z(dim)
+    if grp == "u" and dim == 1:
+        return U1()
+
+    raise ConfigError(
+        "Unsupported group. Please log an issue to request support.")
+
+
+def _algebra(group: Union[Group, LieAlgebra]) -> LieAlgebra:
+    if isinstance(group, LieGroup):
+        return group.algebra
+    if isinstance(group, LieAlgebra):
+        return group
+    raise TypeError("Irrep data is only available for lie groups")
+
+
+@timed("irrep_lookup")
+def _irrep_lookup(group: Union[Group, LieAlgebra], name: str) -> Matrix:
+    try:
+        return _algebra(group).irrep_lookup(name)
+    except KeyError:
+        raise ModelError(f"No representation, {name}, in {group}")
+
+
+class GroupRegistry:
+    """Registry that shares group instances and their irrep data.
+
+    Groups are keyed on (group type, dim). Irrep lookups are keyed on
+    the group key and the irrep name or Dynkin labels, so two
+    equal groups built independently still share the cache.
+
+    Examples
+    ========
+    >>> from particlezoo.registry import GroupRegistry
+    >>> reg = GroupRegistry()
+    >>> reg.group("SU", 3) is reg.group("su", "3")
+    True
+    >>> reg.irrep(reg.group("SU", 3), "8")
+    Matrix([[1, 1]])
+    >>> reg.dim(reg.group("SU", 3), [1, 1])
+    8
+    """
+
+    def __init__(self, maxsize: Optional[int] = 64, irrep_maxsize: Optional[int] = 4096):
+        """Creates an empty registry.
+
+        Args:
+            maxsize (Optional[int], optional): Bound on cached group instances. Defaults to 64.
+            irrep_maxsize (Optional[int], optional): Bound on cached irrep lookups and dims. Defaults to 4096.
+        """
+        self._groups = LRUCache(maxsize)
+        self._irreps = LRUCache(irrep_maxsize)
+        self._dims = LRUCache(irrep_maxsize)
+        self._conjugates = LRUCache(irrep_maxsize)
+
+    def group(self, grp: str, dim: Union[str, int]) -> Union[Group, LieAlgebra]:
+        """Returns the shared instance of group type `grp` with dimension `dim`.
+
+        Raises:
+            ConfigError: If unsupported group (eg [U, 5]) is passed.
+        """
+        key = (grp.lower(), int(dim))
+        return self._groups.get(key, lambda: _build_group(*key))
+
+    def irrep(self, group: Union[Group, LieAlgebra], name: str) -> Matrix:
+        """Looks up the Dynkin labels of the irrep `name` (eg "3", "\\bar{3}").
+
+        Raises:
+            ModelError: If no such irrep exists in the group.
+        """
+        key = (group_key(group), name)
+        # hand out copies, Matrix is mutable and the cache is shared
+        return self._irreps.get(key, lambda: _irrep_lookup(group, name)).copy()
+
+    def dim(self, group: Union[Group, LieAlgebra], irrep: Union[Matrix, list, tuple]) -> int:
+        """Returns the dimension of the irrep given by its Dynkin labels"""
+        labels = tuple(int(x) for x in irrep)
+        key = (group_key(group), labels)
+        return self._dims.get(
+            key, lambda: int(_algebra(group).dim(Matrix([labels]))))
+
+    def conjugate(self, group: Union[Group, LieAlgebra], irrep: Union[Matrix, list, tuple]) -> Tuple[int, ...]:
+        """Returns the Dynkin labels of the conjugate irrep"""
+        labels = tuple(int(x) for x in irrep)
+        key = (group_key(group), labels)
+        return self._conjugates.get(
+            key, lambda: tuple(int(x) for x in _algebra(group).conjugate(Matrix([labels]))))
+
+    def info(self) -> Dict[str, CacheInfo]:
+        """Returns the hit/miss statistics of each cache"""
+        return {
+            "groups": self._groups.info(),
+            "irreps": self._irreps.info(),
+            "dims": self._dims.info(),
+            "conjugates": self._conjugates.info(),
+        }
+
+    def clear(self):
+        """Drops every cached group and irrep"""
+        self._groups.clear()
+        self._irreps.clear()
+        self._dims.clear()
+        self._conjugates.clear()
+
+
+registry = GroupRegistry()
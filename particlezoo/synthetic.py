@@ -0,0 +1,251 @@
+"""Reproducible synthetic models for benchmarks and stress tests.
+
+Models are built as raw configuration dictionaries (the shape the openers
+return) so they can be consumed directly or written out as yaml, json or
+toml. Lie group irreps are given as Dynkin labels, U(1) charges as
+fractions and Z(n) irreps as `Z_k`.
+
+Two kinds of known answers can be requested. With `anomaly_free` every
+fermion gets a vector like partner in the conjugate representation, so
+all gauge anomalies cancel pairwise. With `operators` a number of gauge
+invariant operators are planted: the last field of each one is built in
+the conjugate of an irrep of the product of the others, so the operator
+is invariant by construction and the enumerator must find it.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from fractions import Fraction
+from os.path import splitext
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .builders import Configuration
+from .exceptions import ConfigError
+from .registry import registry, _algebra, group_key
+
+GroupSpec = Tuple[str, int]
+
+DEFAULT_GROUPS: List[GroupSpec] = [("SU", 3), ("SU", 2), ("U", 1)]
+
+# E(6) is left out of the random draws, its tensor products are slow enough
+# in liesym to dominate any benchmark. Pass it through `groups` explicitly.
+GROUP_POOL: List[GroupSpec] = [
+    ("SU", 2), ("SU", 3), ("SU", 4), ("SU", 5), ("SO", 10), ("Sp", 4),
+    ("U", 1), ("Z", 2), ("Z", 3),
+]
+
+_CHARGES = [Fraction(n, 6) for n in range(-6, 7)]
+
+
+class SyntheticModel(NamedTuple):
+    """A generated model and its known answers.
+
+    Members:
+        raw (dict): Raw configuration dictionary, as returned by an opener
+        operators (List[Tuple[str, ...]]): Names of the fields of each planted invariant operator
+        seed (int): Seed the model was generated from
+    """
+    raw: dict
+    operators: List[Tuple[str, ...]]
+    seed: int
+
+    @property
+    def configuration(self) -> Configuration:
+        """The raw dictionary consumed into a Configuration"""
+        from .parsers.consume import consume_config
+        return consume_config(self.raw)
+
+    def write(self, fname: str):
+        """Writes the raw configuration, format chosen by extension"""
+        write_config(self.raw, fname)
+
+
+class _Irreps:
+    """Small irreps of a group, used as the pool to draw fields from"""
+
+    def __init__(self, grp: str, dim: int, max_irrep_dim: int):
+        self.grp, self.dim = grp.lower(), dim
+        self.group = registry.group(grp, dim)
+        self.abelian = self.grp in ("u", "z")
+        self.max_irrep_dim = max_irrep_dim
+        if self.abelian:
+            return
+
+        rank = int(_algebra(self.group).rank)
+        pool = [[0] * rank]
+        for i in range(rank):  # fundamental weights
+            pool.append([int(i == j) for j in range(rank)])
+        if self.grp == "su":  # adjoint
+            pool.append([2] if rank == 1 else [1] + [0] * (rank - 2) + [1])
+        self.pool = [x for x in pool if registry.dim(self.group, x) <= max_irrep_dim]
+
+    def draw(self, rng: random.Random) -> Union[list, Fraction, int]:
+        if self.grp == "u":
+            return rng.choice(_CHARGES)
+        if self.grp == "z":
+            return rng.randrange(self.dim)
+        return list(rng.choice(self.pool))
+
+    def conjugate(self, rep):
+        if self.grp == "u":
+            return -rep
+        if self.grp == "z":
+            return (-rep) % self.dim
+        return list(registry.conjugate(self.group, rep))
+
+    def completion(self, reps: Sequence, rng: random.Random):
+        """A representation that makes `reps` plus itself contain a singlet"""
+        if self.grp == "u":
+            return -sum(reps, Fraction(0))
+        if self.grp == "z":
+            return (-sum(reps)) % self.dim
+        from .validations.decomposition import decompositions
+
+        product = decompositions.decompose(group_key(self.group), [tuple(x) for x in reps])
+        irreps = sorted(product)
+        small = [x for x in irreps if registry.dim(self.group, x) <= self.max_irrep_dim]
+        choice = rng.choice(small) if small else min(irreps, key=lambda x: registry.dim(self.group, x))
+        return self.conjugate(list(choice))
+
+    def encode(self, rep) -> Union[str, list]:
+        if self.grp == "u":
+            return str(rep)
+        if self.grp == "z":
+            return f"Z_{rep}"
+        return rep
+
+
+def generate_model(
+        n_fields: int,
+        n_symmetries: int = 3,
+        seed: int = 0,
+        groups: Optional[Sequence[GroupSpec]] = None,
+        anomaly_free: bool = False,
+        operators: int = 0,
+        operator_length: int = 3,
+        max_irrep_dim: int = 27,
+        singlet_fraction: float = 0.3) -> SyntheticModel:
+    """Generates a random but valid model.
+
+    Args:
+        n_fields (int): Number of fields, not counting vector like partners
+        n_symmetries (int, optional): Number of symmetries, ignored if `groups` is given. Defaults to 3.
+        seed (int, optional): Random seed, the same seed gives the same model. Defaults to 0.
+        groups (Sequence[Tuple[str, int]], optional): Explicit [type, dim] of each symmetry.
+            Defaults to SU(3) x SU(2) x U(1) followed by random draws from `GROUP_POOL`.
+        anomaly_free (bool, optional): Give every fermion a conjugate partner. Defaults to False.
+        operators (int, optional): Number of invariant operators to plant, their fields count
+            towards `n_fields`. Defaults to 0.
+        operator_length (int, optional): Fields per planted operator, 2 to 4. Defaults to 3.
+        max_irrep_dim (int, optional): Largest irrep to draw. Defaults to 27.
+        singlet_fraction (float, optional): Chance a random field is a singlet of each
+            non abelian group. Defaults to 0.3.
+
+    Raises:
+        ConfigError: If more planted fields than `n_fields` are requested
+
+    Returns:
+        SyntheticModel: The raw configuration and the planted operators
+
+    Examples
+    ========
+    >>> from particlezoo.synthetic import generate_model
+    >>> model = generate_model(4, seed=1, operators=1)
+    >>> [x["name"] for x in model.raw["symmetries"]]
+    ['SU3', 'SU2', 'U1']
+    >>> model.operators
+    [('P_{0,0}', 'P_{0,1}', 'P_{0,2}')]
+    >>> generate_model(4, seed=1, operators=1).raw == model.raw
+    True
+    """
+    if not 2 <= operator_length <= 4:
+        raise ConfigError("operator_length must be between 2 and 4")
+    if operators * operator_length > n_fields:
+        raise ConfigError("Not enough fields to plant the requested operators")
+
+    rng = random.Random(seed)
+    if groups is None:
+        groups = list(DEFAULT_GROUPS[:n_symmetries])
+        while len(groups) < n_symmetries:
+            groups.append(rng.choice(GROUP_POOL))
+
+    names: List[str] = []
+    for grp, dim in groups:
+        base = f"{grp.upper() if grp.lower() != 'sp' else 'Sp'}{dim}"
+        names.append(base if base not in names else f"{base}_{len(names)}")
+    irreps = [_Irreps(grp, int(dim), max_irrep_dim) for grp, dim in groups]
+
+    symmetries = [{"name": name, "group": [grp, str(dim)]}
+                  for name, (grp, dim) in zip(names, groups)]
+
+    def random_reps() -> list:
+        reps = []
+        for pool in irreps:
+            if not pool.abelian and rng.random() < singlet_fraction:
+                reps.append(pool.pool[0])
+            else:
+                reps.append(pool.draw(rng))
+        return reps
+
+    # (name, spin, reps per symmetry)
+    fields: List[Tuple[str, str, list]] = []
+    planted: List[Tuple[str, ...]] = []
+    for j in range(operators):
+        # scalar operators or a yukawa like fermion pair with scalars
+        n_fermions = 2 if rng.random() < 0.5 and operator_length <= 3 else 0
+        members = [random_reps() for _ in range(operator_length - 1)]
+        members.append([pool.completion([m[i] for m in members], rng)
+                        for i, pool in enumerate(irreps)])
+        op = []
+        for i, reps in enumerate(members):
+            name = f"P_{{{j},{i}}}"
+            fields.append((name, "1/2" if i < n_fermions else "0", reps))
+            op.append(name)
+        planted.append(tuple(op))
+
+    for i in range(n_fields - len(fields)):
+        fields.append((f"F_{{{i}}}", rng.choice(["0", "1/2"]), random_reps()))
+
+    if anomaly_free:
+        for name, spin, reps in list(fields):
+            if spin == "1/2":
+                partner = [pool.conjugate(r) for pool, r in zip(irreps, reps)]
+                fields.append((f"\\tilde{{{name}}}", spin, partner))
+
+    raw = {
+        "name": f"Synthetic_{seed}",
+        "version": "0",
+        "description": f"{n_fields} synthetic fields, seed {seed}",
+        "symmetries": symmetries,
+        "fields": [
+            {
+                "name": name,
+                "spin": spin,
+                "representations": {sym: pool.encode(r) for sym, pool, r in zip(names, irreps, reps)},
+            }
+            for name, spin, reps in fields
+        ],
+    }
+    return SyntheticModel(raw, planted, seed)
+
+
+def write_config(raw: dict, fname: str):
+    """Writes a raw configuration as yaml, json or toml, chosen by extension.
+
+    Raises:
+        ConfigError: If the extension is not supported
+    """
+    ext = splitext(fname)[1].lstrip(".").lower()
+    with open(fname, "w") as f:
+        if ext in ("yaml", "yml"):
+            import yaml
+            yaml.safe_dump(raw, f, sort_keys=False)
+        elif ext == "json":
+            json.dump(raw, f)
+        elif ext == "toml":
+            import toml
+            toml.dump(raw, f)
+        else:
+            raise ConfigError("Unsupported config file")
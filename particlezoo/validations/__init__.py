@@ -1,6 +1,28 @@
 from .gauge_invariance import is_gauge_invariant_repr, is_gauge_invariant
+from .global_invariance import Renormalizability, validate_mass_dim
+from .batch import GaugeInvarianceEngine, is_gauge_invariant_batch, rep_key
+from .decomposition import DecompositionCache
+from .anomalies import AnomalyChecker, anomalies, irrep_indices
+from .scan import ChargeScan, ScanResult, scan_charges
+from .abelian import AbelianCharges, abelian_prefilter
+from .operators import enumerate_operators
 
 __all__ = [
     "is_gauge_invariant_repr",
-    "is_gauge_invariant"
+    "is_gauge_invariant",
+    "Renormalizability",
+    "validate_mass_dim",
+    "GaugeInvarianceEngine",
+    "is_gauge_invariant_batch",
+    "rep_key",
+    "DecompositionCache",
+    "AnomalyChecker",
+    "anomalies",
+    "irrep_indices",
+    "ChargeScan",
+    "ScanResult",
+    "scan_charges",
+    "AbelianCharges",
+    "abelian_prefilter",
+    "enumerate_operators",
 ]
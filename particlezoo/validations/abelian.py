@@ -0,0 +1,185 @@
+"""Bulk abelian charge checks.
+
+Before any irrep product is formed, a term must be neutral under every
+U(1) and Z(n) symmetry. `AbelianCharges` keeps those charges as one
+integer table, so a whole batch of terms is checked with a single matrix
+product and only the neutral ones reach the non abelian check.
+"""
+
+from __future__ import annotations
+
+import logging
+from fractions import Fraction
+from math import gcd
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+from liesym import U1, Z
+
+from ..builders import Field, Lagrangian, Symmetry, CoreModel, CoreField
+from ..builders.core import ABELIAN_GROUPS
+from .batch import rep_key
+
+
+def _lcm(a: int, b: int) -> int:
+    return a * b // gcd(a, b)
+
+
+class AbelianCharges:
+    """Integer charge table of the U(1) and Z(n) symmetries of a model.
+
+    U(1) charges are scaled by the lcm of their denominators so every
+    entry is an exact integer; Z(n) charges are the index k of `Z_k` and
+    are reduced mod n. A candidate term is described by how often each
+    indexed field occurs in it, so neutrality of a whole batch is one
+    integer matrix product. A conjugate is a field of its own and needs
+    its own row.
+
+    Columns are ordered alphabetically by symmetry name, matching the
+    order `is_gauge_invariant` reports failing gauges in.
+
+    Examples
+    ========
+    >>> from liesym import U1
+    >>> from sympy import sympify
+    >>> from particlezoo import Field, Representation, Symmetry
+    >>> from particlezoo.validations import AbelianCharges
+    >>> Y = Symmetry("Y", U1(), True, "g_Y")
+    >>> H = Field("H", "0", {"Y": Representation(sympify("1/2"), U1())})
+    >>> L = Field("L", "1/2", {"Y": Representation(sympify("-1/2"), U1())})
+    >>> table = AbelianCharges([H, L], [Y])
+    >>> table.neutral([(H, L), (H, H)]).tolist()
+    [True, False]
+    """
+
+    def __init__(self, fields: Sequence[Field], symmetries: Sequence[Symmetry]):
+        """Builds the table.
+
+        Args:
+            fields (Sequence[Field]): Fields to index, rows of the table
+            symmetries (Sequence[Symmetry]): Symmetries of the model, non abelian ones are ignored.
+        """
+        columns = []
+        for sym in symmetries:
+            if not isinstance(sym.group, (U1, Z)):
+                continue
+            name = str(sym.name)
+            modulus = int(sym.group.dimension) if isinstance(sym.group, Z) else 0
+            charges = []
+            for field in fields:
+                obj = field.representations.get(name)
+                charges.append(0 if obj is None else rep_key(obj))
+            columns.append((name, modulus, charges))
+        self._setup(fields, columns)
+
+    @classmethod
+    def from_lagrangian(cls, lagrangian: Lagrangian) -> "AbelianCharges":
+        """Builds the table from all fields and symmetries of a Lagrangian"""
+        return cls(lagrangian.particle_contents, lagrangian.symmetries)
+
+    @classmethod
+    def from_core(cls, model: CoreModel, fields: Sequence[CoreField]) -> "AbelianCharges":
+        """Builds the table for compact fields (eg `model.atoms()`) of a `CoreModel`"""
+        columns = []
+        for sym in model.symmetries:
+            grp, dim = model.groups[sym.group]
+            if grp not in ABELIAN_GROUPS:
+                continue
+            charges = [dict(field.reps).get(sym.id, 0) for field in fields]
+            columns.append((sym.name, dim if grp == "z" else 0, charges))
+
+        table = cls.__new__(cls)
+        table._setup(fields, columns)
+        return table
+
+    def _setup(self, fields: Sequence, columns: List[Tuple[str, int, list]]):
+        self.fields: List = list(fields)
+        self.index: Dict = {f: i for i, f in enumerate(self.fields)}
+
+        names: List[str] = []
+        scaled: List[List[int]] = []
+        scales: List[int] = []
+        moduli: List[int] = []
+        for name, modulus, charges in sorted(columns, key=lambda x: x[0]):
+            if not all(isinstance(q, (int, Fraction)) for q in charges):
+                logging.debug(f"Skipping symbolic charges of {name} in abelian filter")
+                continue
+
+            scale = 1
+            for q in charges:
+                scale = _lcm(scale, Fraction(q).denominator)
+
+            names.append(name)
+            scaled.append([int(q * scale) for q in charges])
+            scales.append(scale)
+            moduli.append(modulus)
+
+        self.names: List[str] = names
+        self.charges = np.array(scaled, dtype=np.int64).reshape(
+            len(names), len(self.fields)).T
+        self.scales = np.array(scales, dtype=np.int64)
+        self.moduli = np.array(moduli, dtype=np.int64)
+
+    def counts(self, batch: Iterable[Sequence[Field]]) -> np.ndarray:
+        """Multiplicity matrix of shape (n_terms, n_fields) for a batch of terms,
+        each occurrence of a field adds 1 to its column"""
+        rows: List[int] = []
+        cols: List[int] = []
+        n = 0
+        for n, terms in enumerate(batch, start=1):
+            for field in terms:
+                try:
+                    cols.append(self.index[field])
+                except KeyError:
+                    raise ValueError(f"Field {field} is not in the charge table")
+                rows.append(n - 1)
+        counts = np.zeros((n, len(self.fields)), dtype=np.int64)
+        np.add.at(counts, (rows, cols), 1)
+        return counts
+
+    def _as_counts(self, batch: Union[np.ndarray, Iterable[Sequence[Field]]]) -> np.ndarray:
+        if isinstance(batch, np.ndarray):
+            if batch.ndim != 2 or batch.shape[1] != len(self.fields):
+                raise ValueError("counts must have shape (n_terms, n_fields)")
+            return batch.astype(np.int64, copy=False)
+        return self.counts(batch)
+
+    def residues(self, batch: Union[np.ndarray, Iterable[Sequence[Field]]]) -> np.ndarray:
+        """Total (scaled) charge of each term under each symmetry, 0 when conserved.
+
+        Args:
+            batch (Union[np.ndarray, Iterable[Sequence[Field]]]): Signed multiplicity matrix or terms.
+
+        Returns:
+            np.ndarray: Integer array of shape (n_terms, n_symmetries)
+        """
+        totals = self._as_counts(batch) @ self.charges
+        cyclic = self.moduli > 0
+        if cyclic.any():
+            totals[:, cyclic] %= self.moduli[cyclic]
+        return totals
+
+    def neutral(self, batch: Union[np.ndarray, Iterable[Sequence[Field]]]) -> np.ndarray:
+        """Boolean mask of the terms that conserve every abelian charge"""
+        return ~self.residues(batch).any(axis=1)
+
+    def first_violation(self, batch: Union[np.ndarray, Iterable[Sequence[Field]]]) -> List[str]:
+        """Alphabetically first violated symmetry per term, empty string if neutral"""
+        bad = self.residues(batch) != 0
+        first = bad.argmax(axis=1)
+        return [self.names[j] if row.any() else "" for j, row in zip(first, bad)]
+
+
+def abelian_prefilter(
+        lagrangian: Lagrangian,
+        batch: Union[np.ndarray, Iterable[Sequence[Field]]]) -> np.ndarray:
+    """Vectorized abelian charge conservation check over many candidate terms.
+
+    Args:
+        lagrangian (Lagrangian): Model the fields belong to
+        batch (Union[np.ndarray, Iterable[Sequence[Field]]]): Terms, or signed multiplicity matrix over `lagrangian.particle_contents`.
+
+    Returns:
+        np.ndarray: Boolean mask, True where every U(1)/Z(n) charge is conserved
+    """
+    return AbelianCharges.from_lagrangian(lagrangian).neutral(batch)
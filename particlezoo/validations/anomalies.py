@@ -0,0 +1,269 @@
+"""Gauge anomaly cancellation.
+
+Every spin 1/2 field is taken as a left handed Weyl fermion, a right
+handed one enters through its conjugate. For gauged U(1)s a, b, c and
+gauged non-abelian groups G the conditions are
+
+    a b c      sum_f d_f q_a q_b q_c           (U(1)^3, mixed included)
+    a grav^2   sum_f d_f q_a                   (U(1)-gravity^2)
+    a G^2      sum_f d_f / dim_G(R) T(R) q_a   (U(1) x G^2)
+    G^3        sum_f d_f / dim_G(R) A(R)       (G^3)
+
+with d_f the number of components of f (the product of its non-abelian
+irrep dims), T the Dynkin index (1/2 for the SU(N) fundamental) and A the
+cubic anomaly index (1 for the SU(N) fundamental). Both indices are
+computed once per (group, irrep) from its weight system and cached.
+
+Charges are scaled to integers, so a batch of candidate charge
+assignments is checked exactly with a few integer array products.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from itertools import combinations_with_replacement
+from math import gcd
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from liesym import LieAlgebra, LieGroup, U1
+
+from ..builders import Field, Lagrangian, Symmetry
+from ..exceptions import ModelError
+from ..registry import GroupKey, LRUCache, group_key
+from .batch import rep_key
+from .decomposition import Labels, decompositions
+
+_indices = LRUCache(4096)
+
+
+class IrrepIndices(NamedTuple):
+    """Group theory data of a single irrep.
+
+    Members:
+        dim (int): Dimension
+        dynkin (Fraction): Dynkin index T(R), Tr(T^a T^b) = T(R) delta^ab
+        cubic (Fraction): Cubic anomaly index A(R), 0 without a cubic invariant
+        casimir (Fraction): Quadratic Casimir C2(R), T^a T^a = C2(R) 1
+    """
+    dim: int
+    dynkin: Fraction
+    cubic: Fraction
+    casimir: Fraction
+
+
+def _cubic_sum(gkey: GroupKey, labels: Labels) -> int:
+    # cube of a generic Cartan direction, summed over the weights
+    direction = [3 ** i for i in range(len(labels))]
+    return sum(m * sum(c * x for c, x in zip(direction, w)) ** 3
+               for w, m in decompositions.weights(gkey, labels).items())
+
+
+def _cubic_reference(gkey: GroupKey, rank: int) -> int:
+    """Cubic sum of the smallest fundamental weight irrep with a non zero
+    one, the fundamental for SU(N). Zero when the algebra has no cubic invariant."""
+    units = [tuple(int(i == k) for i in range(rank)) for k in range(rank)]
+    for unit in sorted(units, key=lambda x: (decompositions.dim(gkey, x), [-v for v in x])):
+        total = _cubic_sum(gkey, unit)
+        if total:
+            return total
+    return 0
+
+
+def _compute_indices(gkey: GroupKey, labels: Labels) -> IrrepIndices:
+    data = decompositions._data(gkey)
+    rank = len(labels)
+    dim = decompositions.dim(gkey, labels)
+    shifted = tuple(x + 2 for x in labels)
+    adjoint = rank + 2 * len(data.positive)
+    # long roots have length^2 2 in the usual normalization
+    long_root = max(data.dot(a, a) for a in data.positive)
+    dynkin = Fraction(dim * data.dot(labels, shifted), adjoint * long_root)
+
+    reference = _indices.get((gkey, "cubic"), lambda: _cubic_reference(gkey, rank))
+    cubic = Fraction(_cubic_sum(gkey, labels), reference) if reference else Fraction(0)
+    return IrrepIndices(dim, dynkin, cubic, dynkin * adjoint / dim)
+
+
+def irrep_indices(group, irrep) -> IrrepIndices:
+    """Dimension, Dynkin index, cubic anomaly index and quadratic Casimir
+    of an irrep, cached per (group, irrep).
+
+    Examples
+    ========
+    >>> from liesym import SU
+    >>> from particlezoo.validations.anomalies import irrep_indices
+    >>> irrep_indices(SU(3), [0, 1])
+    IrrepIndices(dim=3, dynkin=Fraction(1, 2), cubic=Fraction(-1, 1), casimir=Fraction(4, 3))
+    >>> irrep_indices(SU(5), [0, 1, 0, 0])
+    IrrepIndices(dim=10, dynkin=Fraction(3, 2), cubic=Fraction(1, 1), casimir=Fraction(18, 5))
+    """
+    gkey = group if isinstance(group, tuple) else group_key(group)
+    labels = tuple(int(x) for x in irrep)
+    return _indices.get((gkey, labels), lambda: _compute_indices(gkey, labels))
+
+
+def _is_lie(group) -> bool:
+    return isinstance(group, (LieGroup, LieAlgebra))
+
+
+def _lcm(values) -> int:
+    out = 1
+    for x in values:
+        out = out * x // gcd(out, x)
+    return out
+
+
+class AnomalyChecker:
+    """Anomaly coefficients of the fermions of a model, for its own
+    charges or for a whole batch of candidate U(1) charge assignments
+    with the non-abelian content kept fixed.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry
+    >>> from particlezoo.validations import AnomalyChecker
+    >>> syms = [Symmetry("SU3", SU(3), True, "g"), Symmetry("Y", U1(), True, "g'")]
+    >>> q = Field("q", "1/2", {"SU3": Representation(Matrix([[1, 0]]), SU(3)), "Y": Representation("1/3", U1())})
+    >>> u = Field("u", "1/2", {"SU3": Representation(Matrix([[0, 1]]), SU(3)), "Y": Representation("-1/3", U1())})
+    >>> checker = AnomalyChecker([q, u], syms)
+    >>> checker.names
+    ['Y^3', 'Y grav^2', 'Y SU3^2', 'SU3^3']
+    >>> checker.is_anomaly_free()
+    True
+    >>> checker.anomaly_free([[[1], [-1]], [[1], [2]]]).tolist()
+    [True, False]
+    """
+
+    def __init__(self, fields: Sequence[Field], symmetries: Sequence[Symmetry]):
+        """Builds the index tables.
+
+        Args:
+            fields (Sequence[Field]): Fields of the model, only the fermions are used
+            symmetries (Sequence[Symmetry]): Symmetries of the model, only gauged U(1) and Lie groups enter
+        """
+        self.fermions: List[Field] = [x for x in fields if x.is_fermion]
+        lie = [x for x in symmetries if _is_lie(x.group)]
+        self.u1: List[Symmetry] = [x for x in symmetries if x.is_gauged and isinstance(x.group, U1)]
+        self.nonabelian: List[Symmetry] = [x for x in lie if x.is_gauged]
+
+        n, g = len(self.fermions), len(self.nonabelian)
+        indices: List[List[Optional[IrrepIndices]]] = []
+        dims: List[int] = []
+        for field in self.fermions:
+            row: Dict[str, Optional[IrrepIndices]] = {}
+            for sym in lie:
+                obj = field.representations.get(str(sym.name))
+                labels = (0,) if obj is None else rep_key(obj)
+                row[str(sym.name)] = irrep_indices(sym.group, labels) if any(labels) else None
+            indices.append([row[str(sym.name)] for sym in self.nonabelian])
+            dims.append(int(np.prod([x.dim for x in row.values() if x is not None], dtype=np.int64)))
+        self.dims = np.array(dims, dtype=np.int64)
+
+        # per field, per group: d_f / dim(R) T(R) and d_f / dim(R) A(R), as scaled integers
+        dynkin = [[Fraction(0) if x is None else x.dynkin * int(d) / x.dim for x in row]
+                  for row, d in zip(indices, dims)]
+        cubic = [[Fraction(0) if x is None else x.cubic * int(d) / x.dim for x in row]
+                 for row, d in zip(indices, dims)]
+        self.dynkin_scale = _lcm(v.denominator for row in dynkin for v in row)
+        self.dynkin = np.array([[int(v * self.dynkin_scale) for v in row] for row in dynkin],
+                               dtype=np.int64).reshape(n, g)
+        self.cubic = [sum((row[j] for row in cubic), Fraction(0)) for j in range(g)]
+
+        u = len(self.u1)
+        self.triples: List[Tuple[int, int, int]] = list(combinations_with_replacement(range(u), 3))
+        names = [str(x.tag or x.name) for x in self.u1]
+        groups = [str(x.tag or x.name) for x in self.nonabelian]
+        self.names: List[str] = (
+            [_monomial([names[i] for i in t]) for t in self.triples]
+            + [f"{a} grav^2" for a in names]
+            + [f"{a} {b}^2" for a in names for b in groups]
+            + [f"{b}^3" for b in groups])
+
+    @classmethod
+    def from_lagrangian(cls, lagrangian: Lagrangian) -> "AnomalyChecker":
+        """Builds the checker from all fields and symmetries of a Lagrangian"""
+        return cls(lagrangian.particle_contents, lagrangian.symmetries)
+
+    def charges(self) -> Tuple[np.ndarray, int]:
+        """The model's own U(1) charges as an integer array of shape
+        (n_fermions, n_u1) and their common denominator
+
+        Raises:
+            ModelError: If a charge is symbolic
+        """
+        table = []
+        for field in self.fermions:
+            row = []
+            for sym in self.u1:
+                obj = field.representations.get(str(sym.name))
+                q = Fraction(0) if obj is None else rep_key(obj)
+                if not isinstance(q, Fraction):
+                    raise ModelError(f"{field.name}: symbolic charge {q} under {sym.name}")
+                row.append(q)
+            table.append(row)
+        denominator = _lcm(q.denominator for row in table for q in row)
+        numerators = np.array([[int(q * denominator) for q in row] for row in table], dtype=np.int64)
+        return numerators.reshape(len(self.fermions), len(self.u1)), denominator
+
+    def residues(self, charges: Union[np.ndarray, Sequence]) -> np.ndarray:
+        """Scaled anomaly coefficients of a batch of charge assignments.
+
+        Args:
+            charges (array like): Integer charge numerators over any common denominator, of shape
+                (n_candidates, n_fermions, n_u1), fermions and U(1)s in the order of `fermions` and `u1`.
+
+        Returns:
+            np.ndarray: Integer array of shape (n_candidates, len(names)), each coefficient
+                multiplied by a positive constant, so zero exactly where it cancels.
+        """
+        q = np.asarray(charges)
+        if q.ndim != 3 or q.shape[1:] != (len(self.fermions), len(self.u1)):
+            raise ValueError("charges must have shape (n_candidates, n_fermions, n_u1)")
+        # python ints once the sums could overflow int64
+        largest = int(np.abs(q).max(initial=0))
+        bound = max(largest ** 3, largest * int(np.abs(self.dynkin).max(initial=0))) * int(self.dims.sum())
+        q = q.astype(object if bound >= 2 ** 62 else np.int64)
+        dims, dynkin = self.dims.astype(q.dtype), self.dynkin.astype(q.dtype)
+
+        columns = [(q[:, :, a] * q[:, :, b] * q[:, :, c]) @ dims for a, b, c in self.triples]
+        columns += [q[:, :, a] @ dims for a in range(len(self.u1))]
+        mixed = q.transpose(0, 2, 1) @ dynkin  # (n_candidates, n_u1, n_groups)
+        columns += [mixed[:, a, g] for a in range(len(self.u1)) for g in range(len(self.nonabelian))]
+        columns += [np.full(len(q), x.numerator, dtype=q.dtype) for x in self.cubic]
+        if not columns:
+            return np.zeros((len(q), 0), dtype=q.dtype)
+        return np.stack(columns, axis=1)
+
+    def anomaly_free(self, charges: Union[np.ndarray, Sequence]) -> np.ndarray:
+        """Boolean mask of the charge assignments where every anomaly cancels, see `residues`"""
+        return ~self.residues(charges).astype(bool).any(axis=1)
+
+    def coefficients(self) -> Dict[str, Fraction]:
+        """Every anomaly coefficient of the model's own charges"""
+        numerators, denominator = self.charges()
+        scaled = self.residues(numerators[None])[0]
+        scales = ([denominator ** 3] * len(self.triples) + [denominator] * len(self.u1)
+                  + [denominator * self.dynkin_scale] * (len(self.u1) * len(self.nonabelian)))
+        out = {name: Fraction(int(v), s) for name, v, s in zip(self.names, scaled, scales)}
+        out.update(zip(self.names[len(scales):], self.cubic))
+        return out
+
+    def is_anomaly_free(self) -> bool:
+        """Whether every anomaly of the model's own charges cancels"""
+        return not any(self.coefficients().values())
+
+
+def _monomial(names: Sequence[str]) -> str:
+    out: List[str] = []
+    for name in dict.fromkeys(names):
+        k = names.count(name)
+        out.append(name if k == 1 else f"{name}^{k}")
+    return " ".join(out)
+
+
+def anomalies(lagrangian: Lagrangian) -> Dict[str, Fraction]:
+    """Every gauge anomaly coefficient of a model, see `AnomalyChecker`"""
+    return AnomalyChecker.from_lagrangian(lagrangian).coefficients()
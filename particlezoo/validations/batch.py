@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import TYPE_CHECKING, Collection, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from liesym import LieGroup, LieAlgebra, U1, Z
+from sympy import Basic, Symbol, sympify
+
+from ..builders import Field, Representation, CoreModel, CoreField
+from ..builders.core import ABELIAN_GROUPS
+from ..exceptions import ConfigError
+from ..registry import GroupKey, group_key, registry
+from .decomposition import DecompositionCache
+
+if TYPE_CHECKING:
+    from .abelian import AbelianCharges
+
+Labels = Tuple[int, ...]
+RepKey = Union[Labels, Fraction, int, Basic]
+
+
+def _is_lie(group) -> bool:
+    return isinstance(group, (LieGroup, LieAlgebra))
+
+
+def _charge(value) -> Union[Fraction, Basic]:
+    """U(1) charge as a Fraction, or the sympy expr if it is symbolic"""
+    value = sympify(value) if isinstance(value, str) else value
+    if isinstance(value, (int, Fraction)):
+        return Fraction(value)
+    if value.is_Rational:
+        return Fraction(int(value.p), int(value.q))
+    return value
+
+
+def rep_key(representation: Representation) -> RepKey:
+    """Reduces a Representation to a small hashable key.
+
+    Lie group irreps become a tuple of Dynkin labels, U(1) charges
+    become a `Fraction` (or sympy expr if symbolic) and Z(n) irreps
+    become the integer index of `Z_k`.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1, Z
+    >>> from sympy import Matrix
+    >>> from particlezoo import Representation
+    >>> from particlezoo.validations import rep_key
+    >>> rep_key(Representation(Matrix([[1, 0]]), SU(3)))
+    (1, 0)
+    >>> rep_key(Representation("-1/2", U1()))
+    Fraction(-1, 2)
+    >>> rep_key(Representation("Z_1", Z(2)))
+    1
+    """
+    group, rep = representation.group, representation.rep
+    if _is_lie(group):
+        if isinstance(rep, (str, Symbol)):
+            rep = registry.irrep(group, str(rep))
+        return tuple(int(x) for x in rep)
+    if isinstance(group, U1):
+        return _charge(rep)
+    if isinstance(group, Z):
+        name = str(rep)
+        if not name.startswith("Z_"):
+            raise ConfigError(f"Cyclic representation must be Z_k, got {name}")
+        return int(name[2:]) % int(group.dimension)
+    raise TypeError(f"Unsupported group {group}")
+
+
+class GaugeInvarianceEngine:
+    """Batched gauge invariance checks with shared intermediate results.
+
+    Each field is reduced once per gauge to a `rep_key`. Non-abelian
+    terms are sorted so the multisets of many candidate terms share
+    prefixes, and are checked against a `DecompositionCache` that
+    extends the cached decomposition of every prefix by one irrep at a
+    time. Abelian gauges never touch liesym, charges are summed as
+    `Fraction` (mod n for Z(n)).
+
+    Works on both the sympy `Field`s (`check`) and the compact
+    `CoreField`s of a `CoreModel` (`check_core`), which is what the
+    operator search and process pool workers use.
+
+    Examples
+    ========
+    >>> from liesym import SU
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation
+    >>> from particlezoo.validations import GaugeInvarianceEngine
+    >>> q = Field("q", "1/2", {"QCD": Representation(Matrix([[1, 0]]), SU(3))})
+    >>> qb = Field("qb", "1/2", {"QCD": Representation(Matrix([[0, 1]]), SU(3))})
+    >>> engine = GaugeInvarianceEngine()
+    >>> engine.check_many([(q, qb), (q, q)])
+    [(True, ''), (False, 'QCD')]
+    """
+
+    def __init__(self, maxsize: Optional[int] = 65536, decompositions: Optional[DecompositionCache] = None):
+        """Creates the engine.
+
+        Args:
+            maxsize (Optional[int], optional): Size bound of each internal cache. Defaults to 65536.
+            decompositions (DecompositionCache, optional): Decompositions to share, eg one restored
+                from disk. Defaults to a fresh cache bounded by `maxsize`.
+        """
+        # keyed on identity, Field compares by name only and a field rebuilt
+        # with the same name can carry other representations. The field is
+        # held in the entry so its id is not reused while cached.
+        self._fields: Dict[int, Tuple[Field, Tuple[Tuple[str, GroupKey, RepKey], ...]]] = {}
+        self.decompositions = decompositions or DecompositionCache(maxsize)
+
+    def _field_keys(self, field: Field) -> Tuple[Tuple[str, GroupKey, RepKey], ...]:
+        entry = self._fields.get(id(field))
+        if entry is not None:
+            return entry[1]
+        keys = tuple(
+            (gauge, group_key(obj.group), rep_key(obj))
+            for gauge, obj in field.representations.items()
+        )
+        self._fields[id(field)] = (field, keys)
+        return keys
+
+    def _is_invariant(self, gkey: GroupKey, reps: List[RepKey]) -> bool:
+        if gkey[0] in ABELIAN_GROUPS:
+            total = sum(reps, Fraction(0))
+            if gkey[0] == "z":
+                return total % gkey[1] == 0
+            return total == 0
+
+        return self.decompositions.has_singlet(gkey, reps)
+
+    def _check(self, items: Iterable[Tuple[str, GroupKey, RepKey]]) -> Tuple[bool, str]:
+        gauges: Dict[str, Tuple[GroupKey, List[RepKey]]] = {}
+        for gauge, gkey, key in items:
+            entry = gauges.get(gauge)
+            if entry is None:
+                gauges[gauge] = (gkey, [key])
+                continue
+            if entry[0] != gkey:
+                raise ConfigError(
+                    "FieldModel.representations matching keys should have matching group")
+            entry[1].append(key)
+
+        for gauge in sorted(gauges):  # ensure alphabetical
+            gkey, reps = gauges[gauge]
+            if not self._is_invariant(gkey, reps):
+                return False, gauge
+        return True, ""
+
+    def check(self, terms: Sequence[Field], skip: Collection[str] = ()) -> Tuple[bool, str]:
+        """Checks a single interaction, same contract as `is_gauge_invariant`.
+
+        Args:
+            terms (Sequence[Field]): Group of interacting fields
+            skip (Collection[str], optional): Group types (eg "u", "z") whose gauges are
+                not checked, as in `particlezoo.registry.group_key`. Defaults to checking all.
+        """
+        return self._check(item for field in terms for item in self._field_keys(field)
+                           if item[1][0] not in skip)
+
+    def check_core(self, model: CoreModel, terms: Sequence[CoreField]) -> Tuple[bool, str]:
+        """Checks a single interaction of compact fields from `model`"""
+        symmetries = model.symmetries
+        groups = model.groups
+        return self._check(
+            (symmetries[i].name, groups[symmetries[i].group], key)
+            for field in terms for i, key in field.reps)
+
+    def check_many(
+            self,
+            batch: Iterable[Sequence[Field]],
+            charges: Optional[AbelianCharges] = None) -> List[Tuple[bool, str]]:
+        """Checks every interaction in batch.
+
+        Args:
+            batch (Iterable[Sequence[Field]]): Interactions to check
+            charges (AbelianCharges, optional): Charge table used to reject non neutral terms
+                in bulk before any non abelian product is computed. A rejected term reports
+                its first violated abelian gauge, even when a non abelian gauge sorting
+                before it would fail too.
+
+        Returns:
+            List[Tuple[bool, str]]: Flag and failing gauge name (or empty string) per interaction.
+        """
+        if charges is None:
+            return [self.check(terms) for terms in batch]
+
+        batch = list(batch)
+        violations = charges.first_violation(batch)
+        return [(False, bad) if bad else self.check(terms)
+                for terms, bad in zip(batch, violations)]
+
+    def clear(self):
+        """Drops all cached results"""
+        self._fields.clear()
+        self.decompositions.clear()
+
+
+def is_gauge_invariant_batch(
+        batch: Iterable[Sequence[Field]],
+        engine: Optional[GaugeInvarianceEngine] = None,
+        charges: Optional[AbelianCharges] = None,
+        jobs: Optional[int] = None) -> List[Tuple[bool, str]]:
+    """Checks many groups of fields for gauge invariance at once.
+
+    Args:
+        batch (Iterable[Sequence[Field]]): Interactions to check
+        engine (GaugeInvarianceEngine, optional): Engine to reuse caches from. Defaults to a fresh engine.
+        charges (AbelianCharges, optional): Abelian pre-filter, see `GaugeInvarianceEngine.check_many`.
+            With `jobs` it runs in this process and only the neutral terms go to the workers.
+        jobs (int, optional): Number of worker processes. Defaults to serial in this process.
+
+    Raises:
+        ValueError: If both `engine` and `jobs > 1` are given, workers can not share its caches.
+
+    Returns:
+        List[Tuple[bool, str]]: For each interaction the flag and name of failing gauge group or empty string.
+    """
+    if jobs is not None and jobs > 1:
+        from .parallel import check_parallel
+
+        if engine is not None:
+            raise ValueError("engine can not be shared with worker processes, pass jobs or engine")
+        if charges is None:
+            return list(check_parallel(batch, jobs))
+        batch = list(batch)
+        violations = charges.first_violation(batch)
+        checked = check_parallel((terms for terms, bad in zip(batch, violations) if not bad), jobs)
+        return [(False, bad) if bad else next(checked) for bad in violations]
+
+    engine = engine or GaugeInvarianceEngine()
+    return engine.check_many(batch, charges=charges)
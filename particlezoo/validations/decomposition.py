@@ -0,0 +1,277 @@
+"""Memoized tensor product decompositions with multiplicities.
+
+Products are kept as sparse maps from the Dynkin labels of each irrep to
+its multiplicity. A pair is decomposed with the Brauer-Klimyk formula:
+the weights of the smaller irrep (from Freudenthal's formula) are added
+to the highest weight of the larger one and reflected into the dominant
+chamber. Longer products are composed pairwise from their sorted
+prefixes, so the prefixes shared between many terms are computed once.
+
+`has_singlet` is what the gauge invariance checks use. It stops as soon
+as a singlet can no longer appear. Components of a partial product that
+are larger than the product of the irreps still to come cannot pair off
+into a singlet and are dropped. The last irrep is never multiplied in, the
+product contains a singlet exactly when the remainder contains its
+conjugate.
+
+Every table is an `LRUCache`, the whole cache can be pickled to disk with
+`save` and restored with `DecompositionCache.load`.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sympy import Matrix, ilcm
+
+from ..instrumentation import timed
+from ..registry import CacheInfo, GroupKey, LRUCache, _algebra, registry
+
+Labels = Tuple[int, ...]
+Decomposition = Dict[Labels, int]
+
+
+class _Algebra(NamedTuple):
+    """Integer data of an algebra in the Dynkin (omega) basis.
+
+    Members:
+        simple (List[Labels]): Simple roots, rows of the Cartan matrix
+        positive (List[Labels]): Positive roots
+        metric (List[List[int]]): Quadratic form scaled to integers
+    """
+    simple: List[Labels]
+    positive: List[Labels]
+    metric: List[List[int]]
+
+    def dot(self, x: Sequence[int], y: Sequence[int]) -> int:
+        return sum(x[i] * m * y[j] for i, row in enumerate(self.metric) for j, m in enumerate(row) if m)
+
+
+def _algebra_data(gkey: GroupKey) -> _Algebra:
+    algebra = _algebra(registry.group(*gkey))
+    cartan = algebra.cartan_matrix
+    simple = [tuple(int(x) for x in cartan.row(i)) for i in range(cartan.rows)]
+    positive = [tuple(int(x) for x in algebra.to_omega(r)) for r in algebra.positive_roots]
+    metric = Matrix(algebra.metric_tensor)
+    scale = ilcm(*[x.q for x in metric], 1)
+    return _Algebra(simple, positive, [[int(x * scale) for x in metric.row(i)] for i in range(metric.rows)])
+
+
+def _add(x: Sequence[int], y: Sequence[int], k: int = 1) -> Labels:
+    return tuple(a + k * b for a, b in zip(x, y))
+
+
+class DecompositionCache:
+    """Size bounded cache of tensor product decompositions.
+
+    Groups are given by their `GroupKey`, irreps by Dynkin labels.
+
+    Examples
+    ========
+    >>> from particlezoo.validations.decomposition import DecompositionCache
+    >>> cache = DecompositionCache()
+    >>> sorted(cache.product(("su", 3), (1, 1), (1, 1)).items())
+    [((0, 0), 1), ((0, 3), 1), ((1, 1), 2), ((2, 2), 1), ((3, 0), 1)]
+    >>> cache.has_singlet(("su", 3), [(1, 0), (1, 0), (1, 0)])
+    True
+    >>> cache.has_singlet(("su", 3), [(1, 0), (1, 0), (1, 1), (2, 2)])
+    False
+    """
+
+    def __init__(self, maxsize: Optional[int] = 65536):
+        """Creates an empty cache.
+
+        Args:
+            maxsize (Optional[int], optional): Size bound of each internal table, None is unbounded. Defaults to 65536.
+        """
+        self.maxsize = maxsize
+        self._algebras: Dict[GroupKey, _Algebra] = {}
+        self._weights = LRUCache(maxsize)
+        self._dims = LRUCache(maxsize)
+        self._pairs = LRUCache(maxsize)
+        self._products = LRUCache(maxsize)
+        self._singlets = LRUCache(maxsize)
+
+    def _data(self, gkey: GroupKey) -> _Algebra:
+        data = self._algebras.get(gkey)
+        if data is None:
+            data = self._algebras[gkey] = _algebra_data(gkey)
+        return data
+
+    def dim(self, gkey: GroupKey, irrep: Labels) -> int:
+        """Dimension of an irrep, from the Weyl dimension formula"""
+        def compute():
+            data = self._data(gkey)
+            rho = (1,) * len(irrep)
+            num, den = 1, 1
+            for alpha in data.positive:
+                num *= data.dot(_add(irrep, rho), alpha)
+                den *= data.dot(rho, alpha)
+            return num // den
+        return self._dims.get((gkey, irrep), compute)
+
+    def weights(self, gkey: GroupKey, irrep: Labels) -> Decomposition:
+        """Every weight of an irrep with its multiplicity, from Freudenthal's formula"""
+        return self._weights.get((gkey, irrep), lambda: self._freudenthal(gkey, irrep))
+
+    def _freudenthal(self, gkey: GroupKey, irrep: Labels) -> Decomposition:
+        data = self._data(gkey)
+        shifted = _add(irrep, (1,) * len(irrep))
+        norm = data.dot(shifted, shifted)
+        mults = {irrep: 1}
+        layer = [irrep]
+        while layer:
+            candidates = sorted({_add(w, a, -1) for w in layer for a in data.simple} - mults.keys())
+            layer = []
+            for mu in candidates:
+                total = 0
+                for alpha in data.positive:
+                    k, nu = 1, _add(mu, alpha)
+                    while nu in mults:
+                        total += mults[nu] * data.dot(nu, alpha)
+                        k, nu = k + 1, _add(nu, alpha)
+                mu_rho = _add(mu, (1,) * len(mu))
+                gap = norm - data.dot(mu_rho, mu_rho)
+                m = 2 * total // gap if gap > 0 else 0  # no weight reaches the orbit of the top
+                if m > 0:
+                    mults[mu] = m
+                    layer.append(mu)
+        return mults
+
+    @timed("tensor_product")
+    def _brauer_klimyk(self, gkey: GroupKey, a: Labels, b: Labels) -> Decomposition:
+        if self.dim(gkey, a) < self.dim(gkey, b):
+            a, b = b, a
+        simple = self._data(gkey).simple
+        rho = (1,) * len(a)
+        out: Decomposition = {}
+        for w, m in self.weights(gkey, b).items():
+            v, sign = _add(_add(a, w), rho), 1
+            while True:
+                i = next((i for i, x in enumerate(v) if x <= 0), None)
+                if i is None or v[i] == 0:
+                    break
+                v, sign = _add(v, simple[i], -v[i]), -sign
+            if i is not None:  # on a wall, cancels
+                continue
+            key = _add(v, rho, -1)
+            out[key] = out.get(key, 0) + sign * m
+        return {k: v for k, v in out.items() if v}
+
+    def product(self, gkey: GroupKey, a: Labels, b: Labels) -> Decomposition:
+        """Decomposition of a pair of irreps"""
+        if not any(a):
+            return {b: 1}
+        if not any(b):
+            return {a: 1}
+        key = (gkey,) + ((a, b) if a <= b else (b, a))
+        return self._pairs.get(key, lambda: self._brauer_klimyk(gkey, *key[1:]))
+
+    def _compose(self, gkey: GroupKey, left: Decomposition, irrep: Labels,
+                 bound: Optional[int] = None) -> Decomposition:
+        out: Decomposition = {}
+        for mu, m in left.items():
+            for nu, n in self.product(gkey, mu, irrep).items():
+                if bound is None or self.dim(gkey, nu) <= bound:
+                    out[nu] = out.get(nu, 0) + m * n
+        return out
+
+    def decompose(self, gkey: GroupKey, irreps: Iterable[Labels]) -> Decomposition:
+        """Full decomposition of a product of irreps, in any order"""
+        reps = tuple(sorted(x for x in irreps if any(x)))
+        if not reps:
+            return {(0,) * self._rank(gkey): 1}
+        return dict(self._prefix(gkey, reps))
+
+    def _prefix(self, gkey: GroupKey, reps: Tuple[Labels, ...]) -> Decomposition:
+        if len(reps) == 1:
+            return {reps[0]: 1}
+        return self._products.get(
+            (gkey, reps), lambda: self._compose(gkey, self._prefix(gkey, reps[:-1]), reps[-1]))
+
+    def _reachable(self, gkey: GroupKey, reps: Tuple[Labels, ...], bound: int) -> Decomposition:
+        """Components of the product of reps with dimension at most bound"""
+        if len(reps) == 1:
+            return {reps[0]: 1} if self.dim(gkey, reps[0]) <= bound else {}
+        key = (gkey, reps, bound)
+        return self._products.get(key, lambda: self._compose(
+            gkey, self._reachable(gkey, reps[:-1], bound * self.dim(gkey, reps[-1])), reps[-1], bound))
+
+    def has_singlet(self, gkey: GroupKey, irreps: Iterable[Labels]) -> bool:
+        """Whether the product of irreps contains a singlet"""
+        reps = tuple(sorted(x for x in irreps if any(x)))
+        if len(reps) < 2:
+            return not reps
+
+        def compute():
+            *rest, last = reps
+            conj = registry.conjugate(registry.group(*gkey), last)
+            if len(rest) == 1:
+                return rest[0] == conj
+            return conj in self._reachable(gkey, tuple(rest), self.dim(gkey, last))
+        return self._singlets.get((gkey, reps), compute)
+
+    def _rank(self, gkey: GroupKey) -> int:
+        return len(self._data(gkey).simple)
+
+    def info(self) -> Dict[str, CacheInfo]:
+        """Returns the hit/miss statistics of each table"""
+        return {
+            "weights": self._weights.info(),
+            "pairs": self._pairs.info(),
+            "products": self._products.info(),
+            "singlets": self._singlets.info(),
+        }
+
+    def clear(self):
+        """Drops every cached decomposition"""
+        for table in (self._weights, self._dims, self._pairs, self._products, self._singlets):
+            table.clear()
+
+    def _tables(self):
+        return {"weights": self._weights, "dims": self._dims, "pairs": self._pairs,
+                "products": self._products, "singlets": self._singlets}
+
+    def save(self, fname: str):
+        """Pickles every table to fname, replacing it atomically"""
+        from ..parsers.cache import _versions
+
+        state = {"versions": _versions(),
+                 "tables": {k: list(v.items()) for k, v in self._tables().items()}}
+        directory = os.path.dirname(os.path.abspath(fname))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, fname)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, fname: str, maxsize: Optional[int] = 65536) -> "DecompositionCache":
+        """Restores a cache written by `save`. A missing, unreadable or
+        stale (other particlezoo or liesym version) file gives an empty cache.
+        """
+        from ..parsers.cache import _versions
+
+        cache = cls(maxsize)
+        try:
+            with open(fname, "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return cache
+        if not isinstance(state, dict) or state.get("versions") != _versions():
+            return cache
+        tables = cache._tables()
+        for name, items in state["tables"].items():
+            if name in tables:
+                for key, value in items:
+                    tables[name].put(key, value)
+        return cache
+
+
+decompositions = DecompositionCache()
@@ -1,17 +1,21 @@
 from typing import Iterable, List, Set, Tuple, Union
 from liesym import Group, LieGroup
-from sympy import Matrix, Symbol
+from sympy import Basic, Matrix, Symbol
 import logging
 
 from ..builders import Field
 from ..exceptions import ConfigError
+from ..instrumentation import timed
+from ..registry import group_key
+from .decomposition import decompositions
 
 
+@timed("is_gauge_invariant_repr")
 def is_gauge_invariant_repr(terms: Iterable[Union[Matrix, Symbol, str]], group: Group) -> bool:
     """Checks whether terms are guage invariant under chosen gauge group representation.
 
     Args:
-        terms (Iterable[Union[Matrix, Symbol, str]]): Tuple or List of representations. If all are Symbol or str, will use symbolic product
+        terms (Iterable[Union[Matrix, Symbol, str]]): Tuple or List of representations. If all are Symbol, str or charges, will use symbolic product
         group (Group): Selected gauge group
 
     Returns:
@@ -32,10 +36,16 @@ def is_gauge_invariant_repr(terms: Iterable[Union[Matrix, Symbol, str]], group:
     if not isinstance(terms, (list, tuple)):
         raise TypeError(f"terms must be a iterable")
 
-    if all(isinstance(term, str) or isinstance(term, Symbol) for term in terms):
+    if all(isinstance(term, Matrix) for term in terms):
+        if isinstance(group, LieGroup):
+            # memoized and shared by every check, see `decomposition`
+            return decompositions.has_singlet(
+                group_key(group), [tuple(int(x) for x in term) for term in terms])
+        # a lone irrep is its own decomposition
+        results = group.product(*terms) if len(terms) > 1 else list(terms)
+    elif all(isinstance(term, (str, Basic)) for term in terms):
+        # symbols, or plain charges like 1/6 for U(1)
         results = group.sym_product(*terms, as_tuple=True)
-    elif all(isinstance(term, Matrix) for term in terms):
-        results = group.product(*terms)
     else:
         raise TypeError(f"terms must be a iterable of type {type(Field)}")
 
@@ -47,6 +57,7 @@ def is_gauge_invariant_repr(terms: Iterable[Union[Matrix, Symbol, str]], group:
     return any([x[1] == 1 for x in results])
 
 
+@timed("is_gauge_invariant")
 def is_gauge_invariant(terms: Iterable[Field], **kwargs) -> Tuple[bool, str]:
     """Checks a group of FieldModels for gauge invariance.
 
@@ -21,10 +21,9 @@ def validate_mass_dim(terms: Iterable[Field], **kwargs) -> Renormalizability:
     Returns:
         Renormalizability: Level of renormalization
     """
-    if isinstance(terms, (list, tuple)):
-        raise TypeError(f"terms must be a iterable of type {type(Field)}")
+    if not isinstance(terms, (list, tuple)):
+        terms = list(terms)
 
-    terms: Iterable[Field] = terms
     name = kwargs.get("name", "Interaction")
     n_terms = len(terms)
     logging.debug(f"Validating (Mass dim): {name} with {n_terms} terms")
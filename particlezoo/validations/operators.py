@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Iterator, List, Optional, Tuple
+
+from ..builders import Field, Lagrangian, CoreModel, CoreField
+from .abelian import AbelianCharges
+from .batch import GaugeInvarianceEngine
+from .global_invariance import Renormalizability
+
+
+def _classify(dim: Fraction) -> Renormalizability:
+    if dim < 4:
+        return Renormalizability.SuperRenorm
+    if dim == 4:
+        return Renormalizability.Renorm
+    return Renormalizability.NonRenorm
+
+
+def operator_atoms(lagrangian: Lagrangian, conjugates: bool = True) -> List[Field]:
+    """The building blocks of operators, each field followed by its conjugate"""
+    atoms: List[Field] = []
+    for field in lagrangian.particle_contents:
+        atoms.append(field)
+        if conjugates:
+            atoms.append(field.conjugate())
+    return atoms
+
+
+class _Search:
+    """Depth first search over sorted multisets of atoms.
+
+    Atoms are only appended in non-decreasing index order so every
+    multiset is visited exactly once. A branch is cut as soon as its
+    mass dimension exceeds the budget, or one of its U(1) charges is
+    larger than the remaining fields could possibly cancel.
+    """
+
+    def __init__(self,
+                 model: CoreModel,
+                 atoms: List[CoreField],
+                 max_dim: Fraction,
+                 min_fields: int,
+                 engine: GaugeInvarianceEngine):
+        self.model = model
+        self.atoms = atoms
+        self.max_dim = max_dim
+        self.min_fields = min_fields
+        self.engine = engine
+
+        n = len(atoms)
+        self.dims = [x.mass_dim for x in atoms]
+        self.fermions = [x.is_fermion for x in atoms]
+
+        table = AbelianCharges.from_core(model, atoms)
+        self.charges = [tuple(int(q) for q in row) for row in table.charges]
+        self.moduli = [int(m) for m in table.moduli]
+
+        # Suffix bounds used for pruning, atoms at or after index i
+        self.min_dim = [Fraction(0)] * n
+        self.max_charge: List[Tuple[int, ...]] = [()] * n
+        n_sym = len(self.moduli)
+        running_dim: Optional[Fraction] = None
+        running_q = [0] * n_sym
+        for i in reversed(range(n)):
+            d = self.dims[i]
+            running_dim = d if running_dim is None else min(running_dim, d)
+            running_q = [max(a, abs(b)) for a, b in zip(running_q, self.charges[i])]
+            self.min_dim[i] = running_dim
+            self.max_charge[i] = tuple(running_q)
+
+    def _cancellable(self, start: int, dim: Fraction, charge: List[int]) -> bool:
+        """Whether atoms from `start` on could still neutralize the U(1) charges"""
+        budget = self.max_dim - dim
+        if start >= len(self.atoms) or self.min_dim[start] <= 0:
+            return True
+        n_more = int(budget / self.min_dim[start])
+        for q, bound, mod in zip(charge, self.max_charge[start], self.moduli):
+            if mod == 0 and abs(q) > n_more * bound:
+                return False
+        return True
+
+    def _accept(self, stack: List[int], dim: Fraction, charge: List[int], n_fermions: int) -> bool:
+        if len(stack) < self.min_fields or n_fermions % 2:
+            return False
+        for q, mod in zip(charge, self.moduli):
+            if (q % mod if mod else q) != 0:
+                return False
+        terms = [self.atoms[i] for i in stack]
+        return self.engine.check_core(self.model, terms)[0]
+
+    def run(self, first: Optional[int] = None,
+            second: Optional[int] = None) -> Iterator[Tuple[Tuple[int, ...], Fraction]]:
+        """Yields (atom indices, mass dim) of invariant multisets.
+
+        Args:
+            first (int, optional): Only multisets whose lowest atom index is `first`.
+                Used to split the search into independent chunks.
+            second (int, optional): With `first`, only multisets whose two lowest
+                atom indices are `first` and `second`, a finer split. The
+                multiset of `first` alone is left to `root`.
+        """
+        n_sym = len(self.moduli)
+        stack: List[int] = []
+
+        def search(start: int, dim: Fraction, charge: List[int], n_fermions: int):
+            if stack and self._accept(stack, dim, charge, n_fermions):
+                yield tuple(stack), dim
+
+            stop = first + 1 if first is not None and not stack else len(self.atoms)
+            for i in range(start, stop):
+                d = dim + self.dims[i]
+                if d > self.max_dim:
+                    continue
+                q = [a + b for a, b in zip(charge, self.charges[i])]
+                if not self._cancellable(i, d, q):
+                    continue
+                stack.append(i)
+                yield from search(i, d, q, n_fermions + self.fermions[i])
+                stack.pop()
+
+        if first is None or second is None:
+            yield from search(first or 0, Fraction(0), [0] * n_sym, 0)
+            return
+
+        # same cuts the full search makes on its way down to [first, second]
+        dim, charge = Fraction(0), [0] * n_sym
+        for i in (first, second):
+            dim += self.dims[i]
+            charge = [a + b for a, b in zip(charge, self.charges[i])]
+            if dim > self.max_dim or not self._cancellable(i, dim, charge):
+                return
+        stack.extend((first, second))
+        yield from search(second, dim, charge, self.fermions[first] + self.fermions[second])
+
+    def root(self, first: int) -> Iterator[Tuple[Tuple[int, ...], Fraction]]:
+        """The multiset of `first` alone, if invariant. With `run(first, j)`
+        for every j from `first` on it covers `run(first)`, in order."""
+        dim = self.dims[first]
+        if dim <= self.max_dim and self._accept(
+                [first], dim, list(self.charges[first]), self.fermions[first]):
+            yield (first,), dim
+
+
+def enumerate_operators(
+        lagrangian: Lagrangian,
+        max_dim: int = 4,
+        renormalizability: Optional[Renormalizability] = None,
+        conjugates: bool = True,
+        min_fields: int = 2,
+        engine: Optional[GaugeInvarianceEngine] = None,
+        jobs: Optional[int] = None) -> Iterator[Tuple[Field, ...]]:
+    """Lazily yields every gauge invariant field multiset up to a mass dimension.
+
+    Multisets are built from the fields of the Lagrangian and (optionally)
+    their conjugates, the search itself runs on the compact `CoreModel`. Branches are pruned on mass dimension and on abelian
+    charges while they are being built, only complete candidates reach the
+    non abelian check. Candidates with an odd number of fermions can not
+    be Lorentz scalars and are skipped.
+
+    Args:
+        lagrangian (Lagrangian): Model to build operators from
+        max_dim (int, optional): Highest mass dimension. Defaults to 4.
+        renormalizability (Renormalizability, optional): Only yield operators of this class. Defaults to all.
+        conjugates (bool, optional): Include conjugate fields. Defaults to True.
+        min_fields (int, optional): Fewest fields in an operator. Defaults to 2.
+        engine (GaugeInvarianceEngine, optional): Engine to share caches with. Defaults to a fresh engine.
+        jobs (int, optional): Number of worker processes, see `particlezoo.validations.parallel`. Defaults to serial.
+
+    Raises:
+        ValueError: If both `engine` and `jobs > 1` are given, workers can not share its caches.
+
+    Yields:
+        Tuple[Field, ...]: Gauge invariant operator as a tuple of fields
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+    >>> from particlezoo.validations import enumerate_operators
+    >>> su2, u1 = SU(2), U1()
+    >>> H = Field("H", "0", {"L": Representation(Matrix([[1]]), su2),
+    ...                      "Y": Representation("1/2", u1)})
+    >>> lag = Lagrangian([H], [Symmetry("L", su2, True, "g"), Symmetry("Y", u1, True, "g'")], "Higgs")
+    >>> [tuple(str(f.name) for f in op) for op in enumerate_operators(lag, 4)]
+    [('H', 'H', 'H^{\\\\dagger}', 'H^{\\\\dagger}'), ('H', 'H^{\\\\dagger}')]
+    """
+    atoms = operator_atoms(lagrangian, conjugates)
+
+    if jobs is not None and jobs > 1:
+        if engine is not None:
+            raise ValueError("engine can not be shared with worker processes, pass jobs or engine")
+        from .parallel import enumerate_indices_parallel
+        results = enumerate_indices_parallel(
+            CoreModel.from_lagrangian(lagrangian), max_dim, renormalizability,
+            conjugates, min_fields, jobs)
+        for indices in results:
+            yield tuple(atoms[i] for i in indices)
+        return
+
+    model = CoreModel.from_lagrangian(lagrangian)
+    search = _Search(model, model.atoms(conjugates), Fraction(max_dim), min_fields,
+                     engine or GaugeInvarianceEngine())
+    for indices in _filtered(search.run(), renormalizability):
+        yield tuple(atoms[i] for i in indices)
+
+
+def operators_containing(
+        lagrangian: Lagrangian,
+        field: Field,
+        max_dim: int = 4,
+        renormalizability: Optional[Renormalizability] = None,
+        conjugates: bool = True,
+        min_fields: int = 2,
+        engine: Optional[GaugeInvarianceEngine] = None) -> Iterator[Tuple[Field, ...]]:
+    """Lazily yields the invariant operators of the Lagrangian that contain
+    `field` or its conjugate, the same tuples `enumerate_operators` would give.
+
+    The field's atoms are moved to the front of the search so that only
+    multisets starting with them are visited, the rest of the model is
+    never enumerated. Used to update operator sets incrementally.
+
+    Examples
+    ========
+    >>> from liesym import U1
+    >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+    >>> from particlezoo.validations.operators import operators_containing
+    >>> u1 = U1()
+    >>> H = Field("H", "0", {"Y": Representation("1/2", u1)})
+    >>> S = Field("S", "0", {"Y": Representation("-1", u1)})
+    >>> lag = Lagrangian([H, S], [Symmetry("Y", u1, True, "g'")], "Toy")
+    >>> [tuple(str(f.name) for f in op) for op in operators_containing(lag, S, 3)]
+    [('S', 'S^{\\\\dagger}'), ('H', 'H', 'S'), ('H^{\\\\dagger}', 'H^{\\\\dagger}', 'S^{\\\\dagger}')]
+    """
+    if field not in lagrangian.particle_contents:
+        raise ValueError(f"Cannot find field {field.name}.")
+
+    order = {atom: i for i, atom in enumerate(operator_atoms(lagrangian, conjugates))}
+    view = Lagrangian([field] + [x for x in lagrangian.particle_contents if x != field],
+                      lagrangian.symmetries, lagrangian.name)
+    atoms = operator_atoms(view, conjugates)
+
+    model = CoreModel.from_lagrangian(view)
+    search = _Search(model, model.atoms(conjugates), Fraction(max_dim), min_fields,
+                     engine or GaugeInvarianceEngine())
+    for first in ((0, 1) if conjugates else (0,)):
+        for indices in _filtered(search.run(first), renormalizability):
+            yield tuple(sorted((atoms[i] for i in indices), key=order.__getitem__))
+
+
+def _filtered(results: Iterator[Tuple[Tuple[int, ...], Fraction]],
+              renormalizability: Optional[Renormalizability]) -> Iterator[Tuple[int, ...]]:
+    for indices, dim in results:
+        if renormalizability is not None and _classify(dim) != renormalizability:
+            continue
+        yield indices
@@ -0,0 +1,120 @@
+"""Process pool versions of the batch validation and operator enumeration.
+
+Workers never receive sympy objects. The model is shipped once per worker
+as a compact `CoreModel` in the pool initializer, after that only tuples
+of integer field indices cross process boundaries. `Executor.map` is used
+throughout so results stream back in the same order as the serial code
+produces them.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..builders import CoreModel, Field
+from .batch import GaugeInvarianceEngine
+from .global_invariance import Renormalizability
+
+_state: Dict[str, object] = {}
+
+
+def _executor(jobs: int, initializer, initargs) -> ProcessPoolExecutor:
+    # liesym's native backend keeps threads around, forking after it has
+    # been used can deadlock the children, so always spawn fresh workers.
+    return ProcessPoolExecutor(
+        jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs)
+
+
+def _default_chunksize(n_tasks: int, jobs: int) -> int:
+    return max(1, n_tasks // (jobs * 8))
+
+
+def _init_check_worker(model: CoreModel):
+    _state["model"] = model
+    _state["engine"] = GaugeInvarianceEngine()
+
+
+def _check_chunk(chunk: List[Tuple[int, ...]]) -> List[Tuple[bool, str]]:
+    model: CoreModel = _state["model"]  # type: ignore
+    engine: GaugeInvarianceEngine = _state["engine"]  # type: ignore
+    fields = model.fields
+    return [engine.check_core(model, [fields[i] for i in term]) for term in chunk]
+
+
+def check_parallel(
+        batch: Iterable[Sequence[Field]],
+        jobs: int,
+        chunksize: int = 1024) -> Iterator[Tuple[bool, str]]:
+    """Checks many groups of fields for gauge invariance on a process pool.
+
+    Args:
+        batch (Iterable[Sequence[Field]]): Interactions to check
+        jobs (int): Number of worker processes
+        chunksize (int, optional): Interactions per task. Defaults to 1024.
+
+    Yields:
+        Tuple[bool, str]: Flag and failing gauge name per interaction, in input order
+    """
+    index: Dict[Field, int] = {}
+    terms: List[Tuple[int, ...]] = []
+    for interaction in batch:
+        terms.append(tuple(index.setdefault(f, len(index)) for f in interaction))
+
+    model = CoreModel.from_fields(list(index))
+    chunks = [terms[i:i + chunksize] for i in range(0, len(terms), chunksize)]
+
+    with _executor(jobs, _init_check_worker, (model,)) as pool:
+        for results in pool.map(_check_chunk, chunks):
+            yield from results
+
+
+def _init_enumerate_worker(model: CoreModel, max_dim: int, conjugates: bool, min_fields: int):
+    from .operators import _Search
+
+    _state["search"] = _Search(model, model.atoms(conjugates), Fraction(max_dim),
+                               min_fields, GaugeInvarianceEngine())
+
+
+def _enumerate_chunk(args: Tuple[int, Optional[int], Optional[Renormalizability]]) -> List[Tuple[int, ...]]:
+    from .operators import _filtered
+
+    first, second, renormalizability = args
+    search = _state["search"]
+    found = search.root(first) if second is None else search.run(first, second)  # type: ignore
+    return list(_filtered(found, renormalizability))
+
+
+def enumerate_indices_parallel(
+        model: CoreModel,
+        max_dim: int,
+        renormalizability: Optional[Renormalizability],
+        conjugates: bool,
+        min_fields: int,
+        jobs: int,
+        chunksize: Optional[int] = None) -> Iterator[Tuple[int, ...]]:
+    """Operator search split by the two lowest atoms over a process pool.
+
+    Splitting on the lowest atom alone leaves nearly all the work to the
+    first few tasks, the pair keeps the tasks of similar size.
+
+    Yields:
+        Tuple[int, ...]: Indices into `model.atoms(conjugates)`, in the
+        same order as the serial search.
+    """
+    n_atoms = len(model.fields) * (2 if conjugates else 1)
+    tasks: List[Tuple[int, Optional[int], Optional[Renormalizability]]] = []
+    for i in range(n_atoms):
+        tasks.append((i, None, renormalizability))
+        tasks.extend((i, j, renormalizability) for j in range(i, n_atoms))
+    chunksize = chunksize or _default_chunksize(len(tasks), jobs)
+
+    with _executor(jobs, _init_enumerate_worker,
+                   (model, max_dim, conjugates, min_fields)) as pool:
+        for results in pool.map(_enumerate_chunk, tasks, chunksize=chunksize):
+            yield from results
@@ -0,0 +1,211 @@
+"""Scans of U(1) charges over a rational grid.
+
+The model is given once as a template whose U(1) charges may be affine
+functions of a few parameters, eg `x` or `1/2 - x`. Each charge is split
+into a constant and one coefficient per parameter, all scaled to
+integers. The total charge of an operator at every grid point is then
+one integer array product. The non-abelian and Z(n) content does not
+depend on the parameters, so it is checked once per operator, and no
+sympy object is built per point.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from itertools import product
+from math import gcd
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from liesym import U1
+from sympy import Basic, Symbol, sympify
+
+from ..builders import Field, Lagrangian
+from ..exceptions import ModelError
+from .anomalies import AnomalyChecker
+from .batch import GaugeInvarianceEngine, rep_key
+
+Rational = Union[int, str, Fraction]
+
+
+def _lcm(values) -> int:
+    out = 1
+    for x in values:
+        out = out * x // gcd(out, x)
+    return out
+
+
+def _rational(value) -> Fraction:
+    value = sympify(value) if isinstance(value, str) else value
+    if isinstance(value, (int, Fraction)):
+        return Fraction(value)
+    if isinstance(value, Basic) and value.is_Rational:
+        return Fraction(int(value.p), int(value.q))
+    raise ModelError(f"Not a rational number: {value}")
+
+
+class ScanResult(NamedTuple):
+    """Outcome of a charge scan, one row per grid point.
+
+    Members:
+        parameters (List[str]): Names of the parameters, columns of `points`
+        points (np.ndarray): Parameter values as `Fraction`s, shape (n_points, n_parameters)
+        invariant (np.ndarray): Whether each operator is gauge invariant, shape (n_points, n_operators)
+        anomaly_free (Optional[np.ndarray]): Whether every anomaly cancels, shape (n_points,), None if not requested
+    """
+    parameters: List[str]
+    points: np.ndarray
+    invariant: np.ndarray
+    anomaly_free: Optional[np.ndarray]
+
+    def allowed(self) -> np.ndarray:
+        """Mask of the points where every operator is invariant (and anomalies cancel, if checked)"""
+        mask = self.invariant.all(axis=1)
+        if self.anomaly_free is not None:
+            mask &= self.anomaly_free
+        return mask
+
+
+class ChargeScan:
+    """Invariance of a fixed operator set, and anomaly cancellation,
+    over a grid of U(1) charge parameters.
+
+    Examples
+    ========
+    >>> from liesym import SU, U1
+    >>> from sympy import Matrix
+    >>> from particlezoo import Field, Representation, Symmetry, Lagrangian
+    >>> from particlezoo.validations import ChargeScan
+    >>> su2, u1 = SU(2), U1()
+    >>> H = Field("H", "0", {"L": Representation(Matrix([[1]]), su2), "Y": Representation("1/2", u1)})
+    >>> S = Field("S", "0", {"Y": Representation("x", u1)})
+    >>> lag = Lagrangian([H, S], [Symmetry("L", su2, True, "g"), Symmetry("Y", u1, True, "g'")], "Toy")
+    >>> scan = ChargeScan(lag, [(H, H.conjugate(), S), (H, H, S)], ["x"])
+    >>> result = scan.run({"x": ["-1", "-1/2", "0", "1/2"]})
+    >>> result.invariant.tolist()
+    [[False, True], [False, False], [True, False], [False, False]]
+    >>> result.points[result.allowed()].tolist()
+    []
+    """
+
+    def __init__(self, lagrangian: Lagrangian, operators: Sequence[Sequence[Field]],
+                 parameters: Sequence[Union[str, Symbol]]):
+        """Splits the template's charges and checks the fixed content once.
+
+        Args:
+            lagrangian (Lagrangian): Template model, U(1) charges may depend on the parameters
+            operators (Sequence[Sequence[Field]]): Operators to test, fields of the model or their conjugates
+            parameters (Sequence[Union[str, Symbol]]): Charge parameters, in the order of the grid axes
+
+        Raises:
+            ModelError: If a charge is not affine in the parameters or uses an unknown symbol
+        """
+        self.lagrangian = lagrangian
+        self.parameters: List[str] = [str(x) for x in parameters]
+        self.operators: List[Tuple[Field, ...]] = [tuple(op) for op in operators]
+        self.fields: List[Field] = list(lagrangian.particle_contents)
+        self.u1 = [x for x in lagrangian.symmetries if isinstance(x.group, U1)]
+
+        symbols = [Symbol(x) for x in self.parameters]
+        n, u, p = len(self.fields), len(self.u1), len(symbols)
+        constant = [[Fraction(0)] * u for _ in range(n)]
+        linear = [[[Fraction(0)] * p for _ in range(u)] for _ in range(n)]
+        for i, field in enumerate(self.fields):
+            for j, sym in enumerate(self.u1):
+                obj = field.representations.get(str(sym.name))
+                if obj is None:
+                    continue
+                q = rep_key(obj)
+                if isinstance(q, Fraction):
+                    constant[i][j] = q
+                    continue
+                unknown = q.free_symbols - set(symbols)
+                if unknown:
+                    raise ModelError(f"{field.name}: unknown charge parameters {sorted(map(str, unknown))}")
+                for k, s in enumerate(symbols):
+                    c = q.diff(s)
+                    if c.free_symbols:
+                        raise ModelError(f"{field.name}: charge {q} is not affine in the parameters")
+                    linear[i][j][k] = _rational(c)
+                constant[i][j] = _rational(q.subs({s: 0 for s in symbols}))
+
+        # charges = (constant + linear . point) / scale, all integers
+        self.scale = _lcm([x.denominator for row in constant for x in row]
+                          + [x.denominator for row in linear for col in row for x in col])
+        self.constant = np.array([[int(x * self.scale) for x in row] for row in constant],
+                                 dtype=np.int64).reshape(n, u)
+        self.linear = np.array([[[int(x * self.scale) for x in col] for col in row] for row in linear],
+                               dtype=np.int64).reshape(n, u, p)
+
+        # signed multiplicities, conjugates count -1
+        index: Dict[Field, Tuple[int, int]] = {}
+        for i, field in enumerate(self.fields):
+            index[field] = (i, 1)
+            index.setdefault(field.conjugate(), (i, -1))
+        self.counts = np.zeros((len(self.operators), n), dtype=np.int64)
+        for o, op in enumerate(self.operators):
+            for field in op:
+                if field not in index:
+                    raise ModelError(f"Field {field.name} is not in the model")
+                i, sign = index[field]
+                self.counts[o, i] += sign
+
+        # everything but the U(1)s is fixed across the grid
+        engine = GaugeInvarianceEngine()
+        self.fixed = np.array([engine.check(op, skip=("u",))[0] for op in self.operators], dtype=bool)
+
+        self._checker: Optional[AnomalyChecker] = None
+
+    def grid(self, values: Mapping[str, Sequence[Rational]]) -> Tuple[np.ndarray, int]:
+        """Cartesian product of the values of each parameter, as integer
+        numerators of shape (n_points, n_parameters) and their common denominator"""
+        missing = set(self.parameters) - set(values)
+        if missing:
+            raise ModelError(f"No values for parameters {sorted(missing)}")
+        axes = [[_rational(v) for v in values[name]] for name in self.parameters]
+        denominator = _lcm(v.denominator for axis in axes for v in axis)
+        numerators = [[int(v * denominator) for v in axis] for axis in axes]
+        points = np.array(list(product(*numerators)), dtype=np.int64)
+        return points.reshape(-1, len(self.parameters)), denominator
+
+    def charges(self, points: np.ndarray, denominator: int = 1) -> np.ndarray:
+        """Integer U(1) charges of every field at every point, shape
+        (n_points, n_fields, n_u1), over the denominator `scale * denominator`"""
+        return self.constant[None] * denominator + np.einsum("fuk,nk->nfu", self.linear, points)
+
+    def invariant(self, points: np.ndarray, denominator: int = 1) -> np.ndarray:
+        """Invariance of every operator at every point, shape (n_points, n_operators)"""
+        totals = np.einsum("of,nfu->nou", self.counts, self.charges(points, denominator))
+        return ~totals.any(axis=2) & self.fixed[None]
+
+    def anomaly_free(self, points: np.ndarray, denominator: int = 1) -> np.ndarray:
+        """Whether every gauge anomaly cancels at each point, shape (n_points,)"""
+        if self._checker is None:
+            self._checker = AnomalyChecker(self.fields, self.lagrangian.symmetries)
+        checker = self._checker
+        rows = [self.fields.index(x) for x in checker.fermions]
+        cols = [self.u1.index(x) for x in checker.u1]
+        return checker.anomaly_free(self.charges(points, denominator)[:, rows][:, :, cols])
+
+    def run(self, values: Mapping[str, Sequence[Rational]], anomalies: bool = False) -> ScanResult:
+        """Scans the cartesian grid of `values`.
+
+        Args:
+            values (Mapping[str, Sequence]): Values of each parameter, ints, Fractions or strings like "1/6"
+            anomalies (bool, optional): Also check anomaly cancellation. Defaults to False.
+        """
+        points, denominator = self.grid(values)
+        fractions = np.array([[Fraction(int(x), denominator) for x in row] for row in points],
+                             dtype=object).reshape(points.shape)
+        return ScanResult(
+            self.parameters,
+            fractions,
+            self.invariant(points, denominator),
+            self.anomaly_free(points, denominator) if anomalies else None,
+        )
+
+
+def scan_charges(lagrangian: Lagrangian, operators: Sequence[Sequence[Field]],
+                 values: Mapping[str, Sequence[Rational]], anomalies: bool = False) -> ScanResult:
+    """Scans the U(1) charge parameters of a template model, see `ChargeScan`"""
+    return ChargeScan(lagrangian, operators, list(values)).run(values, anomalies)
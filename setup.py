@@ -6,7 +6,8 @@ with open(path.join(this_directory, 'README.md'), encoding='utf-8') as f:
     long_description = f.read()
 
 install_requires = [
-    "liesym>=0.3.0"
+    "liesym>=0.3.0",
+    "numpy"
 ]
 
 setup(
@@ -18,6 +19,9 @@ setup(
     zip_safe=False,
     include_package_data=True,
     test_requires=["pytest"],
+    entry_points={
+        "console_scripts": ["particlezoo=particlezoo.cli:main"],
+    },
     author="Nathan Papapietro <npapapietro95@gmail.com>",
     author_email="npapapietro95@gmail.com",
     url="https://github.com/npapapietro/liesym",
@@ -1,3 +1,6 @@
 from .test_validations import *
 from .test_parsers import *
 from .test_datamodels import *
+from .test_registry import *
+from .test_synthetic import *
+from .test_cli import *
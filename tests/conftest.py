@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+from liesym import SU, U1
+from sympy import Matrix
+
+from particlezoo import Field, Representation, Symmetry
+
+
+def _standard_model() -> SimpleNamespace:
+    su3, su2, u1 = SU(3), SU(2), U1()
+    c = Symmetry("SU3_c", su3, True, "g_s", tag="c")
+    L = Symmetry("SU2_L", su2, True, "g_L", tag="L")
+    Y = Symmetry("U1_Y", u1, True, "g_Y", tag="Y")
+
+    def field(name, spin, c=None, l=None, y="0"):
+        """Field with the given SU(3) and SU(2) Dynkin labels, singlets if omitted"""
+        reps = {"U1_Y": Representation(y, u1)}
+        if c:
+            reps["SU3_c"] = Representation(Matrix([c]), su3)
+        if l:
+            reps["SU2_L"] = Representation(Matrix([l]), su2)
+        return Field(name, spin, reps)
+
+    def generation(suffix="", y_L="-1/2", y_e="1"):
+        """Q, u^c, d^c, L and e^c as left handed Weyl fermions"""
+        return [field(f"Q{suffix}", "1/2", [1, 0], [1], "1/6"),
+                field(f"u^c{suffix}", "1/2", [0, 1], y="-2/3"),
+                field(f"d^c{suffix}", "1/2", [0, 1], y="1/3"),
+                field(f"L{suffix}", "1/2", l=[1], y=y_L),
+                field(f"e^c{suffix}", "1/2", y=y_e)]
+
+    return SimpleNamespace(su3=su3, su2=su2, u1=u1, c=c, L=L, Y=Y, symmetries=[c, L, Y],
+                           field=field, generation=generation)
+
+
+@pytest.fixture
+def sm() -> SimpleNamespace:
+    """Standard Model groups, symmetries and field builders"""
+    return _standard_model()
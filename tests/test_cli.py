@@ -0,0 +1,53 @@
+import json
+
+from particlezoo.cli import main
+from particlezoo.synthetic import generate_model
+
+
+def _models(tmp_path):
+    for i in range(2):
+        generate_model(4, seed=i, operators=1).write(str(tmp_path / f"m{i}.yaml"))
+    (tmp_path / "bad.json").write_text('{"name": "x", "fields": [{"name": "a", "spin": "1/3"}]}')
+
+
+def _records(capsys):
+    return [json.loads(x) for x in capsys.readouterr().out.splitlines()]
+
+
+def test_cli_validate(tmp_path, capsys):
+    _models(tmp_path)
+    assert main(["validate", str(tmp_path), "--jsonl"]) == 1
+    records = _records(capsys)
+    assert [r["ok"] for r in records] == [False, True, True]
+    assert "fields[0].spin" in records[0]["errors"][0]
+
+    assert main(["validate", str(tmp_path / "m*.yaml")]) == 0
+    assert capsys.readouterr().out.startswith("OK")
+
+    raw = generate_model(4, seed=0).raw
+    raw["fields"][0]["representations"]["SU3"] = "7"
+    raw["fields"][1]["representations"]["SU3"] = "\\bar{3}"
+    raw["fields"][2]["representations"]["SU3"] = "4"
+    (tmp_path / "irreps.json").write_text(json.dumps(raw))
+    for cache in ([], ["--cache-dir", str(tmp_path / "cache")]):  # same report through the cache
+        assert main(["validate", str(tmp_path / "irreps.json"), "--jsonl"] + cache) == 1
+        record, = _records(capsys)
+        assert [e.split(" does")[0] for e in record["errors"]] == ["F_{0}: SU3 '7'", "F_{2}: SU3 '4'"]
+    assert main(["validate", str(tmp_path / "m*.yaml"), "--cache-dir", str(tmp_path / "cache")]) == 0
+    capsys.readouterr()
+
+
+def test_cli_enumerate_and_render(tmp_path, capsys):
+    _models(tmp_path)
+    model = generate_model(4, seed=0, operators=1)
+    cache = str(tmp_path / "cache")
+    for _ in range(2):  # cold and warm cache give the same answer
+        assert main(["enumerate", str(tmp_path / "m0.yaml"), "--jsonl",
+                     "--no-conjugates", "--cache-dir", cache]) == 0
+        record, = _records(capsys)
+        assert list(model.operators[0]) in record["operators"]
+
+    out = tmp_path / "out.jsonl"
+    assert main(["render", str(tmp_path / "m1.yaml"), "--jsonl", "-o", str(out)]) == 0
+    record, = [json.loads(x) for x in out.read_text().splitlines()]
+    assert "P_{0,0}" in record["latex"]
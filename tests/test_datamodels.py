@@ -1,6 +1,12 @@
-import particlezoo as zoo
+from fractions import Fraction
+
+import numpy as np
+import pytest
 from liesym import Z
 
+import particlezoo as zoo
+from particlezoo.exceptions import ModelError
+
 
 def test_symmetry_formatting():
     z2 = zoo.Symmetry(
@@ -13,3 +19,277 @@ def test_symmetry_formatting():
     z2_fmt = z2.kinetic_term()
 
     assert z2_fmt is None
+
+
+def test_core_model_roundtrip():
+    import pickle
+    from particlezoo.builders import (Configuration, SymmetryGroup,
+                                      GenericField, CoreModel)
+    from particlezoo.parsers.transform import transform_model
+
+    cfg = Configuration(
+        name="SM",
+        version=None,
+        description=None,
+        symmetries=[
+            SymmetryGroup(None, "SU3_c", ["SU", "3"], "g_s", None, "c"),
+            SymmetryGroup(None, "SU2_L", ["SU", "2"], "g_L", None, "L"),
+            SymmetryGroup(None, "U1_Y", ["U", "1"], "g_Y", None, "Y"),
+            SymmetryGroup(None, "Z2", ["Z", "2"], None, False, None),
+        ],
+        fields=[
+            GenericField("Q", "1/2", None, {"SU3_c": "3", "SU2_L": "2", "U1_Y": "1/6"}),
+            GenericField("H", "0", None, {"SU2_L": [1], "U1_Y": "1/2", "Z2": "Z_1"}),
+        ])
+
+    core = CoreModel.from_configuration(cfg)
+    lag = transform_model(cfg)
+    from_lag = CoreModel.from_lagrangian(lag)
+
+    assert [f.reps for f in core.fields] == [f.reps for f in from_lag.fields]
+    assert core.fields[0].reps == ((0, (1, 0)), (1, (1,)), (2, Fraction(1, 6)))
+    assert core.fields[1].reps[-1] == (3, 1)
+    assert core.fields[0].is_fermion and core.fields[0].mass_dim == Fraction(3, 2)
+
+    conj = core.conjugate(core.fields[0])
+    assert conj.reps == ((0, (0, 1)), (1, (1,)), (2, Fraction(-1, 6)))
+
+    clone = pickle.loads(pickle.dumps(core))
+    assert clone.field_ids == core.field_ids
+    assert [f.reps for f in clone.fields] == [f.reps for f in core.fields]
+
+    back = CoreModel.from_lagrangian(core.to_lagrangian())
+    assert [f.reps for f in back.fields] == [f.reps for f in core.fields]
+    assert core.to_configuration().fields[0].representations == {
+        "SU3_c": [1, 0], "SU2_L": [1], "U1_Y": "1/6"}
+
+
+def test_kinetic_terms_memoized():
+    from liesym import SU
+    from sympy import Add
+    from particlezoo.builders import Field, Symmetry, Lagrangian, KineticTerm
+
+    su2 = SU(2)
+    H = Field("H", "0", {})
+    psi = Field("psi", "1/2", {})
+    L = Symmetry("L", su2, True, "g")
+    lag = Lagrangian([H, psi], [L], "Toy")
+
+    terms = lag.kinetic_terms()
+    assert [t.source for t in terms] == [H, psi, L]
+    assert all(isinstance(t, KineticTerm) for t in terms)
+    assert H.kinetic() is terms[0] and L.kinetic() is terms[2]
+    assert H.kinetic(compact=False) is not H.kinetic()
+
+    assert lag.kinetic_term() == " + ".join(t.latex for t in terms[:2]) + " " + terms[2].latex
+    assert isinstance(lag.kinetic_term(as_latex=False), Add)
+    assert Symmetry("G", su2, False, None).kinetic() is None
+
+    # plain symbols skip sympy's evaluation, the result must not change
+    from sympy import Symbol, I, conjugate, latex
+    from sympy.physics.quantum import Dagger
+    for name in ("A", "\\phi", "x_{1}"):
+        D, phi = Symbol("D_mu"), Symbol(name)
+        assert Field(name, "0", {}).kinetic().pieces[0] == Dagger(D * phi)
+        assert Field(name, "0", {}).kinetic().latex.startswith(latex(Dagger(D * phi)))
+        assert Field(name, "1/2", {}).kinetic().pieces[1] == conjugate(phi)
+        assert Field(name, "1/2", {}).kinetic().latex.startswith(latex(I) + latex(conjugate(phi)))
+
+
+def test_covariant_expansion():
+    from sympy import Matrix
+    from liesym import SU, U1
+    from particlezoo.builders import generator_matrices
+
+    su3, su2, u1 = SU(3), SU(2), U1()
+    syms = [
+        zoo.Symmetry("SU3_c", su3, True, "g_s", tag="c"),
+        zoo.Symmetry("SU2_L", su2, True, "g_L", tag="L"),
+        zoo.Symmetry("U1_Y", u1, True, "g_Y", tag="Y"),
+        zoo.Symmetry("Z2", Z(2), False, None),
+    ]
+    Q = zoo.Field("Q", "1/2", {"SU3_c": zoo.Representation("3", su3),
+                               "SU2_L": zoo.Representation(Matrix([[1]]), su2),
+                               "U1_Y": zoo.Representation("1/6", u1)})
+    S = zoo.Field("S", "0", {"SU3_c": zoo.Representation(Matrix([[2, 0]]), su3),
+                             "SU2_L": zoo.Representation(Matrix([[1]]), su2),
+                             "U1_Y": zoo.Representation("-1/3", u1),
+                             "Z2": zoo.Representation("Z_1", Z(2))})
+    lagrangian = zoo.Lagrangian([Q, S], syms, "Test")
+    out = lagrangian.gauge_interactions()
+    assert out is lagrangian.gauge_interactions()
+    assert out.couplings == ["g_s", "g_L", "g_Y", "g_{Z2}"]
+
+    # the fermion table is exactly the sparse generators of each factor
+    fermion = out.fermion
+    assert set(fermion.field) == {0} and 3 not in set(fermion.symmetry)
+    dense = np.zeros((8, 3, 3), complex)
+    rows = fermion.symmetry == 0
+    dense[fermion.generator[rows], fermion.row[rows], fermion.col[rows]] = fermion.value[rows]
+    assert np.allclose(dense, generator_matrices(su3, [1, 0]))
+    assert np.allclose(fermion.value[fermion.symmetry == 2], 1 / 6)
+
+    # sextet generators close under the SU(3) algebra
+    T, F = generator_matrices(su3, [2, 0]), generator_matrices(su3, [1, 0])
+    assert generator_matrices(su3, [2, 0]) is T
+    f = -2j * (np.einsum("aij,bjk,cki->abc", F, F, F) - np.einsum("bij,ajk,cki->abc", F, F, F))
+    comm = np.einsum("aij,bjk->abik", T, T) - np.einsum("bij,ajk->abik", T, T)
+    assert np.allclose(comm, 1j * np.einsum("abc,cik->abik", f, T))
+
+    # the quartic table contracts to phi^dagger (sum_s A_s.T_s)^2 phi for any background
+    rng = np.random.default_rng(0)
+    A = [rng.normal(size=8), rng.normal(size=3), rng.normal(size=1)]
+    reps = [T, generator_matrices(su2, [1]), np.full((1, 1, 1), -1 / 3)]
+    eyes = [np.eye(6), np.eye(2), np.eye(1)]
+    total = 0
+    for s in range(3):
+        ops = [np.einsum("a,aij->ij", A[s], reps[s]) if t == s else eyes[t] for t in range(3)]
+        total = total + np.kron(np.kron(ops[0], ops[1]), ops[2])
+    phi = rng.normal(size=12) + 1j * rng.normal(size=12)
+    expected = phi.conj() @ total @ total @ phi
+
+    quartic, got = out.quartic, 0
+    comps = [phi.reshape(6, 2, 1)]
+    for k in range(len(quartic.value)):
+        s, t = quartic.symmetry[k], quartic.symmetry2[k]
+        weight = quartic.value[k] * A[s][quartic.generator[k]] * A[t][quartic.generator2[k]]
+        bra, ket = [slice(None)] * 3, [slice(None)] * 3
+        bra[s], ket[s] = quartic.row[k], quartic.col[k]
+        if t != s:
+            bra[t], ket[t] = quartic.row2[k], quartic.col2[k]
+        got += weight * np.sum(comps[0][tuple(bra)].conj() * comps[0][tuple(ket)])
+    assert np.isclose(got, expected)
+
+
+def test_generator_normalization():
+    from liesym import SO, SU, Sp
+    from particlezoo.builders import generator_matrices
+    from particlezoo.validations import irrep_indices
+
+    # the generators and the anomaly / beta function indices share one convention
+    cases = [(SO(5), [1, 0]), (SO(6), [1, 0, 0]), (SO(7), [1, 0, 0]), (SO(7), [0, 1, 0]),
+             (SO(10), [1, 0, 0, 0, 0]), (SO(10), [0, 1, 0, 0, 0]), (Sp(4), [1, 0]), (SU(3), [1, 1])]
+    for group, labels in cases:
+        T = generator_matrices(group, labels)
+        indices = irrep_indices(group, labels)
+        assert T.shape[1] == indices.dim
+        assert np.allclose(np.einsum("aij,bji->ab", T, T), float(indices.dynkin) * np.eye(len(T)))
+        assert np.allclose(np.einsum("aij,ajk->ik", T, T), float(indices.casimir) * np.eye(indices.dim))
+
+
+def test_gauge_beta_functions(sm):
+    from particlezoo.builders import RGE
+
+    syms = [sm.Y, sm.L, sm.c, zoo.Symmetry("Z2", Z(2), False, None)]
+    fields = [sm.field("H", "0", l=[1], y="1/2")]
+    for g in range(3):
+        fields += sm.generation(str(g))
+    model = zoo.Lagrangian(fields, syms, "SM")
+
+    rge = RGE(model, normalization={"U1_Y": "3/5"})
+    assert rge._gauge_beta_func("U1_Y") == (
+        Fraction(41, 10), {"U1_Y": Fraction(199, 50), "SU2_L": Fraction(27, 10), "SU3_c": Fraction(44, 5)})
+    assert rge._gauge_beta_func("SU2_L")[0] == Fraction(-19, 6)
+    assert RGE(model)._gauge_beta_func("U1_Y")[0] == Fraction(41, 6)
+    with pytest.raises(ValueError):
+        rge._gauge_beta_func("Z2")
+
+    c = rge.coefficients()
+    assert c.names == ["U1_Y", "SU2_L", "SU3_c"] and rge.coefficients() is c
+    assert np.allclose(c.b1, [41 / 10, -19 / 6, -7])
+    assert np.allclose(c.b2, [[199 / 50, 27 / 10, 44 / 5], [9 / 10, 35 / 6, 12], [11 / 10, 9 / 2, -26]])
+
+    # a real scalar counts half a complex one, a Dirac fermion two Weyl ones
+    extra = [sm.field("T", "0", l=[2]), sm.field("X", "1/2", [1, 0])]
+    b = RGE(zoo.Lagrangian(fields + extra, syms, "SM+"), dirac=["X"], real=["T"]).coefficients().b1
+    assert np.allclose(b - c.b1 * [5 / 3, 1, 1], [0, 1 / 3, 2 / 3])
+
+    g = np.array([[0.46, 0.65, 1.22], [0.5, 0.5, 0.5]])
+    loop = 1 / (16 * np.pi ** 2)
+    assert np.allclose(rge.beta(g, loops=1), loop * g ** 3 * c.b1)
+    assert np.allclose(rge.beta(g)[1], loop * g[1] ** 3 * (c.b1 + loop * 0.25 * c.b2.sum(axis=1)))
+
+    symbolic = zoo.Lagrangian([sm.field("S", "0", y="x")], syms, "S")
+    with pytest.raises(ModelError):
+        RGE(symbolic).coefficients()
+
+    # running: exact one loop solution, thresholds and batches
+    mu = np.array([1e3, 1e16, 10.0])
+    g0 = np.array([0.46, 0.65, 1.17])
+    out = rge.run(g0, mu, loops=1)
+    exact = (g0 ** -2 - c.b1 * np.log(mu[:, None] / 91.1876) / (8 * np.pi ** 2)) ** -0.5
+    assert out.names == c.names and out.couplings.shape == (3, 3)
+    assert np.allclose(out.couplings, exact, rtol=1e-10)
+
+    # below its mass the Higgs does not contribute, it only shifts the slope above 500 GeV
+    b_higgs = c.b1 - RGE(zoo.Lagrangian(fields[1:], syms, "SM"), normalization={"U1_Y": "3/5"}).coefficients().b1
+    high = rge.run(g0, [1e3], masses={"H": 500.0}, loops=1).couplings[0]
+    light = g0 ** -2 - (c.b1 - b_higgs) * np.log(500 / 91.1876) / (8 * np.pi ** 2)
+    assert np.allclose(high, (light - c.b1 * np.log(1e3 / 500) / (8 * np.pi ** 2)) ** -0.5, rtol=1e-10)
+
+    batch = g0 * np.array([[1.0], [1.01], [0.99]])
+    masses = np.array([500.0, 200.0, 500.0])
+    up = rge.run(batch, [1e4, 1e16], masses={"H": masses})
+    assert up.couplings.shape == (2, 3, 3)
+    assert np.allclose(up.couplings[:, 0], rge.run(g0, [1e4, 1e16], masses={"H": 500.0}).couplings, rtol=1e-5)
+    down = rge.run(up.couplings[1], [91.1876], mu0=1e16, masses={"H": 500.0}, step=0.01)
+    assert np.allclose(down.couplings[0, 0], g0, rtol=1e-5)
+    with pytest.raises(ValueError):
+        rge.run(batch, [1e4], masses={"H": masses[:2]})
+
+
+def test_vertex_table():
+    from sympy import Matrix
+    from liesym import SU, U1
+    from particlezoo.diagrams import VertexExtractor, structure_constants
+
+    su3, su2, u1 = SU(3), SU(2), U1()
+    syms = [zoo.Symmetry("SU3_c", su3, True, "g_s", tag="c"),
+            zoo.Symmetry("SU2_L", su2, True, "g_L", tag="L"),
+            zoo.Symmetry("U1_Y", u1, True, "g_Y", tag="Y"),
+            zoo.Symmetry("Z2", Z(2), False, None)]
+    Q = zoo.Field("Q", "1/2", {"SU3_c": zoo.Representation(Matrix([[1, 0]]), su3),
+                               "SU2_L": zoo.Representation(Matrix([[1]]), su2),
+                               "U1_Y": zoo.Representation("1/6", u1)})
+    u = zoo.Field("u", "1/2", {"SU3_c": zoo.Representation(Matrix([[0, 1]]), su3),
+                               "U1_Y": zoo.Representation("-2/3", u1)})
+    H = zoo.Field("H", "0", {"SU2_L": zoo.Representation(Matrix([[1]]), su2),
+                             "U1_Y": zoo.Representation("1/2", u1)})
+    lag = zoo.Lagrangian([Q, u, H], syms, "toy")
+    table = lag.vertices()
+    assert lag.vertices() is table
+    ids = VertexExtractor(lag)
+
+    def names(legs):
+        return [table.lorentz[table.structure[v]] + " " + table.couplings[table.coupling[v]]
+                for v in table.lookup([ids.particle_id(x) for x in legs])]
+
+    assert names([Q.conjugate(), syms[0], Q]) == ["FFV g_s"]
+    assert names([H, H.conjugate(), syms[1], syms[2]]) == ["SSVV g_L g_Y"]
+    assert names([syms[0]] * 3) == ["VVV g_s"] and names([syms[1]] * 4) == ["VVVV g_L^2"]
+    assert names([u, syms[1], u.conjugate()]) == [] and names([syms[2]] * 3) == []
+    assert names([Q, u, H]) == ["FFS c_{0}"]
+    assert names([Q.conjugate(), u.conjugate(), H.conjugate()]) == ["FFS c_{0}^*"]
+    assert names([H, H, H.conjugate(), H.conjugate()]) == ["SSSS c_{1}"]
+    assert len(lag.vertices(operators=False)) == len(table) - 3
+
+    # the index agrees with the columns, and every block is the covariant table's
+    for key, rows in table.index.items():
+        for v in rows:
+            assert tuple(x for x in table.legs[v] if x >= 0) == key
+    gauge = lag.gauge_interactions()
+    (v,) = table.lookup([ids.particle_id(x) for x in (Q, Q.conjugate(), syms[1])])
+    block = table.factor(v)
+    rows = (gauge.fermion.field == 0) & (gauge.fermion.symmetry == 1)
+    assert np.allclose(block.value, gauge.fermion.value[rows])
+    assert np.array_equal(block.row, gauge.fermion.row[rows]) and (block.generator2 == -1).all()
+    assert table.stop[-1] == table.start[-1] == len(table.factors.value)
+
+    # f^abc for a < b < c: sum of squares is N(N^2 - 1)/6 and the block of VVVV is the VVV one
+    for group, total in ((su2, 1), (su3, 4), (SU(4), 10)):
+        assert np.isclose(np.sum(np.abs(structure_constants(group).value) ** 2), total)
+    vvv, vvvv = table.lookup([ids.particle_id(syms[0])] * 3), table.lookup([ids.particle_id(syms[0])] * 4)
+    assert table.start[vvv[0]] == table.start[vvvv[0]] and table.stop[vvv[0]] == table.stop[vvvv[0]]
+
+    lag.add_field(zoo.Field("S", "0", {"U1_Y": zoo.Representation("1", u1)}))
+    assert lag.vertices() is not table and len(lag.vertices().particles) == len(table.particles) + 2
@@ -74,3 +74,160 @@ U1_Y="1/6"
 """
     data = open_file(ex, opener=toml.loads)
     consume_config(data)
+
+
+def test_model_cache(tmp_path):
+    from particlezoo.parsers import ModelCache, load_model, parse
+
+    fname = tmp_path / "model.yaml"
+    fname.write_text("""\
+name: Toy
+symmetries:
+  - group: [SU, 2]
+    name: L
+  - group: [U, 1]
+    name: Y
+fields:
+  - name: H
+    spin: "0"
+    representations:
+      L: 2
+      Y: 1/2
+""")
+    cache = ModelCache(str(tmp_path / "cache"))
+
+    cold = cache.load(str(fname))
+    warm = cache.load(str(fname))
+    assert cache.info().hits == 1 and cache.info().misses == 1
+    assert warm.configuration == cold.configuration
+    assert warm.to_lagrangian().particle_contents[0].name == \
+        load_model(str(fname)).particle_contents[0].name
+    assert parse(str(fname), cache_dir=str(tmp_path / "cache")).name == "Toy"
+
+    # editing the file changes the key
+    fname.write_text(fname.read_text().replace("Toy", "Toy2"))
+    assert cache.load(str(fname)).configuration.name == "Toy2"
+    assert cache.info().entries == 2
+
+    info = cache.info()
+    assert info.bytes == cache.size() and info.max_bytes == 256 * 1024 ** 2
+
+    assert cache.invalidate(str(fname))
+    assert cache.info().entries == 1
+
+    # corrupt entries are dropped and treated as a miss
+    for entry in (tmp_path / "cache").iterdir():
+        entry.write_bytes(b"junk")
+    fname.write_text(fname.read_text().replace("Toy2", "Toy"))
+    assert cache.get(str(fname)) is None
+    assert cache.info().entries == 0
+
+    small = ModelCache(str(tmp_path / "small"), max_bytes=1)
+    small.load(str(fname))
+    assert small.info().entries == 0
+
+
+def test_parse_many(tmp_path):
+    from particlezoo.parsers import parse_many
+    from particlezoo.exceptions import ConfigError
+
+    for i in range(5):
+        (tmp_path / f"m{i}.json").write_text(f'{{"name": "M{i}"}}')
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "m5.yaml").write_text("name: M5")
+    (tmp_path / "broken.toml").write_text("name = ")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    serial = list(parse_many(str(tmp_path)))
+    assert [p for p, _ in serial] == sorted(p for p, _ in serial)
+    assert len(serial) == 7
+    errors = [p for p, r in serial if isinstance(r, ConfigError)]
+    assert [p.endswith("broken.toml") for p in errors] == [True]
+
+    names = [r.name for _, r in serial if not isinstance(r, ConfigError)]
+    assert names == [r.name for _, r in parse_many(str(tmp_path / "**" / "m*"), jobs=3, chunksize=2)]
+
+    bad = list(parse_many([str(tmp_path / "notes.txt"), str(tmp_path / "missing.json")]))
+    assert all(isinstance(r, ConfigError) for _, r in bad)
+
+
+def test_iter_configs(tmp_path):
+    from particlezoo.parsers import iter_configs
+    from particlezoo.exceptions import ConfigError
+
+    stream = tmp_path / "models.yaml"
+    stream.write_text("".join(
+        f"---\nname: M{i}\nfields:\n  - name: H\n    spin: '0'\n" for i in range(50)))
+    configs = iter_configs(str(stream))
+    assert next(configs).name == "M0"
+    assert [c.name for c in configs] == [f"M{i}" for i in range(1, 50)]
+
+    lines = tmp_path / "models.jsonl"
+    lines.write_text('{"name": "A"}\n{"name": \n')
+    configs = iter_configs(str(lines))
+    assert next(configs).name == "A"
+    with pytest.raises(ConfigError, match="models.jsonl:2"):
+        next(configs)
+
+
+def test_validate_config():
+    from particlezoo.parsers import validate_config, check_config
+    from particlezoo.exceptions import ConfigError
+
+    good = {
+        "name": "SM",
+        "symmetries": [{"name": "c", "group": ["SU", 3]},
+                       {"name": "L", "group": ["SU", "2"]},
+                       {"name": "Y", "group": ["U", "1"]}],
+        "fields": [{"name": "Q", "spin": "1/2",
+                    "representations": {"c": "3", "L": [1], "Y": "1/6"}}],
+    }
+    assert validate_config(good) == []
+    assert check_config(good) is good
+
+    bad = {
+        "name": "",
+        "symmetries": [{"name": "c", "group": "SU_3"}, {"name": "c", "group": ["E", 5]}],
+        "fields": [{"name": "Q", "spin": 1, "representations": {"c": [1, 0], "Y": "1"}},
+                   {"name": "Q", "spin": "x", "representations": []}],
+    }
+    errors = validate_config(bad)
+    assert errors == [
+        "name: required",
+        "symmetries[0].group: must be a [type, dim] pair",
+        "symmetries[1].group: unsupported group E(5)",
+        "symmetries[1].name: duplicate symmetry c",
+        "fields[0].spin: must be a string, got int",
+        "fields[0].representations.Y: undefined symmetry",
+        "fields[1].name: duplicate field Q",
+        "fields[1].spin: 'x' is not a number",
+        "fields[1].representations: must be a dictionary",
+    ]
+    with pytest.raises(ConfigError, match="duplicate field Q"):
+        check_config(bad)
+
+
+def test_parsers_import_without_sympy():
+    import os
+    import subprocess
+    import sys
+
+    code = ("import sys\n"
+            "from particlezoo.parsers import parse, parse_many, iter_configs, validate_config\n"
+            "from particlezoo.builders import Configuration\n"
+            "import particlezoo\n"
+            "print(sorted(m for m in ('sympy', 'liesym', 'numpy', 'yaml', 'toml') if m in sys.modules))\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=root)
+    assert out.stdout.strip() == "[]"
+
+
+def test_lazy_attributes():
+    import particlezoo
+    from particlezoo import builders, parsers
+
+    assert particlezoo.Field is builders.Field
+    assert parsers.transform_model.__module__ == "particlezoo.parsers.transform"
+    with pytest.raises(AttributeError):
+        particlezoo.not_a_name
@@ -0,0 +1,76 @@
+import pytest
+from sympy import Matrix
+
+from particlezoo.exceptions import ConfigError, ModelError
+from particlezoo.parsers import group_lookup
+from particlezoo.registry import GroupRegistry, LRUCache
+
+
+def test_registry_reuses_groups():
+    reg = GroupRegistry()
+
+    su3 = reg.group("SU", 3)
+    assert reg.group("su", "3") is su3
+    assert reg.info()["groups"].hits == 1
+    assert reg.info()["groups"].misses == 1
+
+    assert group_lookup(["SU", "2"]) is group_lookup(["su", 2])
+
+    with pytest.raises(ConfigError):
+        reg.group("U", 5)
+
+
+def test_registry_irreps():
+    reg = GroupRegistry()
+    su3 = reg.group("SU", 3)
+
+    assert reg.irrep(su3, "3") == Matrix([[1, 0]])
+    assert reg.irrep(su3, "3") == Matrix([[1, 0]])
+    assert reg.info()["irreps"].hits == 1
+
+    assert reg.dim(su3, Matrix([[1, 1]])) == 8
+    assert reg.dim(su3, (1, 1)) == 8
+    assert reg.info()["dims"].hits == 1
+
+    with pytest.raises(ModelError):
+        reg.irrep(su3, "5")
+
+    reg.clear()
+    assert reg.info()["irreps"].currsize == 0
+    assert reg.info()["irreps"].hits == 0
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 1)
+    cache.get("c", lambda: 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_profile_stages():
+    from particlezoo import instrumentation
+    from particlezoo.parsers import consume_config
+    from particlezoo.parsers.transform import transform_model
+    from particlezoo.synthetic import generate_model
+
+    raw = generate_model(5, seed=0).raw
+    assert instrumentation.active() is None
+    with instrumentation.profile() as prof:
+        lagrangian = transform_model(consume_config(raw))
+        lagrangian.kinetic_term()
+    assert instrumentation.active() is None
+
+    report = prof.report()
+    assert report["transform_field"]["calls"] == 5
+    assert report["consume_config"]["calls"] == 1
+    assert report["kinetic_term"]["calls"] == 1
+    assert set(report["transform_model"]) == {"calls", "total", "mean"}
+
+    # disabled again, nothing more is recorded
+    consume_config(raw)
+    assert prof.report()["consume_config"]["calls"] == 1
@@ -0,0 +1,39 @@
+from particlezoo.parsers import parse, validate_config
+from particlezoo.parsers.consume import consume_config
+from particlezoo.parsers.transform import transform_model
+from particlezoo.synthetic import generate_model
+from particlezoo.validations import enumerate_operators
+
+
+def test_generate_model_reproducible(tmp_path):
+    a = generate_model(50, n_symmetries=6, seed=3)
+    b = generate_model(50, n_symmetries=6, seed=3)
+    assert a.raw == b.raw
+    assert a.raw != generate_model(50, n_symmetries=6, seed=4).raw
+    assert len(a.raw["fields"]) == 50
+    assert validate_config(a.raw) == []
+
+    for ext in ("yaml", "json", "toml"):
+        fname = str(tmp_path / f"model.{ext}")
+        a.write(fname)
+        assert parse(fname) == a.configuration
+
+
+def test_generate_model_planted_operators():
+    for seed in range(4):
+        model = generate_model(12, n_symmetries=4, seed=seed, operators=3,
+                               operator_length=2 + seed % 3 if seed < 3 else 3)
+        lagrangian = transform_model(model.configuration)
+        found = {tuple(sorted(str(f._raw_name) for f in op))
+                 for op in enumerate_operators(lagrangian, 4, conjugates=False)}
+        assert {tuple(sorted(op)) for op in model.operators} <= found
+
+
+def test_generate_model_anomaly_free():
+    model = generate_model(20, seed=5, anomaly_free=True)
+    fields = model.raw["fields"]
+    fermions = [x for x in fields if x["spin"] == "1/2"]
+    assert len(fermions) % 2 == 0
+    partners = {x["name"] for x in fermions if x["name"].startswith("\\tilde")}
+    assert len(partners) == len(fermions) // 2
+    assert transform_model(consume_config(model.raw)).is_anomaly_free()
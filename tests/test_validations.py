@@ -1,8 +1,17 @@
-from sympy import Matrix
+from fractions import Fraction
+
+import pytest
+from sympy import Matrix, sympify
 import liesym as ls
+import numpy as np
 
 import particlezoo.validations.gauge_invariance as tp
-from particlezoo import Field, Representation
+from particlezoo.validations import (GaugeInvarianceEngine, is_gauge_invariant_batch,
+                                     AbelianCharges, abelian_prefilter,
+                                     Renormalizability, validate_mass_dim, is_gauge_invariant,
+                                     enumerate_operators)
+from particlezoo import Field, Representation, Symmetry, Lagrangian
+from particlezoo.exceptions import ModelError
 
 
 def test_is_gauge_invariant_repr():
@@ -57,3 +66,338 @@ def test_is_gauge_invariant():
     assert tp.is_gauge_invariant((quark, gluon, quark_bar)) == (True, "")
 
     assert tp.is_gauge_invariant((quark, gluon)) == (False, "QCD")
+
+
+def test_is_gauge_invariant_batch():
+    u1 = ls.U1()
+    quark = Field("quark", "1/2", {
+        "QCD": Representation(Matrix([[1, 0]]), ls.SU(3)),
+        "Y": Representation(sympify("1/6"), u1),
+        "Z2": Representation("Z_1", ls.Z(2)),
+    })
+    quark_bar = Field("quark_bar", "1/2", {
+        "QCD": Representation(Matrix([[0, 1]]), ls.SU(3)),
+        "Y": Representation(sympify("-1/6"), u1),
+        "Z2": Representation("Z_1", ls.Z(2)),
+    })
+    gluon = Field("gluon", "1", {
+        "QCD": Representation(Matrix([[1, 1]]), ls.SU(3)),
+    })
+
+    batch = [
+        (quark, gluon, quark_bar),
+        (quark, gluon),
+        (quark, quark_bar),
+        (quark, quark, quark),
+        (gluon, gluon, gluon),
+    ]
+    engine = GaugeInvarianceEngine()
+    results = is_gauge_invariant_batch(batch, engine=engine)
+
+    assert results == [
+        (True, ""),
+        (False, "QCD"),
+        (True, ""),
+        (False, "Y"),
+        (True, ""),
+    ]
+    # cached second pass agrees
+    assert engine.check_many(batch) == results
+
+    # a field rebuilt under the same name is not served the old charges
+    rebuilt = Field("quark_bar", "1/2", {
+        "QCD": Representation(Matrix([[0, 1]]), ls.SU(3)),
+        "Y": Representation(sympify("1/3"), u1),
+        "Z2": Representation("Z_1", ls.Z(2)),
+    })
+    assert engine.check([quark, rebuilt]) == (False, "Y")
+
+
+def test_abelian_prefilter():
+    u1 = ls.U1()
+    z3 = ls.Z(3)
+    Y = Symmetry("Y", u1, True, "g_Y")
+    B = Symmetry("B", z3, False, "")
+    QCD = Symmetry("QCD", ls.SU(3), True, "g_s")
+
+    H = Field("H", "0", {
+        "Y": Representation(sympify("1/2"), u1),
+        "B": Representation("Z_1", z3),
+    })
+    Hc = Field("Hc", "0", {
+        "Y": Representation(sympify("-1/2"), u1),
+        "B": Representation("Z_2", z3),
+    })
+    S = Field("S", "0", {
+        "Y": Representation(sympify("1/3"), u1),
+        "B": Representation("Z_1", z3),
+        "QCD": Representation(Matrix([[1, 0]]), ls.SU(3)),
+    })
+    lag = Lagrangian([H, Hc, S], [Y, B, QCD], "test")
+
+    batch = [(H, Hc), (H, H), (H, H, H, S, S, S), (S, S, S, Hc, Hc)]
+    table = AbelianCharges.from_lagrangian(lag)
+
+    assert table.names == ["B", "Y"]
+    assert abelian_prefilter(lag, batch).tolist() == [True, False, False, False]
+    assert table.first_violation(batch) == ["", "B", "Y", "B"]
+
+    counts = np.array([[1, 1, 0], [0, 0, 3]])
+    assert table.neutral(counts).tolist() == [True, False]
+
+    engine = GaugeInvarianceEngine()
+    assert engine.check_many(batch, charges=table) == engine.check_many(batch)
+
+    # terms the table rejects never reach the SU(3) decomposition, even though "QCD" < "Y"
+    fresh = GaugeInvarianceEngine()
+    assert fresh.check_many([(H, H, H, S, S, S)], charges=table) == [(False, "Y")]
+    assert fresh.decompositions.info()["singlets"].misses == 0
+
+
+def test_enumerate_operators():
+    su2, u1 = ls.SU(2), ls.U1()
+    H = Field("H", "0", {
+        "SU2_L": Representation(Matrix([[1]]), su2),
+        "U1_Y": Representation(sympify("1/2"), u1),
+    })
+    L = Field("L", "1/2", {
+        "SU2_L": Representation(Matrix([[1]]), su2),
+        "U1_Y": Representation(sympify("-1/2"), u1),
+    })
+    E = Field("E", "1/2", {
+        "U1_Y": Representation(sympify("1"), u1),
+    })
+    lag = Lagrangian(
+        [H, L, E],
+        [Symmetry("SU2_L", su2, True, "g_L"), Symmetry("U1_Y", u1, True, "g_Y")],
+        "Leptons")
+
+    ops = list(lag.operators(4, Renormalizability.Renorm))
+    names = sorted(tuple(sorted(str(f.name) for f in op)) for op in ops)
+
+    # Yukawa and Higgs quartic
+    assert ("E", "H^{\\dagger}", "L") in names
+    assert ("H", "H", "H^{\\dagger}", "H^{\\dagger}") in names
+    assert all(validate_mass_dim(op) == Renormalizability.Renorm for op in ops)
+    assert all(is_gauge_invariant(op)[0] for op in ops)
+
+    # every brute force candidate of dim <= 4 is found by the pruned search
+    from itertools import combinations_with_replacement
+    atoms = [H, H.conjugate(), L, L.conjugate(), E, E.conjugate()]
+    expected = set()
+    for n in range(2, 5):
+        for combo in combinations_with_replacement(atoms, n):
+            if sum(x.mass_dim for x in combo) > 4:
+                continue
+            if sum(x.is_fermion for x in combo) % 2:
+                continue
+            if is_gauge_invariant(combo)[0]:
+                expected.add(tuple(sorted(str(f.name) for f in combo)))
+    found = {tuple(sorted(str(f.name) for f in op)) for op in lag.operators(4)}
+    assert found == expected
+
+
+def test_parallel_matches_serial():
+    su3, su2, u1 = ls.SU(3), ls.SU(2), ls.U1()
+    symmetries = [
+        Symmetry("SU3_c", su3, True, "g_s"),
+        Symmetry("SU2_L", su2, True, "g_L"),
+        Symmetry("U1_Y", u1, True, "g_Y"),
+    ]
+    Q = Field("Q", "1/2", {
+        "SU3_c": Representation(Matrix([[1, 0]]), su3),
+        "SU2_L": Representation(Matrix([[1]]), su2),
+        "U1_Y": Representation(sympify("1/6"), u1),
+    })
+    U = Field("U", "1/2", {
+        "SU3_c": Representation(Matrix([[0, 1]]), su3),
+        "U1_Y": Representation(sympify("-2/3"), u1),
+    })
+    H = Field("H", "0", {
+        "SU2_L": Representation(Matrix([[1]]), su2),
+        "U1_Y": Representation(sympify("1/2"), u1),
+    })
+    lag = Lagrangian([Q, U, H], symmetries, "SM quarks")
+
+    serial = list(lag.operators(4))
+    parallel = list(lag.operators(4, jobs=2))
+    assert parallel == serial
+    assert (Q, U, H) in serial
+
+    batch = [(Q, U, H), (Q, U), (H, H.conjugate()), (Q, Q.conjugate(), U)]
+    assert is_gauge_invariant_batch(batch, jobs=2) == is_gauge_invariant_batch(batch)
+
+    table = AbelianCharges([Q, U, H, H.conjugate(), Q.conjugate()], symmetries)
+    assert (is_gauge_invariant_batch(batch, charges=table, jobs=2)
+            == is_gauge_invariant_batch(batch, charges=table))
+    with pytest.raises(ValueError):
+        is_gauge_invariant_batch(batch, engine=GaugeInvarianceEngine(), jobs=2)
+    with pytest.raises(ValueError):
+        list(enumerate_operators(lag, 4, engine=GaugeInvarianceEngine(), jobs=2))
+
+    # the worker split, lowest atom alone then by lowest pair, is the serial order
+    from particlezoo.builders import CoreModel
+    from particlezoo.validations.operators import _Search
+    model = CoreModel.from_lagrangian(lag)
+    atoms = model.atoms(True)
+    search = _Search(model, atoms, Fraction(4), 1, GaugeInvarianceEngine())
+    split = []
+    for i in range(len(atoms)):
+        split += list(search.root(i))
+        for j in range(i, len(atoms)):
+            split += list(search.run(i, j))
+    assert split == list(search.run())
+
+
+def test_incremental_lagrangian():
+    from liesym import SU, U1
+
+    su2, u1 = SU(2), U1()
+    L, Y = Symmetry("L", su2, True, "g"), Symmetry("Y", u1, True, "g'")
+    H = Field("H", "0", {"L": Representation(Matrix([[1]]), su2), "Y": Representation("1/2", u1)})
+    lag = Lagrangian([H], [L, Y], "Higgs")
+    assert len(list(lag.operators(4))) == 2
+
+    def names(ops):
+        return sorted(tuple(str(f.name) for f in op) for op in ops)
+
+    fields = [H]
+    for i, charge in enumerate(["-1", "1/2", "0"]):
+        psi = Field(f"S_{i}", "0", {"Y": Representation(charge, u1)})
+        lag.add_field(psi)
+        fields.append(psi)
+        assert names(lag.operators(4)) == names(Lagrangian(fields, [L, Y], "x").operators(4))
+        assert names(lag.operators(4, Renormalizability.Renorm)) == \
+            names(Lagrangian(fields, [L, Y], "x").operators(4, Renormalizability.Renorm))
+
+    lag.remove_field("S_0")
+    assert names(lag.operators(4)) == names(Lagrangian([f for f in fields if f._raw_name != "S_0"], [L, Y], "x").operators(4))
+
+    c = Symmetry("c", SU(3), True, "g_s")
+    lag.add_symmetry(c)
+    assert lag.nonabelian_symmetries == [L, c]
+    assert "A^{a}_{c}" in lag.kinetic_term()
+
+    with pytest.raises(ValueError):
+        lag.add_field(H)
+    with pytest.raises(ValueError):
+        lag.remove_field("S_0")
+
+
+def test_lagrangian_indexes():
+    from liesym import SU, U1
+
+    su2, u1 = SU(2), U1()
+    L = Symmetry("SU2_L", su2, True, "g", tag="L")
+    Y = Symmetry("U1_Y", u1, True, "g'", tag="Y")
+    H = Field("H", "0", {"SU2_L": Representation(Matrix([[1]]), su2), "U1_Y": Representation("1/2", u1)})
+    E = Field("E", "1/2", {"SU2_L": Representation(Matrix([[0]]), su2), "U1_Y": Representation("-1", u1)})
+    lag = Lagrangian([H, E], [L, Y], "Toy")
+
+    assert lag.symmetry("SU2_L") is L and lag.symmetry("Y") is Y
+    assert lag.field("E") is E
+    assert lag.charged_fields("L") == [H]
+    assert lag.charged_fields(Y) == [H, E]
+    assert lag.abelian_symmetries == [Y] and lag.nonabelian_symmetries == [L]
+
+    N = Field("N", "1/2", {"SU2_L": Representation(Matrix([[1]]), su2)})
+    lag.add_field(N)
+    assert lag.charged_fields("L") == [H, N]
+    lag.remove_field(H)
+    assert lag.charged_fields("L") == [N] and lag.charged_fields("Y") == [E]
+    with pytest.raises(ValueError):
+        lag.field("H")
+
+    e6 = ls.E(6)
+    G = Symmetry("E6", e6, True, "g_E")
+    lag.add_symmetry(G)
+    lag.add_field(Field("X", "1/2", {"E6": Representation(Matrix([[1, 0, 0, 0, 0, 0]]), e6)}))
+    assert not G.is_abelian
+    assert lag.abelian_symmetries == [Y] and lag.nonabelian_symmetries == [L, G]
+    assert [str(f.name) for f in lag.charged_fields("E6")] == ["X"]
+
+    X = Symmetry("Z2_X", ls.Z(2), False, None, tag="X")
+    lag.add_symmetry(X)
+    assert lag.symmetry("X") is X and lag.charged_fields(X) == []
+
+
+def test_decomposition_cache(tmp_path):
+    import itertools
+    from particlezoo.validations import DecompositionCache
+
+    cache = DecompositionCache(maxsize=256)
+    su3 = ("su", 3)
+    irreps = [(1, 0), (0, 1), (1, 1), (2, 0), (0, 2)]
+
+    # multiplicities add up to the product dimension
+    for a, b in itertools.combinations_with_replacement(irreps, 2):
+        product = cache.product(su3, a, b)
+        assert sum(m * cache.dim(su3, x) for x, m in product.items()) == cache.dim(su3, a) * cache.dim(su3, b)
+    assert cache.product(su3, (1, 0), (2, 0)) == {(3, 0): 1, (1, 1): 1}
+    assert cache.decompose(su3, [(1, 1)] * 3)[(0, 0)] == 2
+
+    # the early stopping check agrees with the full decomposition
+    for terms in itertools.combinations_with_replacement(irreps, 4):
+        assert cache.has_singlet(su3, terms) == ((0, 0) in cache.decompose(su3, terms))
+    assert cache.has_singlet(("so", 10), [(0, 0, 0, 0, 1)] * 2 + [(1, 0, 0, 0, 0)])
+    assert cache.info()["pairs"].currsize <= 256
+
+    fname = str(tmp_path / "decompositions.pkl")
+    cache.save(fname)
+    restored = DecompositionCache.load(fname)
+    assert restored.info()["pairs"].currsize == cache.info()["pairs"].currsize
+    assert restored.product(su3, (1, 1), (1, 1)) == cache.product(su3, (1, 1), (1, 1))
+    assert restored.info()["pairs"].misses == 0
+    assert DecompositionCache.load(str(tmp_path / "missing.pkl")).info()["pairs"].currsize == 0
+
+
+def test_anomalies(sm):
+    from particlezoo.validations import AnomalyChecker, irrep_indices
+
+    syms = sm.symmetries
+    generation = sm.generation()
+    higgs = sm.field("H", "0", l=[1], y="1/2")
+    model = Lagrangian(generation + [higgs], syms, "SM")
+    assert model.is_anomaly_free()
+    assert list(model.anomalies()) == ["Y^3", "Y grav^2", "Y c^2", "Y L^2", "c^3", "L^3"]
+
+    model.remove_field("e^c")
+    assert model.anomalies()["Y^3"] == -1 and model.anomalies()["Y grav^2"] == -1
+    assert not model.is_anomaly_free()
+
+    assert irrep_indices(ls.SU(5), [0, 1, 0, 0]).cubic == 1
+    assert irrep_indices(ls.SU(5), [0, 0, 0, 1]).cubic == -1
+    assert irrep_indices(ls.SU(3), [2, 0]).dynkin == Fraction(5, 2)
+
+    # scan the charge of e^c in units of 1/6, only 6/6 cancels
+    checker = AnomalyChecker(generation, syms)
+    charges, denominator = checker.charges()
+    assert denominator == 6
+    batch = np.repeat(charges[None], 13, axis=0)
+    batch[:, 4, 0] = np.arange(13)
+    assert np.flatnonzero(checker.anomaly_free(batch)).tolist() == [6]
+
+
+def test_charge_scan(sm):
+    from particlezoo.validations import ChargeScan, scan_charges
+
+    syms = sm.symmetries
+    Q, u, d, L, e = sm.generation(y_L="y", y_e="-2*y")
+    H = sm.field("H", "0", l=[1], y="h")
+    lag = Lagrangian([Q, u, d, L, e, H], syms, "SM template")
+
+    yukawas = [(Q, H, d), (Q, H.conjugate(), u), (L, H, e)]
+    grid = {"y": [Fraction(n, 2) for n in range(-2, 3)], "h": [Fraction(n, 2) for n in range(-2, 3)]}
+    result = scan_charges(lag, yukawas, grid, anomalies=True)
+    assert result.points.shape == (25, 2) and result.invariant.shape == (25, 3)
+    assert result.points[result.allowed()].tolist() == [[Fraction(-1, 2), Fraction(-1, 2)]]
+    # the down yukawa only fixes h, the non abelian content is always fine
+    assert result.invariant[:, 0].sum() == 5
+
+    scan = ChargeScan(lag, yukawas, ["y", "h"])
+    points, denominator = scan.grid({"y": ["-1/2"], "h": ["1/2"]})
+    assert scan.invariant(points, denominator).tolist() == [[False, False, False]]
+
+    W = sm.field("W", "0", y="y**2")
+    with pytest.raises(ModelError):
+        ChargeScan(Lagrangian([W], syms, "Bad"), [], ["y"])